@@ -1,6 +1,8 @@
 from django.contrib import admin
-from .models import Movie, WatchedMovie, Comment
+from .models import Movie, WatchedMovie, Comment, ImportJob, ImportJobItem
 
 admin.site.register(Movie)
 admin.site.register(WatchedMovie)
-admin.site.register(Comment)
\ No newline at end of file
+admin.site.register(Comment)
+admin.site.register(ImportJob)
+admin.site.register(ImportJobItem)
@@ -0,0 +1,233 @@
+"""
+Sık okunan endpoint'lerin async (ASGI) sürümleri.
+
+DRF function view'ları async desteklemediği için bunlar düz Django async
+view'larıdır. Veritabanı erişimi Django'nun async ORM'i (aget, async for) ile
+yapılır; serializer, XML render ve XSLT gibi CPU işleri event loop'u
+bloklamasın diye sınırlı bir thread havuzunda çalışır. Filmler senkron
+endpoint'lerle aynı parça önbelleğinden (api/movie_cache.py) gelir; yanıtlar
+aynı XML formatındadır (sayfalama cursor'ları hariç). TMDB import'u
+istemcinin asearch_movie() metodunu kullanır; TMDB yanıtı beklenirken
+bir istek thread'i tutulmaz.
+ASGI altında çalıştırmak için: uvicorn movieproject.asgi:application
+"""
+import asyncio
+import contextvars
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+from rest_framework import exceptions
+from rest_framework.utils.urls import replace_query_param
+
+from . import html_cache, tmdb
+from .authentication import aauthenticate
+from .movie_cache import fragment_cache, movie_fragments, render_fragment
+from .models import Comment, Movie
+from .parsers import HardenedXMLParser
+from .pagination import decode_keyset_cursor, encode_keyset_cursor, keyset_after
+from .renderers import FragmentXMLRenderer
+from .serializers import CommentSerializer, MovieSerializer
+from .views import apply_xslt_transform, movie_prefetches, movie_to_xml_etree_for_xslt, project_movies
+
+# XSLT/XML CPU işleri için sınırlı havuz; event loop thread'i hiç bloklanmaz
+cpu_pool = ThreadPoolExecutor(max_workers=settings.ASYNC_CPU_WORKERS, thread_name_prefix='async-cpu')
+
+MOVIE_PAGE_SIZE = 100
+COMMENT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 1000
+
+
+async def run_cpu(fn, *args):
+    """Runs `fn(*args)` in `cpu_pool`; the request's context (metrics) is carried along."""
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(cpu_pool, functools.partial(context.run, fn, *args))
+
+
+def _render_xml(data):
+    renderer = FragmentXMLRenderer()
+    return renderer.render(data), f'{renderer.media_type}; charset={renderer.charset}'
+
+
+async def xml_response(data, status=200):
+    content, content_type = await run_cpu(_render_xml, data)
+    return HttpResponse(content, content_type=content_type, status=status)
+
+
+async def serialized_response(serializer_class, instance, many=False, **extra):
+    """Serializes and renders `instance` in the pool (instances must be fully prefetched)."""
+    def render():
+        data = serializer_class(instance, many=many).data
+        return _render_xml({**extra, 'results': data} if many else data)
+
+    content, content_type = await run_cpu(render)
+    return HttpResponse(content, content_type=content_type)
+
+
+def _page_size(request, default):
+    try:
+        page_size = int(request.GET.get('page_size', default))
+    except ValueError:
+        return default
+    return min(page_size, MAX_PAGE_SIZE) if page_size > 0 else default
+
+
+def _comment_cursor(encoded):
+    """Returns the (created_at, id) position of a comment cursor or None; raises NotFound if malformed."""
+    values = decode_keyset_cursor(encoded, 2)
+    if values is None:
+        return None
+    created_at, comment_id = values
+    created_at = parse_datetime(created_at) if isinstance(created_at, str) else None
+    if created_at is None or timezone.is_naive(created_at) or type(comment_id) is not int:
+        raise exceptions.NotFound('Invalid cursor')
+    return created_at, comment_id
+
+
+def _next_link(request, cursor):
+    return replace_query_param(request.build_absolute_uri(), 'cursor', cursor) if cursor else None
+
+
+@require_GET
+async def movie_list_async_view(request):
+    """Lists movies page by page (keyset on movie_id, ?cursor=, ?page_size=)."""
+    page_size = _page_size(request, MOVIE_PAGE_SIZE)
+    try:
+        after = decode_keyset_cursor(request.GET.get('cursor'), 1)
+        if after is not None and not isinstance(after[0], str):
+            raise exceptions.NotFound('Invalid cursor')
+    except exceptions.NotFound as e:
+        return await xml_response({'detail': str(e.detail)}, status=404)
+
+    generation = fragment_cache.generation
+    movies = Movie.objects.order_by('movie_id')
+    if after is not None:
+        movies = movies.filter(keyset_after(('movie_id',), after))
+    page = [movie async for movie in movies[:page_size + 1]]
+
+    cursor = encode_keyset_cursor([page[page_size - 1].movie_id]) if len(page) > page_size else None
+    # Önbellekte olmayan filmlerin tür/oyuncuları yüklenir; tamamı önbellekteyse sorgu yok
+    results = await sync_to_async(movie_fragments)(page[:page_size], movie_prefetches(), generation)
+    return await xml_response({'next': _next_link(request, cursor), 'results': results})
+
+
+@require_GET
+async def movie_detail_async_view(request, movie_id):
+    """Returns one movie with its genres and actors."""
+    generation = fragment_cache.generation
+    # Başka süreçte değişmiş bir filmin parçası kullanılmasın diye güncel sürüm okunur
+    version = await Movie.objects.filter(pk=movie_id).values_list('updated_at').afirst()
+    fragment = fragment_cache.get_many({movie_id: version[0]}).get(movie_id) if version else None
+    if fragment is None:
+        try:
+            movie = await project_movies(Movie.objects.all(), None).aget(pk=movie_id)
+        except Movie.DoesNotExist:
+            return await xml_response({'detail': 'No Movie matches the given query.'}, status=404)
+        fragment = await run_cpu(lambda: render_fragment(MovieSerializer(movie).data))
+        fragment_cache.set_many({movie_id: (movie.updated_at, fragment)}, generation)
+    return await xml_response(fragment)
+
+
+@require_GET
+async def comment_list_async_view(request, movie_id):
+    """Lists a movie's comments, newest first (keyset on created_at, id). Requires a token."""
+    try:
+        user = await aauthenticate(request)
+    except exceptions.AuthenticationFailed as e:
+        return await xml_response({'detail': str(e.detail)}, status=401)
+    if user is None:
+        return await xml_response({'detail': 'Authentication credentials were not provided.'}, status=401)
+
+    if not await Movie.objects.filter(pk=movie_id).aexists():
+        return await xml_response({'detail': 'No Movie matches the given query.'}, status=404)
+
+    page_size = _page_size(request, COMMENT_PAGE_SIZE)
+    try:
+        before = _comment_cursor(request.GET.get('cursor'))
+    except exceptions.NotFound as e:
+        return await xml_response({'detail': str(e.detail)}, status=404)
+
+    comments = (
+        Comment.objects.filter(movie_id=movie_id)
+        .select_related('author')
+        .only('id', 'movie', 'body', 'created_at', 'author__username')
+        .order_by('-created_at', '-id')
+    )
+    if before is not None:
+        comments = comments.filter(keyset_after(('created_at', 'id'), before, descending=True))
+    page = [comment async for comment in comments[:page_size + 1]]
+
+    cursor = None
+    if len(page) > page_size:
+        last = page[page_size - 1]
+        cursor = encode_keyset_cursor([last.created_at.isoformat(), last.id])
+    return await serialized_response(CommentSerializer, page[:page_size], many=True, next=_next_link(request, cursor))
+
+
+def _render_movie_html(movie):
+    return apply_xslt_transform(movie_to_xml_etree_for_xslt(movie), 'movie_to_html.xsl')
+
+
+@require_GET
+async def movie_detail_html_async_view(request, movie_id):
+    """XSLT detail page; shares the HTML cache (and ETag/304 handling) with the sync view."""
+    async def render():
+        movie = await project_movies(Movie.objects.all(), None).aget(pk=movie_id)
+        return await run_cpu(_render_movie_html, movie)
+
+    try:
+        return await html_cache.acached_html_response(request, html_cache.detail_key(movie_id), render)
+    except Movie.DoesNotExist:
+        return HttpResponse("<h1>Movie not found.</h1>", status=404)
+
+
+@csrf_exempt
+@require_POST
+async def import_movie_async_view(request):
+    """Async variant of import_movie_from_tmdb_view (admin token, <importRequest><title>...)."""
+    try:
+        user = await aauthenticate(request)
+    except exceptions.AuthenticationFailed as e:
+        return await xml_response({'detail': str(e.detail)}, status=401)
+    if user is None:
+        return await xml_response({'detail': 'Authentication credentials were not provided.'}, status=401)
+    if not user.is_staff:
+        return await xml_response({'detail': 'You do not have permission to perform this action.'}, status=403)
+
+    if request.content_type != 'application/xml':
+        return await xml_response({'error': 'Content-Type must be application/xml'}, status=415)
+    try:
+        xml_doc = await run_cpu(HardenedXMLParser().parse_root, request)
+    except exceptions.ParseError as e:
+        return await xml_response({'error': f'Invalid XML: {e.detail}'}, status=400)
+    title = xml_doc.findtext('title')
+    if not title:
+        return await xml_response({'error': "A 'title' element is required in the request body."}, status=400)
+    if not settings.TMDB_API_KEY:
+        return await xml_response({'error': 'TMDB API key is not configured on the server.'}, status=500)
+
+    try:
+        results = await tmdb.get_client().asearch_movie(title)
+    except (requests.exceptions.HTTPError, requests.exceptions.RetryError) as e:
+        return await xml_response({'error': f'Error communicating with TMDB API: {e}'}, status=502)
+    except requests.exceptions.RequestException as e:
+        return await xml_response({'error': f'A network error occurred: {e}'}, status=503)
+    if not results:
+        return await xml_response({'error': f"No movie found on TMDB with the title '{title}'."}, status=404)
+
+    fields = tmdb.movie_fields_from_result(results[0])
+    if await Movie.objects.filter(pk=fields['movie_id']).aexists():
+        return await xml_response({'error': f"Movie '{fields['title']}' already exists in the database."}, status=409)
+    await Movie.objects.acreate(**fields)
+    movie = await project_movies(Movie.objects.all(), None).aget(pk=fields['movie_id'])
+    response = await serialized_response(MovieSerializer, movie)
+    response.status_code = 201
+    return response
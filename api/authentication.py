@@ -0,0 +1,117 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication, get_authorization_header
+
+
+class TokenCache:
+    """
+    Bounded LRU of token key -> Token (with its user), each entry valid for `ttl` seconds.
+
+    Token silinince ya da kullanıcı değişince sinyallerle temizlenir. Önbellek
+    süreç başınadır; başka bir süreçteki değişiklikler en geç `ttl` saniye sonra görülür.
+    """
+
+    def __init__(self, maxsize=10000, ttl=60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                token, expires = entry
+                if expires > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return token
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def set(self, key, token):
+        with self._lock:
+            self._entries[key] = (token, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def invalidate_user(self, user_id):
+        # Kullanıcı değişiklikleri seyrek olduğu için index tutmak yerine tarama yapılır
+        with self._lock:
+            for key in [key for key, (token, _) in self._entries.items() if token.user_id == user_id]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'size': len(self._entries),
+        }
+
+
+token_cache = TokenCache(
+    maxsize=getattr(settings, 'TOKEN_AUTH_CACHE_SIZE', 10000),
+    ttl=getattr(settings, 'TOKEN_AUTH_CACHE_TTL', 60),
+)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """Drop-in TokenAuthentication that serves repeated token lookups from `token_cache`."""
+
+    def authenticate_credentials(self, key):
+        token = token_cache.get(key)
+        if token is None:
+            user, token = super().authenticate_credentials(key)
+            token_cache.set(key, token)
+        elif not token.user.is_active:
+            raise exceptions.AuthenticationFailed('User inactive or deleted.')
+        # Önbellekteki nesne istekler arasında paylaşılır, view'a kopyası verilir
+        return copy.copy(token.user), token
+
+
+async def aauthenticate(request):
+    """
+    Async counterpart of CachedTokenAuthentication for plain Django async views.
+    Returns the user, None when the request has no token header; raises AuthenticationFailed.
+    """
+    auth = get_authorization_header(request).split()
+    if not auth or auth[0].lower() != b'token':
+        return None
+    if len(auth) != 2:
+        raise exceptions.AuthenticationFailed('Invalid token header.')
+    try:
+        key = auth[1].decode()
+    except UnicodeError:
+        raise exceptions.AuthenticationFailed('Invalid token header.')
+
+    token = token_cache.get(key)
+    if token is None:
+        model = CachedTokenAuthentication().get_model()
+        try:
+            token = await model.objects.select_related('user').aget(key=key)
+        except model.DoesNotExist:
+            raise exceptions.AuthenticationFailed('Invalid token.')
+        token_cache.set(key, token)
+    if not token.user.is_active:
+        raise exceptions.AuthenticationFailed('User inactive or deleted.')
+    return copy.copy(token.user)
@@ -0,0 +1,102 @@
+"""
+Katalog aynaları için artımlı değişiklik akışı (/movies/changes/?since=<token>).
+
+Eklenen/güncellenen filmler Movie.updated_at'ten, silinenler MovieTombstone'dan
+okunur; ikisi (zaman, movie_id) sırasıyla birleştirilir ve keyset ile sayfalanır.
+Token bu sıradaki konumdur: istemci bir sonraki isteğinde sadece ondan sonraki
+değişiklikleri alır.
+
+Zaman damgası commit'ten önce alınır; daha geç damgalı bir yazma ondan önce
+commit edilebilir. Bu yüzden akış son CHANGE_FEED_SETTLE_SECONDS saniyeyi
+vermez; o aralıktaki değişiklikler bir sonraki istekte gelir.
+"""
+import heapq
+from datetime import timedelta
+from itertools import islice
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+
+from .models import Movie, MovieTombstone
+from .pagination import decode_keyset_cursor, encode_keyset_cursor, keyset_after
+
+
+def settled_until():
+    """Changes up to this moment are committed (see CHANGE_FEED_SETTLE_SECONDS)."""
+    return timezone.now() - timedelta(seconds=getattr(settings, 'CHANGE_FEED_SETTLE_SECONDS', 10.0))
+
+
+def encode_token(position):
+    changed_at, movie_id = position
+    return encode_keyset_cursor([changed_at.isoformat(), movie_id])
+
+
+def decode_token(token):
+    """
+    Returns the (changed_at, movie_id) position of a token, or None if there is none.
+    movie_id None means every change at changed_at was already returned.
+    """
+    values = decode_keyset_cursor(token, 2)
+    if values is None:
+        return None
+    changed_at, movie_id = values
+    changed_at = parse_datetime(changed_at) if isinstance(changed_at, str) else None
+    if changed_at is None or timezone.is_naive(changed_at) or not isinstance(movie_id, (str, type(None))):
+        raise NotFound('Invalid cursor')
+    return changed_at, movie_id
+
+
+def end_position(after, until):
+    """Position after every change up to `until`; a token already past it is kept."""
+    if after is not None and after[0] >= until:
+        return after
+    return until, None
+
+
+def _changed_after(queryset, field, after, until):
+    queryset = queryset.filter(**{field + '__lte': until})
+    if after is not None:
+        changed_at, movie_id = after
+        if movie_id is None:
+            queryset = queryset.filter(**{field + '__gt': changed_at})
+        else:
+            queryset = queryset.filter(keyset_after((field, 'movie_id'), (changed_at, movie_id)))
+    return queryset.order_by(field, 'movie_id')
+
+
+def changes_after(after, until, limit, using='default'):
+    """
+    Returns (changes, has_more): at most `limit` changes after the `after` position
+    and not newer than `until`, oldest first, as (changed_at, movie_id, movie)
+    tuples where movie is None for deletions.
+    """
+    movies = list(_changed_after(Movie.objects.using(using), 'updated_at', after, until)[:limit + 1])
+    deletions = list(
+        _changed_after(MovieTombstone.objects.using(using), 'deleted_at', after, until)
+        .values_list('deleted_at', 'movie_id')[:limit + 1]
+    )
+    merged = heapq.merge(
+        ((movie.updated_at, movie.movie_id, movie) for movie in movies),
+        ((deleted_at, movie_id, None) for deleted_at, movie_id in deletions),
+        key=lambda change: change[:2],
+    )
+    # İki kaynaktan toplam limit'ten fazla satır geldiyse sayfanın ötesinde değişiklik var
+    return list(islice(merged, limit)), len(movies) + len(deletions) > limit
+
+
+def touch_movies(movie_ids, using=None):
+    """Marks `movie_ids` as changed (for changes that do not go through Movie.save())."""
+    movie_ids = list(movie_ids)
+    if movie_ids:
+        Movie.objects.using(using).filter(pk__in=movie_ids).update(updated_at=timezone.now())
+
+
+def record_deletions(movie_ids, using=None):
+    """Writes (or moves forward) the tombstones of deleted movies."""
+    now = timezone.now()
+    MovieTombstone.objects.using(using).bulk_create(
+        [MovieTombstone(movie_id=movie_id, deleted_at=now) for movie_id in movie_ids],
+        update_conflicts=True, unique_fields=['movie_id'], update_fields=['deleted_at'],
+    )
@@ -0,0 +1,127 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+HTML_CACHE_ALIAS = 'html'
+LIST_VERSION_KEY = 'movie-list:version'
+BULK_CLEAR_THRESHOLD = 1000
+
+
+def _cache():
+    return caches[HTML_CACHE_ALIAS]
+
+
+def detail_key(movie_id):
+    return f'movie-detail:{movie_id}'
+
+
+def list_key(query):
+    """
+    `query`: liste sayfasını belirleyen parametreler (sayfa, gruplama, filtre).
+
+    Liste sayfaları bir versiyon numarası ile anahtarlanır. Herhangi bir film
+    değiştiğinde versiyon artırılır; böylece tüm sayfaları tek tek silmek
+    gerekmez, eski sayfalar zaman aşımıyla düşer.
+    """
+    version = _cache().get_or_set(LIST_VERSION_KEY, 1, timeout=None)
+    digest = hashlib.sha1(query.encode('utf-8')).hexdigest()
+    return f'movie-list:{version}:{digest}'
+
+
+def _bump_list_version():
+    cache = _cache()
+    try:
+        cache.incr(LIST_VERSION_KEY)
+    except ValueError:
+        # Versiyon anahtarı hiç oluşmamış veya düşmüş; yeni bir versiyonla başla
+        cache.set(LIST_VERSION_KEY, int(time.time()), timeout=None)
+
+
+def invalidate_movie(movie_id):
+    """Drops the cached detail page of `movie_id` and every cached list page."""
+    _cache().delete(detail_key(movie_id))
+    _bump_list_version()
+
+
+def invalidate_movies(movie_ids):
+    """Bulk variant of invalidate_movie for importers that bypass model signals."""
+    movie_ids = list(movie_ids)
+    if len(movie_ids) > BULK_CLEAR_THRESHOLD:
+        # Binlerce anahtarı tek tek silmek yerine HTML önbelleğini tamamen boşalt
+        _cache().clear()
+    elif movie_ids:
+        _cache().delete_many([detail_key(movie_id) for movie_id in movie_ids])
+    _bump_list_version()
+
+
+def _make_entry(html):
+    return {
+        'html': html,
+        'etag': '"%s"' % hashlib.sha1(html.encode('utf-8')).hexdigest(),
+        'last_modified': int(time.time()),
+    }
+
+
+def get_or_render(key, render_fn):
+    """Returns the cached entry for `key`, rendering and storing it on a miss."""
+    cache = _cache()
+    entry = cache.get(key)
+    if entry is None:
+        entry = _make_entry(render_fn())
+        cache.set(key, entry, timeout=settings.HTML_CACHE_TIMEOUT)
+    return entry
+
+
+def _entry_response(request, entry):
+    response = get_conditional_response(
+        request, etag=entry['etag'], last_modified=entry['last_modified']
+    )
+    if response is None:
+        response = HttpResponse(entry['html'], content_type='text/html')
+
+    response['ETag'] = entry['etag']
+    response['Last-Modified'] = http_date(entry['last_modified'])
+    return response
+
+
+def cached_html_response(request, key, render_fn):
+    """
+    HTML'i önbellekten (gerekirse render ederek) döner. İstek If-None-Match /
+    If-Modified-Since içeriyorsa ve sayfa değişmemişse 304 döner.
+    """
+    return _entry_response(request, get_or_render(key, render_fn))
+
+
+async def acached_html_response(request, key, arender_fn):
+    """Async variant of cached_html_response; `arender_fn` is a coroutine function returning the HTML."""
+    cache = _cache()
+    entry = await cache.aget(key)
+    if entry is None:
+        entry = _make_entry(await arender_fn())
+        await cache.aset(key, entry, timeout=settings.HTML_CACHE_TIMEOUT)
+    return _entry_response(request, entry)
+
+
+def streamed_html_response(request, key, render_chunks):
+    """
+    Önbellekte varsa cached_html_response gibi davranır. Yoksa `render_chunks()`
+    parçaları üretildikçe istemciye akıtılır; akış tamamlanınca sayfa önbelleğe yazılır.
+    """
+    entry = _cache().get(key)
+    if entry is not None:
+        return _entry_response(request, entry)
+
+    def stream():
+        parts = []
+        for chunk in render_chunks():
+            parts.append(chunk)
+            yield chunk
+        # İstemci yarıda bırakırsa buraya gelinmez, eksik sayfa saklanmaz
+        _cache().set(key, _make_entry(''.join(parts)), timeout=settings.HTML_CACHE_TIMEOUT)
+
+    return StreamingHttpResponse(stream(), content_type='text/html; charset=utf-8')
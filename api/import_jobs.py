@@ -0,0 +1,108 @@
+"""
+TMDB toplu içe aktarma kuyruğu.
+
+İşler veritabanında tutulur (ImportJob/ImportJobItem); harici bir broker yok.
+`process_import_jobs` komutu bekleyen işleri sırayla alır. TMDB aramaları
+sınırlı sayıda thread'de ve hız sınırıyla yapılır; veritabanı yazmaları ise
+sadece ana thread'den, parça (chunk) başına tek transaction ile yapılır.
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from . import html_cache, movie_cache, tmdb, xpath_catalog
+from .models import ImportJob, ImportJobItem, Movie
+
+# Bir işteki başlıklar bu büyüklükte parçalar halinde aranıp kaydedilir
+CHUNK_SIZE = 50
+
+
+def create_job(titles, user):
+    """Creates a pending job with one item per distinct title."""
+    # Aynı başlık bir istekte birden fazla kez geçerse tek kez aranır
+    titles = list(dict.fromkeys(title.strip() for title in titles if title and title.strip()))
+    with transaction.atomic():
+        job = ImportJob.objects.create(created_by=user)
+        ImportJobItem.objects.bulk_create(ImportJobItem(job=job, title=title) for title in titles)
+    return job
+
+
+def claim_next_job():
+    """Marks the oldest pending job as running and returns it (None if there is none)."""
+    for job_id in ImportJob.objects.filter(status=ImportJob.STATUS_PENDING).order_by('id').values_list('id', flat=True):
+        # Koşullu UPDATE: aynı işi iki worker aynı anda alamaz
+        claimed = ImportJob.objects.filter(pk=job_id, status=ImportJob.STATUS_PENDING).update(
+            status=ImportJob.STATUS_RUNNING, started_at=timezone.now()
+        )
+        if claimed:
+            return ImportJob.objects.get(pk=job_id)
+    return None
+
+
+def _lookup(client, title):
+    """Returns (movie fields or None, error message or None). Runs in a worker thread."""
+    try:
+        results = client.search_movie(title)
+    except requests.exceptions.RequestException as e:
+        return None, str(e)
+    if not results:
+        return None, None
+    return tmdb.movie_fields_from_result(results[0]), None
+
+
+def _classify(items, lookups, existing):
+    """Sets every item's outcome; returns the movies to create keyed by movie_id."""
+    new_movies = {}
+    for item, (fields, error) in zip(items, lookups):
+        item.error = None
+        if error:
+            item.status, item.movie_id, item.error = ImportJobItem.STATUS_FAILED, None, error
+        elif fields is None:
+            item.status, item.movie_id = ImportJobItem.STATUS_NOT_FOUND, None
+        elif fields['movie_id'] in existing or fields['movie_id'] in new_movies:
+            item.status, item.movie_id = ImportJobItem.STATUS_DUPLICATE, fields['movie_id']
+        else:
+            item.status, item.movie_id = ImportJobItem.STATUS_IMPORTED, fields['movie_id']
+            new_movies[fields['movie_id']] = Movie(**fields)
+    return new_movies
+
+
+def _store_chunk(items, lookups, attempts=3):
+    """Creates the new movies of one chunk and records every item's outcome."""
+    movie_ids = {fields['movie_id'] for fields, error in lookups if fields}
+    for attempt in range(attempts):
+        try:
+            with transaction.atomic():
+                # Mevcut filmler yazmayla aynı transaction'da, tek sorguyla okunur. ignore_conflicts
+                # kullanılmaz: atlanan bir satır "imported" raporlanırdı. Arada başka bir worker
+                # aynı filmi eklediyse IntegrityError ile parça geri alınır ve yeniden sınıflanır.
+                existing = set(Movie.objects.filter(pk__in=movie_ids).values_list('pk', flat=True))
+                new_movies = _classify(items, lookups, existing)
+                Movie.objects.bulk_create(new_movies.values())
+                ImportJobItem.objects.bulk_update(items, ['status', 'movie_id', 'error'])
+                # bulk_create model sinyallerini tetiklemez
+                if new_movies:
+                    html_cache.invalidate_movies(list(new_movies))
+                    movie_cache.invalidate_movies(list(new_movies))
+                    xpath_catalog.movies_changed(new_movies)
+            return
+        except IntegrityError:
+            if attempt == attempts - 1:
+                raise
+
+
+def process_job(job, client, workers=4, chunk_size=CHUNK_SIZE):
+    """Processes the pending items of `job`; items finished by an earlier run are skipped."""
+    items = list(job.items.filter(status=ImportJobItem.STATUS_PENDING))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for start in range(0, len(items), chunk_size):
+            chunk = items[start:start + chunk_size]
+            lookups = list(executor.map(lambda item: _lookup(client, item.title), chunk))
+            _store_chunk(chunk, lookups)
+
+    job.status = ImportJob.STATUS_DONE
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'finished_at'])
+    return job
@@ -0,0 +1,142 @@
+"""
+Senkron (WSGI) ve async (ASGI) okuma endpoint'lerini aynı yük altında karşılaştırır.
+
+Sunucular ayrıca başlatılır; komut yalnızca istemcidir:
+
+    gunicorn movieproject.wsgi -w 4 --threads 8 -b 127.0.0.1:8001
+    uvicorn movieproject.asgi:application --workers 4 --port 8002 --no-access-log
+    python manage.py benchmark_asgi --wsgi http://127.0.0.1:8001 --asgi http://127.0.0.1:8002 \\
+        --scenario detail --connections 500 --movie-id tt0111161
+"""
+import asyncio
+import json
+import statistics
+import time
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+# senaryo -> (WSGI yolu, ASGI yolu); {movie_id} doldurulur
+SCENARIOS = {
+    'detail': ('/api/v1/movies/{movie_id}/', '/api/v1/async/movies/{movie_id}/'),
+    'list': ('/api/v1/movies/', '/api/v1/async/movies/'),
+    'comments': ('/api/v1/movies/{movie_id}/comments/', '/api/v1/async/movies/{movie_id}/comments/'),
+    'html': ('/api/v1/html/movies/{movie_id}/', '/api/v1/async/html/movies/{movie_id}/'),
+}
+
+
+async def read_response(reader):
+    """Reads one HTTP/1.1 response; returns (status, keep_alive)."""
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError('connection closed')
+    status = int(status_line.split()[1])
+    headers = {}
+    while (line := await reader.readline()) not in (b'\r\n', b''):
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+
+    if headers.get('transfer-encoding', '').lower() == 'chunked':
+        while size := int((await reader.readline()).split(b';')[0], 16):
+            await reader.readexactly(size + 2)
+        await reader.readline()
+    elif 'content-length' in headers:
+        await reader.readexactly(int(headers['content-length']))
+    return status, headers.get('connection', '').lower() != 'close'
+
+
+async def _client(host, port, request, deadline, result):
+    """One keep-alive connection sending requests back to back until `deadline`."""
+    reader = writer = None
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection(host, port)
+            writer.write(request)
+            status, keep_alive = await read_response(reader)
+        except (OSError, ConnectionError, ValueError, IndexError, asyncio.IncompleteReadError):
+            result['errors'] += 1
+            if writer is not None:
+                writer.close()
+            reader = writer = None
+            await asyncio.sleep(0.01)
+            continue
+        result['latencies'].append(time.perf_counter() - start)
+        if status >= 400:
+            result['errors'] += 1
+        if not keep_alive:
+            writer.close()
+            reader = writer = None
+    if writer is not None:
+        writer.close()
+
+
+async def run_load(url, connections, duration, token=None):
+    parts = urlsplit(url)
+    path = parts.path + (f'?{parts.query}' if parts.query else '')
+    headers = [f'GET {path} HTTP/1.1', f'Host: {parts.netloc}', 'Accept: */*', 'Connection: keep-alive']
+    if token:
+        headers.append(f'Authorization: Token {token}')
+    request = ('\r\n'.join(headers) + '\r\n\r\n').encode()
+
+    result = {'latencies': [], 'errors': 0}
+    deadline = time.perf_counter() + duration
+    await asyncio.gather(*(
+        _client(parts.hostname, parts.port or 80, request, deadline, result) for _ in range(connections)
+    ))
+    return result
+
+
+def summarize(result, duration):
+    latencies = sorted(result['latencies'])
+    if not latencies:
+        return {'requests': 0, 'errors': result['errors'], 'rps': 0.0, 'p50_ms': None, 'p99_ms': None}
+    quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+    return {
+        'requests': len(latencies),
+        'errors': result['errors'],
+        'rps': round(len(latencies) / duration, 1),
+        'p50_ms': round(quantiles[49] * 1000, 2),
+        'p99_ms': round(quantiles[98] * 1000, 2),
+    }
+
+
+class Command(BaseCommand):
+    help = 'Load-tests the sync (WSGI) and async (ASGI) read endpoints and compares throughput and latency.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--wsgi', help='Base URL of the WSGI server (e.g. http://127.0.0.1:8001).')
+        parser.add_argument('--asgi', help='Base URL of the ASGI server (e.g. http://127.0.0.1:8002).')
+        parser.add_argument('--scenario', choices=sorted(SCENARIOS), default='detail')
+        parser.add_argument('--movie-id', default='tt0111161', help='Movie used by the detail/comments/html scenarios.')
+        parser.add_argument('--token', help='Auth token (required by the comments scenario).')
+        parser.add_argument('--connections', type=int, default=500, help='Concurrent keep-alive connections (default: 500).')
+        parser.add_argument('--duration', type=float, default=20.0, help='Seconds per server (default: 20).')
+        parser.add_argument('--output', help='Optional path of a JSON report.')
+
+    def handle(self, *args, **options):
+        targets = {name: options[name] for name in ('wsgi', 'asgi') if options[name]}
+        if not targets:
+            raise CommandError('Give at least one of --wsgi and --asgi.')
+        if options['connections'] < 1 or options['duration'] <= 0:
+            raise CommandError('--connections and --duration must be positive.')
+        if options['scenario'] == 'comments' and not options['token']:
+            raise CommandError('The comments scenario needs --token.')
+
+        paths = dict(zip(('wsgi', 'asgi'), SCENARIOS[options['scenario']]))
+        report = {}
+        for name, base in targets.items():
+            url = base.rstrip('/') + paths[name].format(movie_id=options['movie_id'])
+            self.stdout.write(f"{name}: {options['connections']} connections -> {url}")
+            result = asyncio.run(run_load(url, options['connections'], options['duration'], options['token']))
+            report[name] = summary = summarize(result, options['duration'])
+            self.stdout.write(
+                f"  {summary['rps']:>9.1f} req/s  p50 {summary['p50_ms']} ms  p99 {summary['p99_ms']} ms  "
+                f"({summary['requests']} requests, {summary['errors']} errors)"
+            )
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+            self.stdout.write(f"Report written to {options['output']}")
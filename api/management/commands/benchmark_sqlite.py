@@ -0,0 +1,169 @@
+import json
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Python sqlite3 / Django varsayılanları: rollback journal, synchronous=FULL, DEFERRED transaction
+DEFAULT_CONFIG = {'pragmas': {}, 'transaction_mode': 'DEFERRED'}
+
+SCHEMA = [
+    'CREATE TABLE movie (movie_id TEXT PRIMARY KEY, title TEXT, year INTEGER, rating REAL, '
+    'comment_count INTEGER NOT NULL DEFAULT 0)',
+    'CREATE INDEX movie_year_rating ON movie (year, rating)',
+    'CREATE TABLE comment (id INTEGER PRIMARY KEY, movie_id TEXT NOT NULL, body TEXT, created_at REAL)',
+    'CREATE INDEX comment_movie ON comment (movie_id, id)',
+]
+
+
+def connect(path, config):
+    conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+    for name, value in config['pragmas'].items():
+        conn.execute(f'PRAGMA {name} = {value}')
+    return conn
+
+
+def prepare_database(path, config, rows):
+    conn = connect(path, config)
+    for statement in SCHEMA:
+        conn.execute(statement)
+    rng = random.Random(42)
+    conn.execute('BEGIN')
+    conn.executemany(
+        'INSERT INTO movie (movie_id, title, year, rating) VALUES (?, ?, ?, ?)',
+        ((f'm{i:07d}', f'Movie {i}', rng.randint(1980, 2024), rng.randint(10, 100) / 10) for i in range(rows)),
+    )
+    conn.execute('COMMIT')
+    conn.close()
+
+
+def _reader(path, config, rows, deadline, seed, result):
+    """Film listesi ve yorum listesi okumaları (sayfa başına 20 satır)."""
+    conn = connect(path, config)
+    rng = random.Random(seed)
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            conn.execute(
+                'SELECT movie_id, title, rating FROM movie WHERE year = ? ORDER BY rating DESC LIMIT 20',
+                (rng.randint(1980, 2024),),
+            ).fetchall()
+            conn.execute(
+                'SELECT id, body FROM comment WHERE movie_id = ? ORDER BY id DESC LIMIT 20',
+                (f'm{rng.randrange(rows):07d}',),
+            ).fetchall()
+        except sqlite3.OperationalError:
+            result['errors'] += 1
+            continue
+        result['latencies'].append(time.perf_counter() - start)
+    conn.close()
+
+
+def _writer(path, config, rows, deadline, seed, result):
+    """Yorum ekleme: filmi oku, yorumu yaz, sayacı artır (tek transaction)."""
+    conn = connect(path, config)
+    rng = random.Random(seed)
+    begin = f"BEGIN {config['transaction_mode'] or ''}"
+    while time.perf_counter() < deadline:
+        movie_id = f'm{rng.randrange(rows):07d}'
+        start = time.perf_counter()
+        try:
+            conn.execute(begin)
+            conn.execute('SELECT title FROM movie WHERE movie_id = ?', (movie_id,)).fetchone()
+            conn.execute(
+                'INSERT INTO comment (movie_id, body, created_at) VALUES (?, ?, ?)',
+                (movie_id, 'benchmark comment', time.time()),
+            )
+            conn.execute('UPDATE movie SET comment_count = comment_count + 1 WHERE movie_id = ?', (movie_id,))
+            conn.execute('COMMIT')
+        except sqlite3.OperationalError:
+            # "database is locked": istek başarısız sayılır
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            result['errors'] += 1
+            continue
+        result['latencies'].append(time.perf_counter() - start)
+    conn.close()
+
+
+def _summary(results, elapsed):
+    latencies = sorted(latency for result in results for latency in result['latencies'])
+    p95 = latencies[int(len(latencies) * 0.95)] if latencies else 0.0
+    return {
+        'ops_per_sec': round(len(latencies) / elapsed, 1),
+        'errors': sum(result['errors'] for result in results),
+        'median_ms': round(statistics.median(latencies) * 1000, 3) if latencies else None,
+        'p95_ms': round(p95 * 1000, 3),
+    }
+
+
+def run_workload(config, rows, readers, writers, duration):
+    """Runs `readers` + `writers` threads against a fresh database file for `duration` seconds."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'benchmark.sqlite3')
+        prepare_database(path, config, rows)
+
+        read_results = [{'latencies': [], 'errors': 0} for _ in range(readers)]
+        write_results = [{'latencies': [], 'errors': 0} for _ in range(writers)]
+        start = time.perf_counter()
+        deadline = start + duration
+        threads = [
+            threading.Thread(target=_reader, args=(path, config, rows, deadline, n, result))
+            for n, result in enumerate(read_results)
+        ] + [
+            threading.Thread(target=_writer, args=(path, config, rows, deadline, 1000 + n, result))
+            for n, result in enumerate(write_results)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+    return {'reads': _summary(read_results, elapsed), 'writes': _summary(write_results, elapsed)}
+
+
+class Command(BaseCommand):
+    help = ('Measures concurrent read/write throughput of SQLite with default connection settings '
+            'and with the tuned settings from SQLITE_PRAGMAS / SQLITE_TRANSACTION_MODE.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=50000, help='Movies in the benchmark database (default: 50000).')
+        parser.add_argument('--readers', type=int, default=4, help='Concurrent reader threads (default: 4).')
+        parser.add_argument('--writers', type=int, default=4, help='Concurrent writer threads (default: 4).')
+        parser.add_argument('--duration', type=float, default=5.0, help='Seconds per configuration (default: 5).')
+        parser.add_argument('--output', help='Optional path of a JSON report.')
+
+    def handle(self, *args, **options):
+        if options['rows'] < 1 or options['duration'] <= 0:
+            raise CommandError("--rows and --duration must be positive.")
+        if options['readers'] < 0 or options['writers'] < 0 or options['readers'] + options['writers'] == 0:
+            raise CommandError("At least one reader or writer thread is required.")
+
+        configs = {
+            'default': DEFAULT_CONFIG,
+            'tuned': {'pragmas': settings.SQLITE_PRAGMAS, 'transaction_mode': settings.SQLITE_TRANSACTION_MODE},
+        }
+        report = {}
+        for name, config in configs.items():
+            self.stdout.write(f"Running '{name}' for {options['duration']} seconds...")
+            report[name] = result = run_workload(
+                config, options['rows'], options['readers'], options['writers'], options['duration']
+            )
+            for kind in ('reads', 'writes'):
+                stats = result[kind]
+                self.stdout.write(
+                    f"  {kind:<6}: {stats['ops_per_sec']:>9.1f} ops/sec, median {stats['median_ms']} ms, "
+                    f"p95 {stats['p95_ms']} ms, {stats['errors']} errors"
+                )
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+            self.stdout.write(f"Report written to {options['output']}")
@@ -0,0 +1,81 @@
+import json
+import time
+from io import BytesIO
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.exceptions import APIException
+from rest_framework_xml.parsers import XMLParser
+
+from api.parsers import HardenedXMLParser
+
+
+def movie_body(index, plot_size):
+    return (
+        f'<movie_id>bench{index:06d}</movie_id><title>Benchmark Movie {index}</title><year>2001</year>'
+        f'<director>Director {index % 97}</director><plot>{"x" * plot_size}</plot>'
+        f'<poster_url>https://example.com/{index}.jpg</poster_url><rating>7.5</rating>'
+    )
+
+
+def build_payloads(movies, plot_size):
+    """Returns {name: body bytes} for the parsed workloads."""
+    billion_laughs = '<!ENTITY lol "lol">' + ''.join(
+        f'<!ENTITY lol{i} "{("&lol;" if i == 1 else f"&lol{i - 1};") * 10}">' for i in range(1, 10)
+    )
+    return {
+        'single movie': f'<root>{movie_body(0, plot_size)}</root>'.encode(),
+        f'{movies} movies': (
+            '<root>' + ''.join(f'<list-item>{movie_body(i, 200)}</list-item>' for i in range(movies)) + '</root>'
+        ).encode(),
+        'billion laughs': (
+            f'<?xml version="1.0"?><!DOCTYPE root [{billion_laughs}]><root><title>&lol9;</title></root>'
+        ).encode(),
+    }
+
+
+def time_parser(parser, body, iterations):
+    """Returns (median seconds per parse, error message or None)."""
+    timings = []
+    error = None
+    for _ in range(iterations):
+        start = time.perf_counter()
+        try:
+            parser.parse(BytesIO(body), parser_context={})
+        except APIException as e:
+            error = str(e.detail)
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return timings[len(timings) // 2], error
+
+
+class Command(BaseCommand):
+    help = 'Compares the request parse time of rest_framework_xml.XMLParser and api.parsers.HardenedXMLParser.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--movies', type=int, default=2000, help='Movies in the large list body (default: 2000).')
+        parser.add_argument('--plot-size', type=int, default=100000, help='Plot length of the single movie body (default: 100000).')
+        parser.add_argument('--iterations', type=int, default=20, help='Parses per parser and body (default: 20).')
+        parser.add_argument('--output', help='Optional path of a JSON report.')
+
+    def handle(self, *args, **options):
+        if options['movies'] < 1 or options['plot_size'] < 0 or options['iterations'] < 1:
+            raise CommandError("--movies and --iterations must be positive, --plot-size must not be negative.")
+
+        parsers = {'rest_framework_xml': XMLParser(), 'hardened': HardenedXMLParser()}
+        report = {}
+        for name, body in build_payloads(options['movies'], options['plot_size']).items():
+            self.stdout.write(f"{name} ({len(body) / 1024:.0f} KB):")
+            report[name] = {}
+            for parser_name, parser in parsers.items():
+                seconds, error = time_parser(parser, body, options['iterations'])
+                report[name][parser_name] = {'median_ms': round(seconds * 1000, 3), 'error': error}
+                outcome = f" -> rejected: {error}" if error else ''
+                self.stdout.write(f"  {parser_name:<18}: {seconds * 1000:>9.3f} ms{outcome}")
+            baseline, hardened = (report[name][p]['median_ms'] for p in parsers)
+            if hardened:
+                self.stdout.write(f"  speedup           : {baseline / hardened:.1f}x")
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+            self.stdout.write(f"Report written to {options['output']}")
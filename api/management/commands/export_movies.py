@@ -0,0 +1,71 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.conf import settings
+from api.xml_export import FORMATS, ExportOptions, export
+
+
+class Command(BaseCommand):
+    help = ('Exports the movie catalog to a <movies> XML document (valid against movie_export.xsd) or to NDJSON, '
+            'optionally gzip-compressed and sharded by movie_id range across processes.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output',
+            help='Output path (default: data/export/movies.xml or movies.ndjson); '
+                 'shards get .part001, .part002, ... suffixes.',
+        )
+        parser.add_argument('--format', choices=FORMATS, default='xml', help='Output format (default: xml).')
+        parser.add_argument('--gzip', action='store_true', help='Write gzip-compressed output (adds .gz).')
+        parser.add_argument('--with-credits', action='store_true', help='Include <genres> and <actors>.')
+        parser.add_argument('--with-comments', action='store_true', help='Include the comments of every movie.')
+        parser.add_argument('--with-stats', action='store_true', help='Include watch/comment/rating counters.')
+        parser.add_argument('--validate', action='store_true',
+                            help='Validate every <movie> against movie_export.xsd and skip invalid ones (XML only).')
+        parser.add_argument('--shards', type=int, default=1, help='Split the output into N files by movie_id range.')
+        parser.add_argument('--workers', type=int, default=1, help='Number of export processes (one shard each).')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Movies read per query (default: 5000).')
+
+    def handle(self, *args, **options):
+        if options['shards'] < 1 or options['workers'] < 1 or options['batch_size'] < 1:
+            raise CommandError("--shards, --workers and --batch-size must be positive integers.")
+        if options['validate'] and options['format'] != 'xml':
+            raise CommandError("--validate is only supported for --format xml.")
+
+        output = options['output'] or os.path.join(
+            settings.BASE_DIR, 'data', 'export', f"movies.{options['format']}"
+        )
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+
+        export_options = ExportOptions(
+            fmt=options['format'],
+            use_gzip=options['gzip'],
+            credits=options['with_credits'],
+            comments=options['with_comments'],
+            stats=options['with_stats'],
+            validate=options['validate'],
+            batch_size=options['batch_size'],
+        )
+
+        self.stdout.write(f"Exporting movies as {options['format']} into {options['shards']} file(s)...")
+        start_time = time.perf_counter()
+        results = export(output, shards=options['shards'], workers=options['workers'],
+                         options=export_options)
+        elapsed = time.perf_counter() - start_time
+
+        total_written = total_invalid = total_size = 0
+        for path, written, invalid in results:
+            size = os.path.getsize(path)
+            total_written += written
+            total_invalid += invalid
+            total_size += size
+            self.stdout.write(f"  > {path}: {written} movies ({size / 1024 / 1024:.1f} MB)")
+        if total_invalid:
+            self.stderr.write(self.style.WARNING(f"{total_invalid} movies failed schema validation and were skipped."))
+
+        rate = total_written / elapsed if elapsed else 0.0
+        self.stdout.write(self.style.SUCCESS(
+            f"Exported {total_written} movies ({total_size / 1024 / 1024:.1f} MB on disk) "
+            f"in {elapsed:.2f} seconds ({rate:.0f} movies/sec)."
+        ))
@@ -0,0 +1,63 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.conf import settings
+from api.xml_generator import MAX_PLOT_LENGTH, GeneratorOptions, generate
+
+
+class Command(BaseCommand):
+    help = 'Generates a large, reproducible <movies> XML fixture (e.g. data/large_movies.xml) for load tests.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=5000000, help='Number of movies (default: 5,000,000).')
+        parser.add_argument(
+            '--output', default=os.path.join(settings.BASE_DIR, 'data', 'large_movies.xml'),
+            help='Output path (default: data/large_movies.xml).',
+        )
+        parser.add_argument('--seed', type=int, default=42, help='Random seed; same seed gives the same file.')
+        parser.add_argument('--plot-length', type=int, default=0, help=f'Characters of <plot> text per movie (0: no plot, at most {MAX_PLOT_LENGTH}).')
+        parser.add_argument('--genres', type=int, default=0, help='Maximum <genre> elements per movie (0: no genres).')
+        parser.add_argument('--actors', type=int, default=0, help='<actor> elements per movie (0: no actors).')
+        parser.add_argument('--cdata', action='store_true', help='Wrap <plot> text in CDATA sections.')
+        parser.add_argument('--director', action='store_true', help='Add a <director> element to every movie.')
+        parser.add_argument('--shards', type=int, default=1, help='Split the output into N separate documents.')
+        parser.add_argument('--workers', type=int, default=1, help='Number of generator processes.')
+        parser.add_argument('--gzip', action='store_true', help='Write gzip-compressed output (.xml.gz).')
+
+    def handle(self, *args, **options):
+        if options['count'] < 0 or options['shards'] < 1 or options['workers'] < 1:
+            raise CommandError("--count must not be negative; --shards and --workers must be positive.")
+        if options['plot_length'] < 0 or options['genres'] < 0 or options['actors'] < 0:
+            raise CommandError("--plot-length, --genres and --actors must not be negative.")
+        if options['plot_length'] > MAX_PLOT_LENGTH:
+            raise CommandError(f"--plot-length must not be greater than {MAX_PLOT_LENGTH}.")
+
+        generator_options = GeneratorOptions(
+            plot_length=options['plot_length'],
+            genres=options['genres'],
+            actors=options['actors'],
+            cdata=options['cdata'],
+            director=options['director'],
+        )
+
+        self.stdout.write(f"Generating {options['count']} movies...")
+        start_time = time.perf_counter()
+        paths = generate(
+            options['output'],
+            options['count'],
+            seed=options['seed'],
+            options=generator_options,
+            shards=options['shards'],
+            workers=options['workers'],
+            use_gzip=options['gzip'],
+        )
+        elapsed = time.perf_counter() - start_time
+
+        total_size = sum(os.path.getsize(path) for path in paths)
+        for path in paths:
+            self.stdout.write(f"  > {path}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated {options['count']} movies ({total_size / 1024 / 1024:.1f} MB on disk) "
+            f"in {elapsed:.2f} seconds."
+        ))
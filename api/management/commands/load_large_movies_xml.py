@@ -0,0 +1,166 @@
+import os
+import time
+from contextlib import nullcontext
+
+from django.core.management.base import BaseCommand, CommandError
+from django.conf import settings
+from lxml import etree
+from api.search import deferred_fts_index
+from api.xml_cache import schema_registry
+from api.xml_import import bulk_upsert_movies, movie_row_from_element
+
+# Bu sayıdan sonraki geçersiz <movie> hataları tek tek yazdırılmaz, sadece sayılır
+MAX_REPORTED_ERRORS = 20
+
+
+class Command(BaseCommand):
+    help = ('Streams a multi-movie <movies> XML document (e.g. data/large_movies.xml) into the database '
+            'with constant memory, validating each <movie> against the XSD.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--file', default=os.path.join(settings.BASE_DIR, 'data', 'large_movies.xml'),
+            help='Path of the <movies> document to import.',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=5000,
+            help='Number of movies written per bulk upsert transaction (default: 5000).',
+        )
+        parser.add_argument(
+            '--checkpoint',
+            help='File that records the last committed movie id (default: <file>.checkpoint).',
+        )
+        parser.add_argument(
+            '--resume', action='store_true',
+            help='Skip every movie up to and including the id stored in the checkpoint file.',
+        )
+        parser.add_argument(
+            '--skip-validation', action='store_true',
+            help='Do not validate each <movie> against movie_schema.xsd.',
+        )
+        parser.add_argument(
+            '--live-search-index', action='store_true',
+            help='Keep the full-text search index updated row by row instead of rebuilding it at the end.',
+        )
+
+    def handle(self, *args, **options):
+        xml_file_path = options['file']
+        batch_size = options['batch_size']
+        checkpoint_path = options['checkpoint'] or f"{xml_file_path}.checkpoint"
+        schema_path = os.path.join(settings.BASE_DIR, 'schemas', 'movie_schema.xsd')
+
+        if not os.path.isfile(xml_file_path):
+            raise CommandError(f"XML file does not exist: {xml_file_path}")
+        if batch_size < 1:
+            raise CommandError("--batch-size must be a positive integer.")
+
+        xmlschema = None
+        if not options['skip_validation']:
+            try:
+                xmlschema = schema_registry.get(schema_path)
+            except Exception as e:
+                raise CommandError(f"Failed to parse XSD schema: {e}")
+
+        resume_after = None
+        if options['resume']:
+            resume_after = self._read_checkpoint(checkpoint_path)
+            if resume_after:
+                self.stdout.write(f"Resuming after movie id '{resume_after}'.")
+            else:
+                self.stdout.write(self.style.WARNING("No checkpoint found, starting from the beginning."))
+
+        deferred = nullcontext() if options['live_search_index'] else deferred_fts_index()
+        with deferred:
+            self._import(xml_file_path, batch_size, checkpoint_path, xmlschema, resume_after)
+            rebuild_start = time.perf_counter()
+        if not options['live_search_index']:
+            self.stdout.write(f"Rebuilt the search index in {time.perf_counter() - rebuild_start:.2f} seconds.")
+
+    def _import(self, xml_file_path, batch_size, checkpoint_path, xmlschema, resume_after):
+        loaded_count = 0
+        updated_count = 0
+        error_count = 0
+        skipped_count = 0
+        batch = []
+        start_time = time.perf_counter()
+
+        # Sadece kapanan <movie> etiketleriyle ilgileniyoruz (test_parsing_performance ile aynı yöntem)
+        context = etree.iterparse(xml_file_path, events=('end',), tag='movie', remove_blank_text=True)
+        try:
+            for event, elem in context:
+                movie_id = elem.get('id')
+
+                if resume_after is not None:
+                    skipped_count += 1
+                    if movie_id == resume_after:
+                        resume_after = None
+                elif xmlschema is not None and not xmlschema.validate(elem):
+                    error_count += 1
+                    if error_count <= MAX_REPORTED_ERRORS:
+                        self.stderr.write(self.style.ERROR(
+                            f"  > Invalid movie '{movie_id}': {xmlschema.error_log.last_error}"
+                        ))
+                else:
+                    try:
+                        batch.append(movie_row_from_element(elem))
+                    except ValueError as e:
+                        error_count += 1
+                        if error_count <= MAX_REPORTED_ERRORS:
+                            self.stderr.write(self.style.ERROR(f"  > Skipping movie '{movie_id}': {e}"))
+
+                # Belleği boşaltmak için elemanı ve önceki kardeşlerini temizle
+                elem.clear()
+                while elem.getprevious() is not None:
+                    del elem.getparent()[0]
+
+                if len(batch) >= batch_size:
+                    created, updated = self._commit(batch, checkpoint_path)
+                    loaded_count += created
+                    updated_count += updated
+                    batch = []
+                    self._report_progress(loaded_count + updated_count, start_time)
+
+            if batch:
+                created, updated = self._commit(batch, checkpoint_path)
+                loaded_count += created
+                updated_count += updated
+        except etree.XMLSyntaxError as e:
+            raise CommandError(
+                f"XML syntax error: {e}. Committed movies are recorded in {checkpoint_path}; rerun with --resume."
+            )
+        finally:
+            del context
+
+        if resume_after is not None:
+            self.stderr.write(self.style.WARNING(
+                f"Checkpoint movie id '{resume_after}' was not found in the document; nothing was imported."
+            ))
+
+        elapsed = time.perf_counter() - start_time
+        written = loaded_count + updated_count
+        rate = written / elapsed if elapsed else 0.0
+        self.stdout.write(self.style.SUCCESS(
+            f"\nFinished. {loaded_count} movies created, {updated_count} movies updated, "
+            f"{error_count} movies failed, {skipped_count} skipped."
+        ))
+        self.stdout.write(f"Wrote {written} movies in {elapsed:.2f} seconds ({rate:.0f} movies/sec).")
+
+    def _commit(self, batch, checkpoint_path):
+        """Writes the batch, then records its last movie id so a crash can resume after it."""
+        result = bulk_upsert_movies(batch)
+        tmp_path = f"{checkpoint_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(batch[-1]['movie_id'])
+        os.replace(tmp_path, checkpoint_path)
+        return result
+
+    def _read_checkpoint(self, checkpoint_path):
+        if not os.path.isfile(checkpoint_path):
+            return None
+        with open(checkpoint_path, encoding='utf-8') as f:
+            return f.read().strip() or None
+
+    def _report_progress(self, written, start_time):
+        elapsed = time.perf_counter() - start_time
+        rate = written / elapsed if elapsed else 0.0
+        self.stdout.write(f"  > {written} movies written ({rate:.0f} movies/sec)")
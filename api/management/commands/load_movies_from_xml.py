@@ -1,103 +1,114 @@
 import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
 from django.core.management.base import BaseCommand, CommandError
 from django.conf import settings
-from lxml import etree
-from api.models import Movie 
+from django.db import connections
+from api.xml_cache import schema_registry
+from api.xml_import import bulk_upsert_movies, init_worker, parse_movie_file
 
 class Command(BaseCommand):
     help = 'Loads movies from XML files in data/movies/ into the database, validating against XSD.'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=1,
+            help='Number of processes used to parse and validate files (default: 1, no pool).',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help='Number of movies written per bulk upsert transaction (default: 500).',
+        )
+        parser.add_argument(
+            '--directory', default=os.path.join(settings.BASE_DIR, 'data', 'movies'),
+            help='Directory containing one <movie> XML document per file.',
+        )
+
     def handle(self, *args, **options):
-        # Dosya yollarını settings.py'deki BASE_DIR'e göre dinamik olarak al
-        movies_data_path = os.path.join(settings.BASE_DIR, 'data', 'movies')
+        movies_data_path = options['directory']
         schema_path = os.path.join(settings.BASE_DIR, 'schemas', 'movie_schema.xsd')
+        workers = options['workers']
+        batch_size = options['batch_size']
 
         # Yolların var olup olmadığını kontrol et
         if not os.path.isdir(movies_data_path):
             raise CommandError(f"Movies data directory does not exist: {movies_data_path}")
         if not os.path.isfile(schema_path):
             raise CommandError(f"Movie XSD schema file does not exist: {schema_path}")
+        if workers < 1 or batch_size < 1:
+            raise CommandError("--workers and --batch-size must be positive integers.")
 
-        # XSD şemasını bir kere yükle ve ayrıştır
+        # Şemanın derlenebildiğini ana süreçte bir kere kontrol et
         try:
-            xsd_doc = etree.parse(schema_path)
-            xmlschema = etree.XMLSchema(xsd_doc)
+            schema_registry.get(schema_path)
             self.stdout.write(self.style.SUCCESS(f"Successfully loaded XSD schema from {schema_path}"))
         except Exception as e:
             raise CommandError(f"Failed to parse XSD schema: {e}")
 
+        file_paths = sorted(
+            os.path.join(movies_data_path, filename)
+            for filename in os.listdir(movies_data_path)
+            if filename.endswith(".xml")
+        )
+        total = len(file_paths)
+        self.stdout.write(f"Processing {total} XML files from {movies_data_path} with {workers} worker(s)...")
+
         # İstatistikler için sayaçlar
         loaded_count = 0
         updated_count = 0
         error_count = 0
+        processed = 0
+        batch = []
+        start_time = time.perf_counter()
 
-        self.stdout.write(f"Starting to process XML files from {movies_data_path}...")
+        executor = None
+        if workers > 1:
+            # Fork edilen süreçlere açık SQLite bağlantısı taşınmasın
+            connections.close_all()
+            executor = ProcessPoolExecutor(
+                max_workers=workers, initializer=init_worker, initargs=(schema_path,)
+            )
+            chunksize = max(1, min(256, total // (workers * 4) or 1))
+            results = executor.map(parse_movie_file, file_paths, chunksize=chunksize)
+        else:
+            init_worker(schema_path)
+            results = map(parse_movie_file, file_paths)
 
-        # data/movies klasöründeki tüm dosyaları gez
-        for filename in os.listdir(movies_data_path):
-            if filename.endswith(".xml"):
-                file_path = os.path.join(movies_data_path, filename)
-                self.stdout.write(f"--> Processing file: {filename}")
-                
-                try:
-                    # XML dosyasını ayrıştır
-                    xml_doc = etree.parse(file_path)
-                    
-                    # 1. XSD ile doğrulama yap
-                    xmlschema.assertValid(xml_doc) # Hata varsa exception fırlatır
-                    self.stdout.write(self.style.SUCCESS(f"  > XML is valid."))
-
-                    # Kök elemanı al
-                    root = xml_doc.getroot()
+        try:
+            for file_path, row, error in results:
+                processed += 1
+                if error:
+                    error_count += 1
+                    self.stderr.write(self.style.ERROR(f"  > {os.path.basename(file_path)}: {error}"))
+                else:
+                    batch.append(row)
 
-                    # 2. Veriyi çek
-                    movie_id = root.get('id')
-                    title = root.findtext('title')
-                    year_str = root.findtext('year')
-                    year = int(year_str) if year_str and year_str.isdigit() else None
-                    
-                    director = root.findtext('director')
-                    plot = root.findtext('plot') # CDATA içeriği otomatik olarak alınır
-                    poster_url = root.findtext('posterUrl')
-                    rating_str = root.findtext('rating')
-                    rating = float(rating_str) if rating_str else None
-                    
-                    if not movie_id or not title:
-                        self.stderr.write(self.style.ERROR(f"  > Skipping file due to missing movie ID or title."))
-                        error_count += 1
-                        continue
+                if len(batch) >= batch_size:
+                    created, updated = bulk_upsert_movies(batch)
+                    loaded_count += created
+                    updated_count += updated
+                    batch = []
+                    self._report_progress(processed, total, start_time)
 
-                    # 3. Django modeline kaydetme veya güncelleme
-                    movie_obj, created = Movie.objects.update_or_create(
-                        movie_id=movie_id,
-                        defaults={
-                            'title': title,
-                            'year': year,
-                            'director': director,
-                            'plot': plot,
-                            'poster_url': poster_url,
-                            'rating': rating,
-                        }
-                    )
+            if batch:
+                created, updated = bulk_upsert_movies(batch)
+                loaded_count += created
+                updated_count += updated
+        finally:
+            if executor is not None:
+                executor.shutdown()
 
-                    if created:
-                        loaded_count += 1
-                        self.stdout.write(self.style.SUCCESS(f"  > Created new movie in DB: '{title}'"))
-                    else:
-                        updated_count += 1
-                        self.stdout.write(self.style.WARNING(f"  > Updated existing movie in DB: '{title}'"))
+        elapsed = time.perf_counter() - start_time
+        rate = processed / elapsed if elapsed else 0.0
 
-                except etree.DocumentInvalid as e:
-                    self.stderr.write(self.style.ERROR(f"  > XML VALIDATION ERROR: {e}"))
-                    error_count += 1
-                except etree.XMLSyntaxError as e:
-                    self.stderr.write(self.style.ERROR(f"  > XML SYNTAX ERROR: {e}"))
-                    error_count += 1
-                except Exception as e:
-                    self.stderr.write(self.style.ERROR(f"  > An unexpected error occurred: {e}"))
-                    error_count += 1
-        
         # Sonuçları raporla
         self.stdout.write(self.style.SUCCESS(
             f"\nFinished. {loaded_count} movies created, {updated_count} movies updated, {error_count} files failed."
-        ))
\ No newline at end of file
+        ))
+        self.stdout.write(f"Processed {processed} files in {elapsed:.2f} seconds ({rate:.0f} files/sec).")
+
+    def _report_progress(self, processed, total, start_time):
+        elapsed = time.perf_counter() - start_time
+        rate = processed / elapsed if elapsed else 0.0
+        self.stdout.write(f"  > {processed}/{total} files ({rate:.0f} files/sec)")
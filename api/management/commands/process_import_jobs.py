@@ -0,0 +1,67 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+from api.import_jobs import claim_next_job, process_job
+from api.models import ImportJob
+from api.tmdb import RateLimiter, TMDBClient
+
+
+class Command(BaseCommand):
+    help = 'Processes queued TMDB batch import jobs (created via POST /api/v1/import/movies/).'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=4,
+            help='Number of concurrent TMDB lookups (default: 4).',
+        )
+        parser.add_argument(
+            '--rate', type=float, default=settings.TMDB_RATE_LIMIT,
+            help=f'Maximum TMDB requests per second (default: {settings.TMDB_RATE_LIMIT}).',
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Process the jobs that are currently queued, then exit instead of polling.',
+        )
+        parser.add_argument(
+            '--poll-interval', type=float, default=5.0,
+            help='Seconds to wait between queue polls when idle (default: 5).',
+        )
+        parser.add_argument(
+            '--requeue-running', action='store_true',
+            help='Put jobs left "running" by a crashed worker back in the queue before starting.',
+        )
+
+    def handle(self, *args, **options):
+        if options['workers'] < 1:
+            raise CommandError("--workers must be a positive integer.")
+        if options['rate'] <= 0:
+            raise CommandError("--rate must be a positive number.")
+        if not settings.TMDB_API_KEY:
+            raise CommandError("TMDB API key is not configured (TMDB_API_KEY).")
+
+        if options['requeue_running']:
+            # Tamamlanmış kalemler tekrar işlenmez, iş kaldığı yerden devam eder
+            requeued = ImportJob.objects.filter(status=ImportJob.STATUS_RUNNING).update(status=ImportJob.STATUS_PENDING)
+            self.stdout.write(f"Requeued {requeued} running job(s).")
+
+        client = TMDBClient(pool_size=options['workers'], rate_limiter=RateLimiter(options['rate']))
+        try:
+            while True:
+                job = claim_next_job()
+                if job is None:
+                    if options['once']:
+                        break
+                    time.sleep(options['poll_interval'])
+                    continue
+
+                start_time = time.perf_counter()
+                process_job(job, client, workers=options['workers'])
+                counts = dict(job.items.values_list('status').annotate(n=Count('id')).order_by())
+                summary = ', '.join(f"{n} {name}" for name, n in sorted(counts.items()))
+                self.stdout.write(self.style.SUCCESS(
+                    f"Job #{job.pk} finished in {time.perf_counter() - start_time:.2f} seconds: {summary or 'no titles'}."
+                ))
+        finally:
+            client.close()
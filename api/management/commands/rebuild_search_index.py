@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from api.search import rebuild_fts_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the SQLite FTS5 movie search tables (run after VACUUM).'
+
+    def handle(self, *args, **options):
+        tables = rebuild_fts_index()
+        if not tables:
+            self.stdout.write(self.style.WARNING("No FTS5 search tables found; nothing to rebuild."))
+            return
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {', '.join(tables)}."))
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from api.models import Movie
+from api.movie_stats import recompute_movie_stats
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the denormalized watch/comment/user-rating counters of every movie.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=10000,
+            help='Number of movies updated per transaction (default: 10000).',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError("--batch-size must be a positive integer.")
+
+        updated = 0
+        last_id = None
+        # movie_id üzerinden keyset ile ilerle; her batch ayrı bir transaction'da güncellenir
+        while True:
+            ids = Movie.objects.order_by('movie_id')
+            if last_id is not None:
+                ids = ids.filter(movie_id__gt=last_id)
+            ids = list(ids.values_list('movie_id', flat=True)[:batch_size])
+            if not ids:
+                break
+
+            with transaction.atomic():
+                updated += recompute_movie_stats(Movie.objects.filter(movie_id__gte=ids[0], movie_id__lte=ids[-1]))
+            last_id = ids[-1]
+
+        self.stdout.write(self.style.SUCCESS(f"Recomputed counters of {updated} movies."))
@@ -1,59 +1,299 @@
+import json
+import math
 import os
+import statistics
+import subprocess
+import sys
 import time
-from django.core.management.base import BaseCommand
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+from django.core.management.base import BaseCommand, CommandError
 from django.conf import settings
 from lxml import etree
 
+# resource ve /proc sadece POSIX'te var; psutil kuruluysa her platformda RSS ondan okunur.
+# İkisi de yoksa (ör. psutil'siz Windows) sadece tracemalloc tepe değeri raporlanır.
+try:
+    import resource
+except ImportError:
+    resource = None
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+PULL_PARSER_CHUNK_SIZE = 64 * 1024
+
+
+# --- Parsing stratejileri ---
+# Her strateji dosya yolunu alır ve bulduğu <movie> sayısını döner.
+
+def parse_dom(path):
+    """DOM-style: tüm dosya belleğe yüklenir."""
+    root = etree.parse(path).getroot()
+    return len(root.findall('movie'))
+
+
+def parse_dom_huge_tree(path):
+    """DOM-style, libxml2'nin derinlik/boyut güvenlik sınırları kapalı (huge_tree)."""
+    parser = etree.XMLParser(huge_tree=True)
+    root = etree.parse(path, parser).getroot()
+    return len(root.findall('movie'))
+
+
+def _clear(elem):
+    # Belleği boşaltmak için elemanı ve önceki kardeşlerini temizle
+    elem.clear()
+    while elem.getprevious() is not None:
+        del elem.getparent()[0]
+
+
+def parse_iterparse_tag(path):
+    """iterparse, sadece 'movie' etiketleri için olay üretir."""
+    count = 0
+    for event, elem in etree.iterparse(path, events=('end',), tag='movie'):
+        count += 1
+        _clear(elem)
+    return count
+
+
+def parse_iterparse_all(path):
+    """iterparse, tag filtresi olmadan; her elemanın 'end' olayı Python'a gelir."""
+    count = 0
+    for event, elem in etree.iterparse(path, events=('end',)):
+        if elem.tag == 'movie':
+            count += 1
+            _clear(elem)
+    return count
+
+
+def parse_pull_parser(path):
+    """XMLPullParser'a dosya parça parça beslenir."""
+    parser = etree.XMLPullParser(events=('end',), tag='movie')
+    count = 0
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(PULL_PARSER_CHUNK_SIZE)
+            if not chunk:
+                break
+            parser.feed(chunk)
+            for event, elem in parser.read_events():
+                count += 1
+                _clear(elem)
+    parser.close()
+    return count
+
+
+class _MovieCountingTarget:
+    """SAX benzeri parser target: ağaç kurulmaz, sadece olaylar sayılır."""
+
+    def __init__(self):
+        self.count = 0
+
+    def start(self, tag, attrib):
+        pass
+
+    def end(self, tag):
+        if tag == 'movie':
+            self.count += 1
+
+    def data(self, data):
+        pass
+
+    def close(self):
+        return self.count
+
+
+def parse_sax_target(path):
+    parser = etree.XMLParser(target=_MovieCountingTarget())
+    return etree.parse(path, parser)
+
+
+STRATEGIES = {
+    'dom': parse_dom,
+    'dom_huge_tree': parse_dom_huge_tree,
+    'iterparse_tag': parse_iterparse_tag,
+    'iterparse_all': parse_iterparse_all,
+    'pull_parser': parse_pull_parser,
+    'sax_target': parse_sax_target,
+}
+
+
+def _current_rss_kb():
+    """Current RSS in KB, or None when it cannot be measured on this platform."""
+    if psutil is not None:
+        return psutil.Process().memory_info().rss // 1024
+    if resource is None:
+        return None
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * resource.getpagesize() // 1024
+    except OSError:
+        return None
+
+
+def _peak_rss_kb():
+    """Peak RSS of this process in KB, or None when it cannot be measured on this platform."""
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # macOS ru_maxrss'i bayt, Linux KB cinsinden verir
+        return peak // 1024 if sys.platform == 'darwin' else peak
+    if psutil is not None:
+        # Windows: peak_wset tepe çalışma kümesidir
+        info = psutil.Process().memory_info()
+        return getattr(info, 'peak_wset', info.rss) // 1024
+    return None
+
+
+def _percentile(values, fraction):
+    # nearest-rank yöntemi
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def run_strategy(name, path, repeat, warmup):
+    """
+    Runs one strategy `warmup` + `repeat` times and returns its timing and memory figures.
+    Meant to run in a fresh process so that peak RSS belongs to this strategy only.
+    """
+    strategy = STRATEGIES[name]
+    start_rss_kb = _current_rss_kb()
+
+    for _ in range(warmup):
+        strategy(path)
+
+    timings = []
+    count = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        count = strategy(path)
+        timings.append(time.perf_counter() - start)
+
+    # tracemalloc ölçümü zamanlamayı bozmasın diye ayrı bir çalıştırmada yapılır.
+    # Not: lxml'in C tarafındaki bellek kullanımı tracemalloc'a görünmez, RSS'e görünür.
+    tracemalloc.start()
+    strategy(path)
+    tracemalloc_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    peak_rss_kb = _peak_rss_kb()
+    return {
+        'count': count,
+        'runs': timings,
+        'min': min(timings),
+        'median': statistics.median(timings),
+        'p95': _percentile(timings, 0.95),
+        'tracemalloc_peak_kb': tracemalloc_peak // 1024,
+        'peak_rss_kb': peak_rss_kb,
+        'peak_rss_delta_kb': peak_rss_kb - start_rss_kb if None not in (peak_rss_kb, start_rss_kb) else None,
+    }
+
+
 class Command(BaseCommand):
-    help = 'Compares the performance of DOM-style vs event-driven (iterparse) XML parsing on a large file.'
+    help = ('Benchmarks DOM-style vs event-driven XML parsing strategies on a large file '
+            'and optionally fails on regressions against a previous JSON result.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--file', default=os.path.join(settings.BASE_DIR, 'data', 'large_movies.xml'),
+            help='XML file to parse (default: data/large_movies.xml).',
+        )
+        parser.add_argument('--repeat', type=int, default=5, help='Measured runs per strategy (default: 5).')
+        parser.add_argument('--warmup', type=int, default=1, help='Unmeasured runs per strategy (default: 1).')
+        parser.add_argument(
+            '--strategies', default=','.join(STRATEGIES),
+            help=f"Comma separated strategies to run (default: all of {', '.join(STRATEGIES)}).",
+        )
+        parser.add_argument('--output', help='Write the results as JSON to this file.')
+        parser.add_argument('--baseline', help='JSON result of a previous run to compare against.')
+        parser.add_argument(
+            '--threshold', type=float, default=10.0,
+            help='Fail if a median is more than this many percent slower than the baseline (default: 10).',
+        )
+        parser.add_argument(
+            '--no-isolate', action='store_true',
+            help='Run all strategies in this process (faster, but peak RSS is no longer per strategy).',
+        )
 
     def handle(self, *args, **options):
-        xml_file_path = os.path.join(settings.BASE_DIR, 'data', 'large_movies.xml')
+        xml_file_path = options['file']
         if not os.path.exists(xml_file_path):
             self.stdout.write(self.style.ERROR("large_movies.xml not found. Please run generate_large_xml.py first."))
             return
 
-        # --- 1. DOM-Style Parsing (Tüm dosyayı belleğe yükle) ---
-        self.stdout.write(self.style.WARNING("--- Testing DOM-style parsing (etree.parse) ---"))
-        start_time = time.time()
-        
-        try:
-            tree = etree.parse(xml_file_path)
-            root = tree.getroot()
-            movie_count_dom = len(root.findall('movie'))
-            end_time = time.time()
-            
-            self.stdout.write(self.style.SUCCESS(f"Finished in {end_time - start_time:.4f} seconds."))
-            self.stdout.write(f"Found {movie_count_dom} movies.")
-            # Bu noktada, tüm XML ağacı bellektedir.
-        except Exception as e:
-            self.stderr.write(self.style.ERROR(f"An error occurred: {e}"))
+        names = [name.strip() for name in options['strategies'].split(',') if name.strip()]
+        unknown = [name for name in names if name not in STRATEGIES]
+        if unknown:
+            raise CommandError(f"Unknown strategies: {', '.join(unknown)}")
+        if options['repeat'] < 1 or options['warmup'] < 0:
+            raise CommandError("--repeat must be positive and --warmup must not be negative.")
+
+        results = {}
+        for name in names:
+            self.stdout.write(self.style.WARNING(f"--- Testing {name} ---"))
+            args = (name, xml_file_path, options['repeat'], options['warmup'])
+            if options['no_isolate']:
+                result = run_strategy(*args)
+            else:
+                # Her strateji temiz bir süreçte çalışır, böylece peak RSS birbirine karışmaz
+                with ProcessPoolExecutor(max_workers=1) as executor:
+                    result = executor.submit(run_strategy, *args).result()
+            results[name] = result
+
+            peak_rss = f"{result['peak_rss_kb']} KB" if result['peak_rss_kb'] is not None else 'n/a'
+            self.stdout.write(self.style.SUCCESS(
+                f"min {result['min']:.4f}s  median {result['median']:.4f}s  p95 {result['p95']:.4f}s  "
+                f"tracemalloc peak {result['tracemalloc_peak_kb']} KB  peak RSS {peak_rss}"
+            ))
+            self.stdout.write(f"Found {result['count']} movies.")
+
+        report = {
+            'file': os.path.abspath(xml_file_path),
+            'file_size': os.path.getsize(xml_file_path),
+            'commit': self._git_commit(),
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'repeat': options['repeat'],
+            'warmup': options['warmup'],
+            'strategies': results,
+        }
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+            self.stdout.write(f"Results written to {options['output']}")
+
+        if options['baseline']:
+            self._compare(report, options['baseline'], options['threshold'])
+
+    def _compare(self, report, baseline_path, threshold):
+        with open(baseline_path, encoding='utf-8') as f:
+            baseline = json.load(f)
 
         self.stdout.write("-" * 50)
+        regressions = []
+        for name, result in report['strategies'].items():
+            previous = baseline.get('strategies', {}).get(name)
+            if not previous:
+                continue
+            change = (result['median'] - previous['median']) / previous['median'] * 100
+            line = f"{name}: {previous['median']:.4f}s -> {result['median']:.4f}s ({change:+.1f}%)"
+            if change > threshold:
+                regressions.append(line)
+                self.stdout.write(self.style.ERROR(line))
+            else:
+                self.stdout.write(line)
+
+        if regressions:
+            raise CommandError(
+                f"{len(regressions)} strategies regressed by more than {threshold}%: " + '; '.join(regressions)
+            )
 
-        # --- 2. Event-Driven/Pull Parsing (iterparse - dosyayı satır satır oku) ---
-        self.stdout.write(self.style.WARNING("--- Testing event-driven parsing (etree.iterparse) ---"))
-        start_time = time.time()
-        
-        movie_count_iter = 0
+    def _git_commit(self):
         try:
-            # iterparse ile 'end' olaylarını (bir etiket kapandığında) dinle
-            # Sadece 'movie' etiketleri bittiğinde ilgileniyoruz
-            context = etree.iterparse(xml_file_path, events=('end',), tag='movie')
-            
-            for event, elem in context:
-                movie_count_iter += 1
-                # Belleği boşaltmak için elemanı temizle
-                elem.clear()
-                # Kök elemanın referansını da temizle
-                while elem.getprevious() is not None:
-                    del elem.getparent()[0]
-
-            del context
-            end_time = time.time()
-
-            self.stdout.write(self.style.SUCCESS(f"Finished in {end_time - start_time:.4f} seconds."))
-            self.stdout.write(f"Found {movie_count_iter} movies.")
-            # Bu noktada, XML ağacının çok küçük bir kısmı bellekte tutulmuştur.
-        except Exception as e:
-            self.stderr.write(self.style.ERROR(f"An error occurred: {e}"))
\ No newline at end of file
+            return subprocess.run(
+                ['git', 'rev-parse', 'HEAD'], cwd=settings.BASE_DIR,
+                capture_output=True, text=True, check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
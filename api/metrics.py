@@ -0,0 +1,454 @@
+"""
+İstek başına performans ölçümleri ve Prometheus metin formatında dışa aktarım.
+
+Her süreç kendi histogram/sayaçlarını bellekte tutar. METRICS_DIR ayarlıysa
+süreçler anlık görüntülerini (snapshot) bu dizine `<pid>.json` olarak yazar;
+/metrics isteğine hangi worker cevap verirse versin tüm süreçlerin değerleri
+toplanarak döner. Ölen süreçlerin dosyaları toplama sırasında silinir.
+"""
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+try:
+    import psutil
+except ImportError:  # opsiyonel
+    psutil = None
+
+logger = logging.getLogger(__name__)
+
+PREFIX = 'movieapp_'
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 500)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+
+class Registry:
+    """Thread-safe store of counters and histograms, keyed by metric name and label values."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics = {}
+
+    def _metric(self, name, kind, help_text, labels, buckets=None):
+        metric = self._metrics.get(name)
+        if metric is None:
+            metric = self._metrics[name] = {
+                'type': kind, 'help': help_text, 'buckets': list(buckets or ()), 'values': {},
+            }
+        return metric['values'], tuple(sorted(labels.items()))
+
+    def inc(self, name, help_text, amount=1, **labels):
+        with self._lock:
+            values, key = self._metric(name, 'counter', help_text, labels)
+            values[key] = values.get(key, 0) + amount
+
+    def observe(self, name, help_text, value, buckets=LATENCY_BUCKETS, **labels):
+        with self._lock:
+            values, key = self._metric(name, 'histogram', help_text, labels, buckets)
+            entry = values.get(key)
+            if entry is None:
+                entry = values[key] = {'buckets': [0] * len(buckets), 'sum': 0.0, 'count': 0}
+            for i, bound in enumerate(buckets):
+                if value <= bound:
+                    entry['buckets'][i] += 1
+            entry['sum'] += value
+            entry['count'] += 1
+
+    def clear(self):
+        with self._lock:
+            self._metrics.clear()
+
+    def snapshot(self):
+        """Returns a JSON-serializable copy of every metric, including the collector values."""
+        with self._lock:
+            snapshot = {
+                name: {**metric, 'values': [[list(key), _copy(value)] for key, value in metric['values'].items()]}
+                for name, metric in self._metrics.items()
+            }
+        for name, kind, help_text, value, labels in _collect():
+            metric = snapshot.setdefault(name, {'type': kind, 'help': help_text, 'buckets': [], 'values': []})
+            metric['values'].append([sorted(labels.items()), value])
+        return snapshot
+
+
+def _copy(value):
+    return {**value, 'buckets': list(value['buckets'])} if isinstance(value, dict) else value
+
+
+registry = Registry()
+
+
+def _collect():
+    """Yields (name, type, help, value, labels) of the in-process caches' own counters."""
+    from .authentication import token_cache
+    from .movie_cache import fragment_cache
+    from .parsers import validation_stats
+    from .xml_cache import schema_registry, xslt_registry
+    from .xpath_catalog import xpath_cache
+
+    caches = {'token_auth': token_cache.stats(), 'xpath': xpath_cache.stats(),
+              'xslt': xslt_registry.stats(), 'xsd': schema_registry.stats(), 'movie_xml': fragment_cache.stats()}
+    for cache, stats in caches.items():
+        yield f'{PREFIX}cache_hits_total', 'counter', 'In-process cache hits.', stats['hits'], {'cache': cache}
+        yield f'{PREFIX}cache_misses_total', 'counter', 'In-process cache misses.', stats['misses'], {'cache': cache}
+        if 'size' in stats:
+            yield f'{PREFIX}cache_entries', 'gauge', 'Entries in in-process caches.', stats['size'], {'cache': cache}
+
+    validation = validation_stats.stats()
+    yield (f'{PREFIX}xsd_validations_total', 'counter', 'XSD validations of request bodies.',
+           validation['count'], {})
+    yield (f'{PREFIX}xsd_validation_failures_total', 'counter', 'Request bodies that failed XSD validation.',
+           validation['invalid'], {})
+    yield (f'{PREFIX}xsd_validation_seconds_total', 'counter', 'Time spent validating request bodies.',
+           validation['total_ms'] / 1000, {})
+
+
+# --- İstek bağlamı ---
+# Bir isteğin süre dökümü (DB, XSLT, parse, render) yavaş istek loglarında kullanılır.
+
+_current = ContextVar('request_metrics', default=None)
+
+TIMERS = {
+    'xslt': (f'{PREFIX}xslt_transform_seconds', 'XSLT transform time.'),
+    'parse': (f'{PREFIX}xml_parse_seconds', 'Request body parse (and validation) time.'),
+    'render': (f'{PREFIX}xml_render_seconds', 'Response render time.'),
+}
+
+
+@contextmanager
+def timed(kind, **labels):
+    """Measures the block into the `kind` histogram (see TIMERS) and the current request's breakdown."""
+    name, help_text = TIMERS[kind]
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        registry.observe(name, help_text, elapsed, **labels)
+        current = _current.get()
+        if current is not None:
+            current[kind] = current.get(kind, 0.0) + elapsed
+
+
+def count_query(execute, sql, params, many, context):
+    """Execute wrapper adding each query to the current request's breakdown (see install_query_counter)."""
+    current = _current.get()
+    if current is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        current['db_queries'] += 1
+        current['db'] += time.perf_counter() - start
+
+
+def install_query_counter(connection):
+    """
+    Installs count_query on a connection once, when it is opened (connection_created).
+    Bağlantı nesneleri thread başınadır; ASGI'de sorgular sync_to_async thread'lerinde
+    çalıştığı için sayaç istek başına değil bağlantı başına kurulur, isteği ContextVar bulur.
+    """
+    if count_query not in connection.execute_wrappers:
+        # En içe: geçici execute_wrapper() blokları listenin sonunu ekleyip çıkarır
+        connection.execute_wrappers.insert(0, count_query)
+
+
+def _view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match is not None else 'unmatched'
+
+
+class MetricsMiddleware:
+    """
+    Records latency, DB query count/time, render time and response size per view.
+    Requests slower than METRICS_SLOW_REQUEST_SECONDS are logged with their breakdown.
+    Hem WSGI hem ASGI altında çalışır; async view'lar thread'e itilmez.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        current, start = {'db_queries': 0, 'db': 0.0}, time.perf_counter()
+        token = _current.set(current)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._finish(request, response, current, start)
+
+    async def __acall__(self, request):
+        current, start = {'db_queries': 0, 'db': 0.0}, time.perf_counter()
+        token = _current.set(current)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._finish(request, response, current, start)
+
+    def _finish(self, request, response, current, start):
+        if not response.streaming:
+            self._record(request, response, current, time.perf_counter() - start, len(response.content))
+            return response
+
+        # Akış yanıtlarında süre ve boyut, gövde tükenince ya da yanıt kapatılınca kaydedilir;
+        # akış sırasında yapılan sorgular/XSLT de bu isteğe sayılır.
+        def record(size):
+            self._record(request, response, current, time.perf_counter() - start, size)
+
+        stream_class = _AsyncMeteredStream if response.is_async else _MeteredStream
+        response.streaming_content = stream_class(response.streaming_content, current, record)
+        return response
+
+    def _record(self, request, response, current, elapsed, size):
+        view = _view_name(request)
+        labels = {'view': view, 'method': request.method}
+        registry.observe(f'{PREFIX}http_request_duration_seconds', 'Request latency by view.', elapsed,
+                         status=str(response.status_code), **labels)
+        registry.observe(f'{PREFIX}db_queries_per_request', 'Database queries per request.',
+                         current['db_queries'], buckets=QUERY_COUNT_BUCKETS, **labels)
+        registry.observe(f'{PREFIX}db_query_seconds', 'Database time per request.', current['db'], **labels)
+        registry.observe(f'{PREFIX}http_response_size_bytes', 'Response body size by view.', size,
+                         buckets=SIZE_BUCKETS, **labels)
+
+        if elapsed >= settings.METRICS_SLOW_REQUEST_SECONDS:
+            breakdown = ' '.join(
+                f'{kind}={current[kind] * 1000:.1f}ms' for kind in ('db', *TIMERS) if kind in current
+            )
+            logger.warning(
+                'Slow request: %s %s (%s) %s in %.1f ms, %d queries, %s',
+                request.method, request.get_full_path(), view, response.status_code, elapsed * 1000,
+                current['db_queries'], breakdown,
+            )
+
+        flush_if_due()
+
+    def process_template_response(self, request, response):
+        # DRF yanıtları bu adımdan hemen sonra render edilir
+        start = time.perf_counter()
+        current = _current.get()
+        view = _view_name(request)
+
+        def record_render(rendered):
+            elapsed = time.perf_counter() - start
+            registry.observe(TIMERS['render'][0], TIMERS['render'][1], elapsed, view=view)
+            if current is not None:
+                current['render'] = current.get('render', 0.0) + elapsed
+
+        response.add_post_render_callback(record_render)
+        return response
+
+
+class _MeteredStream:
+    """
+    Wraps a response's streaming content: counts its size, attributes work done while
+    producing chunks to the request and calls `record(size)` once, when the stream is
+    exhausted or closed (the handler closes the response, also on client disconnect).
+    """
+
+    def __init__(self, chunks, current, record):
+        self._chunks = chunks
+        self._current = current
+        self._record = record
+        self._size = 0
+        self._done = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        token = _current.set(self._current)
+        try:
+            chunk = next(self._chunks)
+        except StopIteration:
+            self._finish()
+            raise
+        finally:
+            _current.reset(token)
+        self._size += len(chunk)
+        return chunk
+
+    def _finish(self):
+        if not self._done:
+            self._done = True
+            self._record(self._size)
+
+    def close(self):
+        # Asıl üreticinin close()'u Django tarafından ayrıca çağrılır (_resource_closers)
+        self._finish()
+
+
+class _AsyncMeteredStream(_MeteredStream):
+    """Async counterpart of _MeteredStream for async streaming responses (ASGI)."""
+
+    # iter() TypeError verince Django yanıtı async olarak işaretler
+    __iter__ = __next__ = None
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        token = _current.set(self._current)
+        try:
+            chunk = await anext(self._chunks)
+        except StopAsyncIteration:
+            self._finish()
+            raise
+        finally:
+            _current.reset(token)
+        self._size += len(chunk)
+        return chunk
+
+
+# --- Süreçler arası toplama ---
+
+_last_flush = 0.0
+
+
+def _snapshot_path(pid=None):
+    return os.path.join(settings.METRICS_DIR, f'{pid or os.getpid()}.json')
+
+
+def flush():
+    """Writes this process' snapshot to METRICS_DIR (no-op when it is not set)."""
+    global _last_flush
+    if not settings.METRICS_DIR:
+        return
+    os.makedirs(settings.METRICS_DIR, exist_ok=True)
+    # Yarım yazılmış dosya okunmasın diye önce geçici dosyaya yazılır
+    fd, tmp_path = tempfile.mkstemp(dir=settings.METRICS_DIR, suffix='.tmp')
+    with os.fdopen(fd, 'w') as f:
+        json.dump(registry.snapshot(), f)
+    os.replace(tmp_path, _snapshot_path())
+    _last_flush = time.monotonic()
+
+
+def flush_if_due():
+    if settings.METRICS_DIR and time.monotonic() - _last_flush >= settings.METRICS_FLUSH_INTERVAL:
+        flush()
+
+
+def _pid_alive(pid):
+    if psutil is not None:
+        return psutil.pid_exists(pid)
+    if os.name == 'nt':
+        # Windows'ta os.kill(pid, 0) sinyal göndermez, süreci sonlandırır
+        return _windows_pid_alive(pid)
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _windows_pid_alive(pid):
+    import ctypes
+    from ctypes import wintypes
+
+    PROCESS_QUERY_LIMITED_INFORMATION, STILL_ACTIVE, ERROR_ACCESS_DENIED = 0x1000, 259, 5
+    kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
+    handle = kernel32.OpenProcess(PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+    if not handle:
+        # Erişim reddi sürecin var olduğunu gösterir
+        return ctypes.get_last_error() == ERROR_ACCESS_DENIED
+    try:
+        exit_code = wintypes.DWORD()
+        if not kernel32.GetExitCodeProcess(handle, ctypes.byref(exit_code)):
+            return True
+        return exit_code.value == STILL_ACTIVE
+    finally:
+        kernel32.CloseHandle(handle)
+
+
+def _snapshots():
+    """Yields the snapshots of every live process (this one from memory)."""
+    yield registry.snapshot()
+    if not settings.METRICS_DIR or not os.path.isdir(settings.METRICS_DIR):
+        return
+    for filename in os.listdir(settings.METRICS_DIR):
+        name, ext = os.path.splitext(filename)
+        if ext != '.json' or not name.isdigit() or int(name) == os.getpid():
+            continue
+        path = os.path.join(settings.METRICS_DIR, filename)
+        if not _pid_alive(int(name)):
+            os.remove(path)
+            continue
+        try:
+            with open(path) as f:
+                yield json.load(f)
+        except (OSError, ValueError):
+            continue
+
+
+def aggregate():
+    """Sums the snapshots of all processes into {name: metric} with {labels: value} values."""
+    result = {}
+    for snapshot in _snapshots():
+        for name, metric in snapshot.items():
+            target = result.setdefault(name, {**metric, 'values': {}})
+            for labels, value in metric['values']:
+                key = tuple(tuple(pair) for pair in labels)
+                previous = target['values'].get(key)
+                if previous is None:
+                    target['values'][key] = _copy(value)
+                elif isinstance(value, dict):
+                    previous['buckets'] = [a + b for a, b in zip(previous['buckets'], value['buckets'])]
+                    previous['sum'] += value['sum']
+                    previous['count'] += value['count']
+                else:
+                    target['values'][key] = previous + value
+    return result
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels, extra=()):
+    pairs = [*labels, *extra]
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _format_number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render_prometheus(metrics=None):
+    """Returns the aggregated metrics in the Prometheus text exposition format (0.0.4)."""
+    metrics = aggregate() if metrics is None else metrics
+    lines = []
+    for name in sorted(metrics):
+        metric = metrics[name]
+        lines.append(f"# HELP {name} {metric['help']}")
+        lines.append(f"# TYPE {name} {metric['type']}")
+        for labels, value in sorted(metric['values'].items()):
+            if metric['type'] != 'histogram':
+                lines.append(f'{name}{_format_labels(labels)} {_format_number(value)}')
+                continue
+            for bound, count in zip(metric['buckets'], value['buckets']):
+                lines.append(f'{name}_bucket{_format_labels(labels, [("le", bound)])} {count}')
+            lines.append(f'{name}_bucket{_format_labels(labels, [("le", "+Inf")])} {value["count"]}')
+            lines.append(f'{name}_sum{_format_labels(labels)} {_format_number(value["sum"])}')
+            lines.append(f'{name}_count{_format_labels(labels)} {value["count"]}')
+    return '\n'.join(lines) + '\n'
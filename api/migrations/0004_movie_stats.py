@@ -0,0 +1,38 @@
+# Generated by Django 5.2.3 on 2026-10-18 06:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_comment'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='movie',
+            name='average_user_rating',
+            field=models.DecimalField(blank=True, db_index=True, decimal_places=2, max_digits=4, null=True),
+        ),
+        migrations.AddField(
+            model_name='movie',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='movie',
+            name='user_rating_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='movie',
+            name='user_rating_sum',
+            field=models.DecimalField(decimal_places=1, default=0, max_digits=12),
+        ),
+        migrations.AddField(
+            model_name='movie',
+            name='watch_count',
+            field=models.PositiveIntegerField(db_index=True, default=0),
+        ),
+    ]
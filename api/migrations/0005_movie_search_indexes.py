@@ -0,0 +1,97 @@
+# Generated by Django 5.2.3 on 2026-10-18 06:30
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+# Başlık/konu tam metin araması için SQLite FTS5 tabloları. api_movie'nin
+# rowid'sine bağlı "external content" tablolardır; metin iki kez saklanmaz,
+# tetikleyiciler api_movie'deki her değişikliği indekse yansıtır.
+# Not: VACUUM, INTEGER PRIMARY KEY'i olmayan tabloların rowid'lerini değiştirebilir;
+# VACUUM sonrası `python manage.py rebuild_search_index` çalıştırılmalıdır.
+FTS_TABLES = {
+    # Kelime bazlı arama (?q=)
+    'api_movie_fts': "fts5(title, plot, content='api_movie', content_rowid='rowid')",
+    # Başlık içinde alt-metin (substring) araması (?title=)
+    'api_movie_title_trgm': "fts5(title, content='api_movie', content_rowid='rowid', tokenize='trigram')",
+}
+
+CREATE_FTS_SQL = [
+    "CREATE VIRTUAL TABLE api_movie_fts USING " + FTS_TABLES['api_movie_fts'],
+    "CREATE VIRTUAL TABLE api_movie_title_trgm USING " + FTS_TABLES['api_movie_title_trgm'],
+    """
+    CREATE TRIGGER api_movie_fts_ai AFTER INSERT ON api_movie BEGIN
+        INSERT INTO api_movie_fts(rowid, title, plot) VALUES (new.rowid, new.title, new.plot);
+        INSERT INTO api_movie_title_trgm(rowid, title) VALUES (new.rowid, new.title);
+    END
+    """,
+    """
+    CREATE TRIGGER api_movie_fts_ad AFTER DELETE ON api_movie BEGIN
+        INSERT INTO api_movie_fts(api_movie_fts, rowid, title, plot) VALUES ('delete', old.rowid, old.title, old.plot);
+        INSERT INTO api_movie_title_trgm(api_movie_title_trgm, rowid, title) VALUES ('delete', old.rowid, old.title);
+    END
+    """,
+    """
+    CREATE TRIGGER api_movie_fts_au AFTER UPDATE OF title, plot ON api_movie BEGIN
+        INSERT INTO api_movie_fts(api_movie_fts, rowid, title, plot) VALUES ('delete', old.rowid, old.title, old.plot);
+        INSERT INTO api_movie_title_trgm(api_movie_title_trgm, rowid, title) VALUES ('delete', old.rowid, old.title);
+        INSERT INTO api_movie_fts(rowid, title, plot) VALUES (new.rowid, new.title, new.plot);
+        INSERT INTO api_movie_title_trgm(rowid, title) VALUES (new.rowid, new.title);
+    END
+    """,
+    "INSERT INTO api_movie_fts(api_movie_fts) VALUES ('rebuild')",
+    "INSERT INTO api_movie_title_trgm(api_movie_title_trgm) VALUES ('rebuild')",
+]
+
+DROP_FTS_SQL = [
+    "DROP TRIGGER IF EXISTS api_movie_fts_ai",
+    "DROP TRIGGER IF EXISTS api_movie_fts_ad",
+    "DROP TRIGGER IF EXISTS api_movie_fts_au",
+    "DROP TABLE IF EXISTS api_movie_fts",
+    "DROP TABLE IF EXISTS api_movie_title_trgm",
+]
+
+
+def create_fts(apps, schema_editor):
+    # FTS5 sadece SQLite'ta var; diğer veritabanlarında arama LIKE'a düşer
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for sql in CREATE_FTS_SQL:
+        schema_editor.execute(sql)
+
+
+def drop_fts(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for sql in DROP_FTS_SQL:
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_movie_stats'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='movie',
+            index=models.Index(fields=['year', 'rating'], name='movie_year_rating_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='movie',
+            index=models.Index(fields=['rating'], name='movie_rating_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='movie',
+            index=models.Index(fields=['director', 'year'], name='movie_director_year_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='movie',
+            index=models.Index(fields=['title'], name='movie_title_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='movie',
+            index=models.Index(django.db.models.functions.text.Lower('title'), name='movie_title_lower_idx'),
+        ),
+        migrations.RunPython(create_fts, drop_fts),
+    ]
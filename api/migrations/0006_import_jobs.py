@@ -0,0 +1,42 @@
+# Generated by Django 5.2.3 on 2026-10-18 09:10
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_movie_search_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('done', 'Done')], db_index=True, default='pending', max_length=10)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('created_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='import_jobs', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ImportJobItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=255)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('imported', 'Imported'), ('duplicate', 'Duplicate'), ('not_found', 'Not found'), ('failed', 'Failed')], default='pending', max_length=10)),
+                ('movie_id', models.CharField(blank=True, max_length=50, null=True)),
+                ('error', models.TextField(blank=True, null=True)),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='items', to='api.importjob')),
+            ],
+            options={
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['job', 'status'], name='importitem_job_status_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 5.2.3 on 2026-10-18 10:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_import_jobs'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Genre',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Person',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='MovieGenre',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('genre', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='api.genre')),
+                ('movie', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.movie')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('genre', 'movie'), name='unique_genre_movie')],
+            },
+        ),
+        migrations.CreateModel(
+            name='MovieActor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('movie', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.movie')),
+                ('person', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='api.person')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('person', 'movie'), name='unique_person_movie')],
+            },
+        ),
+        # M2M alanları api_movie'ye kolon eklemez, ara tablolar yukarıda oluşturuldu. SQLite
+        # şema editörü bu AddField'ler için api_movie'yi baştan kurar; bu hem büyük tabloda
+        # yavaştır hem de FTS tetikleyicilerini ve rowid'leri (0005) bozar. Bu yüzden
+        # sadece model durumuna eklenirler.
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddField(
+                    model_name='movie',
+                    name='genres',
+                    field=models.ManyToManyField(blank=True, related_name='movies', through='api.MovieGenre', to='api.genre'),
+                ),
+                migrations.AddField(
+                    model_name='movie',
+                    name='actors',
+                    field=models.ManyToManyField(blank=True, related_name='movies', through='api.MovieActor', to='api.person'),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 5.2.3 on 2026-10-18 14:20
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def backfill_updated_at(apps, schema_editor):
+    # Tek UPDATE; FTS tetikleyicisi sadece title/plot değişince çalışır
+    Movie = apps.get_model('api', 'Movie')
+    Movie.objects.using(schema_editor.connection.alias).update(updated_at=timezone.now())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_genres_and_actors'),
+    ]
+
+    operations = [
+        # auto_now alanı için SQLite şema editörü bir varsayılan değer hesaplar ve
+        # api_movie'yi baştan kurar; bu FTS tetikleyicilerini ve rowid'leri (0005) bozar.
+        # Veritabanına varsayılansız, NULL olabilen bir kolon eklenir (ALTER TABLE ADD
+        # COLUMN); auto_now sadece model durumunda vardır.
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.AddField(
+                    model_name='movie',
+                    name='updated_at',
+                    field=models.DateTimeField(null=True),
+                ),
+            ],
+            state_operations=[
+                migrations.AddField(
+                    model_name='movie',
+                    name='updated_at',
+                    field=models.DateTimeField(auto_now=True, null=True),
+                ),
+            ],
+        ),
+        migrations.RunPython(backfill_updated_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='movie',
+            index=models.Index(fields=['updated_at', 'movie_id'], name='movie_updated_idx'),
+        ),
+        migrations.CreateModel(
+            name='MovieTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('movie_id', models.CharField(max_length=50, unique=True)),
+                ('deleted_at', models.DateTimeField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['deleted_at', 'movie_id'], name='tombstone_deleted_idx')],
+            },
+        ),
+    ]
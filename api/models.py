@@ -1,5 +1,20 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.db.models.functions import Lower
+
+class Genre(models.Model):
+    name = models.CharField(max_length=100, unique=True)
+
+    def __str__(self):
+        return self.name
+
+
+class Person(models.Model):
+    name = models.CharField(max_length=255, unique=True)
+
+    def __str__(self):
+        return self.name
+
 
 class Movie(models.Model):
     movie_id = models.CharField(max_length=50, unique=True, primary_key=True) 
@@ -10,10 +25,78 @@ class Movie(models.Model):
     poster_url = models.URLField(max_length=500, null=True, blank=True)
     rating = models.DecimalField(max_digits=3, decimal_places=1, null=True, blank=True)
 
+    # Denormalize edilmiş sayaçlar: WatchedMovie/Comment sinyalleriyle F() ifadeleri
+    # kullanılarak güncellenir, `recompute_movie_stats` komutuyla yeniden hesaplanabilir.
+    watch_count = models.PositiveIntegerField(default=0, db_index=True)
+    comment_count = models.PositiveIntegerField(default=0)
+    user_rating_count = models.PositiveIntegerField(default=0)
+    user_rating_sum = models.DecimalField(max_digits=12, decimal_places=1, default=0)
+    average_user_rating = models.DecimalField(max_digits=4, decimal_places=2, null=True, blank=True, db_index=True)
+
+    genres = models.ManyToManyField(Genre, through='MovieGenre', related_name='movies', blank=True)
+    actors = models.ManyToManyField(Person, through='MovieActor', related_name='movies', blank=True)
+
+    # Değişiklik akışı (/movies/changes/) için son değişiklik zamanı. save() bunu auto_now ile,
+    # sayaç UPDATE'leri, tür/oyuncu değişiklikleri ve toplu import'lar açıkça günceller.
+    # Kolon SQLite'ta tabloyu yeniden kurmadan eklenebilsin diye NULL olabilir (bkz. 0008 migration);
+    # mevcut satırlar migration'da doldurulur.
+    updated_at = models.DateTimeField(auto_now=True, null=True)
+
+    class Meta:
+        # Arama/filtreleme endpoint'i (/movies/search/) için indeksler.
+        # Başlık ve konu üzerinde tam metin arama SQLite FTS5 tablolarıyla yapılır (bkz. 0005 migration).
+        indexes = [
+            models.Index(fields=['year', 'rating'], name='movie_year_rating_idx'),
+            models.Index(fields=['rating'], name='movie_rating_idx'),
+            models.Index(fields=['director', 'year'], name='movie_director_year_idx'),
+            models.Index(fields=['title'], name='movie_title_idx'),
+            models.Index(Lower('title'), name='movie_title_lower_idx'),
+            # Değişiklik akışı (updated_at, movie_id) sırasıyla sadece bu indeksten sayfalanır
+            models.Index(fields=['updated_at', 'movie_id'], name='movie_updated_idx'),
+        ]
+
     def __str__(self):
         return self.title
 
 
+# Ara tablolar açıkça tanımlanır: benzersizlik (tür/kişi, film) sırasıyla kurulur,
+# böylece "bir türdeki filmler" sorgusu movie_id sırasında sadece indeksten okunur.
+class MovieGenre(models.Model):
+    movie = models.ForeignKey(Movie, on_delete=models.CASCADE)
+    # Ayrı indekse gerek yok, (genre, movie) benzersiz indeksinin ilk kolonu
+    genre = models.ForeignKey(Genre, on_delete=models.CASCADE, db_index=False)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['genre', 'movie'], name='unique_genre_movie'),
+        ]
+
+
+class MovieActor(models.Model):
+    movie = models.ForeignKey(Movie, on_delete=models.CASCADE)
+    person = models.ForeignKey(Person, on_delete=models.CASCADE, db_index=False)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['person', 'movie'], name='unique_person_movie'),
+        ]
+
+
+class MovieTombstone(models.Model):
+    """Silinen bir filmin kaydı; değişiklik akışı silmeleri bu tablodan okur."""
+    # Film tekrar silinirse aynı satırın zamanı güncellenir
+    movie_id = models.CharField(max_length=50, unique=True)
+    deleted_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['deleted_at', 'movie_id'], name='tombstone_deleted_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.movie_id} (deleted {self.deleted_at})'
+
+
 class WatchedMovie(models.Model):
     # Bu model, bir User ile bir Movie arasında bir bağlantı kurar.
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='watched_list')
@@ -42,4 +125,55 @@ class Comment(models.Model):
         ordering = ['-created_at']
 
     def __str__(self):
-        return f'Comment by {self.author.username} on {self.movie.title}'
\ No newline at end of file
+        return f'Comment by {self.author.username} on {self.movie.title}'
+
+class ImportJob(models.Model):
+    """TMDB toplu içe aktarma işi; `process_import_jobs` komutu tarafından işlenir."""
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_DONE, 'Done'),
+    ]
+
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='import_jobs')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING, db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f'Import job #{self.pk} ({self.status})'
+
+
+class ImportJobItem(models.Model):
+    STATUS_PENDING = 'pending'
+    STATUS_IMPORTED = 'imported'
+    STATUS_DUPLICATE = 'duplicate'
+    STATUS_NOT_FOUND = 'not_found'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_IMPORTED, 'Imported'),
+        (STATUS_DUPLICATE, 'Duplicate'),
+        (STATUS_NOT_FOUND, 'Not found'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    job = models.ForeignKey(ImportJob, on_delete=models.CASCADE, related_name='items')
+    title = models.CharField(max_length=255)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    # Eşleşen TMDB filmi (tmdb_<id>); duplicate durumunda mevcut film
+    movie_id = models.CharField(max_length=50, null=True, blank=True)
+    error = models.TextField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['job', 'status'], name='importitem_job_status_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.title} ({self.status})'
@@ -0,0 +1,193 @@
+"""
+Film başına MovieSerializer çıktısı ve onun XML parçası için süreç içi LRU önbellek.
+
+Detay ve liste endpoint'leri (alan projeksiyonu olmadan) filmleri buradan alır;
+liste sayfaları önbellekteki parçalar birleştirilerek kurulur, tür/oyuncuları
+sadece önbellekte olmayan filmler için yüklenip serialize edilir. Film değişince
+(sinyaller, sayaç UPDATE'leri, toplu import) parça düşürülür.
+
+Önbellek süreç içidir; başka bir süreçteki (diğer worker'lar, yönetim komutları)
+değişiklik buradaki parçayı düşürmez. Bu yüzden her parça üretildiği satırın
+updated_at değeriyle saklanır ve sadece veritabanındaki değer aynıysa kullanılır.
+Liste sayfaları bu değeri zaten okur; detay isteği için tek bir pk sorgusu gerekir.
+"""
+import threading
+from collections import OrderedDict
+from io import StringIO
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import prefetch_related_objects
+from django.utils.xmlutils import SimplerXMLGenerator
+
+from .renderers import FragmentXMLRenderer, RenderedFragment
+from .models import Movie
+from .serializers import MovieSerializer
+
+
+class FragmentCache:
+    """
+    Bounded LRU of movie_id -> (version, RenderedFragment), limited by entry count
+    and by the total length of the rendered XML (`max_bytes`). The version is the
+    movie's updated_at when the fragment was rendered.
+
+    Her geçersiz kılma `generation` sayacını artırır ve filmin geçersiz kılındığı
+    nesli saklar; okumaya ondan önce başlamış bir isteğin yüklediği (eski olabilecek)
+    parça sadece o film için önbelleğe yazılmaz, diğer filmlerin parçaları yazılır.
+    Saklanan kayıtlar `max_invalidations` ile sınırlıdır; düşen en eski kaydın nesli
+    `_floor` olur ve ondan önce başlamış isteklerin hiçbir parçası yazılmaz. clear()
+    tüm filmleri geçersiz kılar.
+    """
+
+    def __init__(self, maxsize=50000, max_bytes=64 * 1024 * 1024, max_invalidations=10000):
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.max_invalidations = max_invalidations
+        self._entries = OrderedDict()
+        self._invalidated = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.generation = 0
+        self._floor = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get_many(self, versions):
+        """
+        Returns {movie_id: fragment} for the ids in `versions` ({movie_id: updated_at})
+        whose fragment was rendered from that version; older fragments are dropped.
+        """
+        found = {}
+        with self._lock:
+            for movie_id, version in versions.items():
+                entry = self._entries.get(movie_id)
+                if entry is None:
+                    continue
+                if entry[0] != version:
+                    # Film başka bir süreçte değişmiş
+                    self._remove(movie_id)
+                    continue
+                self._entries.move_to_end(movie_id)
+                found[movie_id] = entry[1]
+            self.hits += len(found)
+            self.misses += len(versions) - len(found)
+        return found
+
+    def set_many(self, fragments, generation):
+        """Stores {movie_id: (version, fragment)} except the movies invalidated since `generation`."""
+        with self._lock:
+            if generation < self._floor:
+                return
+            for movie_id, (version, fragment) in fragments.items():
+                if self._invalidated.get(movie_id, 0) > generation:
+                    continue
+                self._remove(movie_id)
+                if len(fragment.xml) > self.max_bytes:
+                    continue
+                self._entries[movie_id] = (version, fragment)
+                self.bytes += len(fragment.xml)
+            while len(self._entries) > self.maxsize or self.bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, movie_id):
+        entry = self._entries.pop(movie_id, None)
+        if entry is not None:
+            self.bytes -= len(entry[1].xml)
+
+    def invalidate_many(self, movie_ids):
+        with self._lock:
+            self.generation += 1
+            for movie_id in movie_ids:
+                self._remove(movie_id)
+                self._invalidated[movie_id] = self.generation
+                self._invalidated.move_to_end(movie_id)
+            while len(self._invalidated) > self.max_invalidations:
+                _, dropped = self._invalidated.popitem(last=False)
+                self._floor = max(self._floor, dropped)
+
+    def clear(self):
+        with self._lock:
+            self.generation += 1
+            self._floor = self.generation
+            self._invalidated.clear()
+            self._entries.clear()
+            self.bytes = 0
+            self.hits = self.misses = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'size': len(self._entries),
+            'bytes': self.bytes,
+        }
+
+
+fragment_cache = FragmentCache(
+    maxsize=getattr(settings, 'MOVIE_FRAGMENT_CACHE_SIZE', 50000),
+    max_bytes=getattr(settings, 'MOVIE_FRAGMENT_CACHE_MAX_BYTES', 64 * 1024 * 1024),
+)
+
+_renderer = FragmentXMLRenderer()
+
+
+def render_fragment(data):
+    """Serialized movie -> RenderedFragment holding its children as XMLRenderer writes them."""
+    stream = StringIO()
+    _renderer._to_xml(SimplerXMLGenerator(stream, _renderer.charset), data)
+    return RenderedFragment(data, stream.getvalue())
+
+
+def movie_fragments(movies, prefetch, generation):
+    """
+    Returns the fragments of `movies` (Movie instances with every column) in order.
+    Misses get the `prefetch` lookups (genres, actors) in one query each and are serialized.
+    `generation`: fragment_cache.generation read before `movies` were queried.
+    """
+    found = fragment_cache.get_many({movie.movie_id: movie.updated_at for movie in movies})
+    missing = [movie for movie in movies if movie.movie_id not in found]
+    if missing:
+        prefetch_related_objects(missing, *prefetch)
+        loaded = {
+            movie.movie_id: (movie.updated_at, render_fragment(data))
+            for movie, data in zip(missing, MovieSerializer(missing, many=True).data)
+        }
+        fragment_cache.set_many(loaded, generation)
+        found.update((movie_id, fragment) for movie_id, (_, fragment) in loaded.items())
+    return [found[movie.movie_id] for movie in movies]
+
+
+def current_version(movie_id, using=None):
+    """Returns (updated_at,) of `movie_id` (one pk lookup), or None if the movie does not exist."""
+    return Movie.objects.using(using).filter(pk=movie_id).values_list('updated_at').first()
+
+
+def movie_fragment(movie_id, queryset):
+    """Returns the fragment of one movie, loading it from `queryset` on a miss; None if it does not exist."""
+    # Yükleme başlamadan önceki nesil: arada film değişirse sonuç önbelleğe yazılmaz
+    generation = fragment_cache.generation
+    version = current_version(movie_id, queryset.db)
+    if version is None:
+        return None
+    fragment = fragment_cache.get_many({movie_id: version[0]}).get(movie_id)
+    if fragment is None:
+        movie = queryset.filter(pk=movie_id).first()
+        if movie is None:
+            return None
+        fragment = render_fragment(MovieSerializer(movie).data)
+        fragment_cache.set_many({movie_id: (movie.updated_at, fragment)}, generation)
+    return fragment
+
+
+def invalidate_movies(movie_ids, using=None):
+    """
+    Drops the fragments of `movie_ids` now and again when the current transaction
+    commits, so a fragment read by a concurrent request before the commit is not kept.
+    """
+    movie_ids = list(movie_ids)
+    if not movie_ids:
+        return
+    fragment_cache.invalidate_many(movie_ids)
+    transaction.on_commit(lambda: fragment_cache.invalidate_many(movie_ids), using=using)
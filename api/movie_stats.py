@@ -0,0 +1,82 @@
+from django.db.models import Avg, Case, Count, F, FloatField, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Cast, Coalesce, Greatest
+from django.utils import timezone
+
+from . import movie_cache
+from .models import Comment, Movie, WatchedMovie
+
+# Movie üzerindeki sayaçlar tek bir UPDATE ... SET x = x + 1 sorgusuyla değiştirilir.
+# Okuma-değiştirme-yazma yapılmadığı için eşzamanlı isteklerde sayaç kaybolmaz.
+# UPDATE içindeki tüm ifadeler satırın *eski* değerlerini gördüğü için ortalama
+# yeni toplam / yeni sayı olarak aynı sorguda hesaplanabilir.
+# UPDATE sinyal tetiklemediği için sayaçları gösteren XML parçaları burada düşürülür.
+# Sayaçlar API'de göründüğü için aynı UPDATE updated_at'i de (değişiklik akışı) ilerletir.
+
+
+def record_watch(movie_id, user_rating):
+    updates = {'watch_count': F('watch_count') + 1, 'updated_at': timezone.now()}
+    if user_rating is not None:
+        updates.update(
+            user_rating_count=F('user_rating_count') + 1,
+            user_rating_sum=F('user_rating_sum') + user_rating,
+            # SQLite tamsayı bölmesi yapmasın diye float'a çevrilir
+            average_user_rating=Cast(F('user_rating_sum') + user_rating, FloatField()) / (F('user_rating_count') + 1),
+        )
+    Movie.objects.filter(pk=movie_id).update(**updates)
+    movie_cache.invalidate_movies([movie_id])
+
+
+def remove_watch(movie_id, user_rating):
+    updates = {'watch_count': Greatest(F('watch_count') - 1, 0), 'updated_at': timezone.now()}
+    if user_rating is not None:
+        updates.update(
+            user_rating_count=Greatest(F('user_rating_count') - 1, 0),
+            user_rating_sum=F('user_rating_sum') - user_rating,
+            average_user_rating=Case(
+                When(user_rating_count__lte=1, then=Value(None)),
+                default=Cast(F('user_rating_sum') - user_rating, FloatField()) / (F('user_rating_count') - 1),
+                output_field=FloatField(),
+            ),
+        )
+    Movie.objects.filter(pk=movie_id).update(**updates)
+    movie_cache.invalidate_movies([movie_id])
+
+
+def record_comment(movie_id):
+    Movie.objects.filter(pk=movie_id).update(comment_count=F('comment_count') + 1, updated_at=timezone.now())
+    movie_cache.invalidate_movies([movie_id])
+
+
+def remove_comment(movie_id):
+    Movie.objects.filter(pk=movie_id).update(
+        comment_count=Greatest(F('comment_count') - 1, 0), updated_at=timezone.now()
+    )
+    movie_cache.invalidate_movies([movie_id])
+
+
+def recompute_movie_stats(queryset=None):
+    """
+    Recomputes every counter of the movies in `queryset` from WatchedMovie and
+    Comment rows with a single UPDATE using correlated subqueries.
+    Returns the number of updated movies.
+
+    Hangi sayaçların gerçekten değiştiği ayrıca sorgulanmaz; yeniden hesaplanan
+    her film değişiklik akışında değişmiş görünür.
+    """
+    if queryset is None:
+        queryset = Movie.objects.all()
+
+    watched = WatchedMovie.objects.filter(movie=OuterRef('pk')).order_by().values('movie')
+    rated = watched.filter(user_rating__isnull=False)
+    comments = Comment.objects.filter(movie=OuterRef('pk')).order_by().values('movie')
+
+    updated = queryset.update(
+        watch_count=Coalesce(Subquery(watched.annotate(n=Count('pk')).values('n')), 0),
+        user_rating_count=Coalesce(Subquery(rated.annotate(n=Count('pk')).values('n')), 0),
+        user_rating_sum=Coalesce(Subquery(rated.annotate(total=Sum('user_rating')).values('total')), Value(0)),
+        average_user_rating=Subquery(rated.annotate(avg=Avg('user_rating')).values('avg')),
+        comment_count=Coalesce(Subquery(comments.annotate(n=Count('pk')).values('n')), 0),
+        updated_at=timezone.now(),
+    )
+    movie_cache.fragment_cache.clear()
+    return updated
@@ -0,0 +1,228 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from decimal import Decimal, InvalidOperation
+
+from django.db import models
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, _positive_int
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class MovieCursorPagination(CursorPagination):
+    """
+    movie_id üzerinden keyset (cursor) sayfalama.
+    Her sayfa `WHERE movie_id > <son id> ORDER BY movie_id LIMIT n` sorgusuyla
+    okunur; OFFSET kullanılmadığı için tablo büyüdükçe sayfa maliyeti sabit kalır.
+    """
+    ordering = 'movie_id'
+    page_size = 100
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+
+
+class WatchedMovieCursorPagination(CursorPagination):
+    """İzlenenler listesi, en son eklenen önce gelecek şekilde sayfalanır."""
+    ordering = '-id'
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+
+
+class CommentCursorPagination(CursorPagination):
+    """Yorumlar, modeldeki sıralamayla aynı şekilde en yeniden eskiye sayfalanır."""
+    ordering = ('-created_at', '-id')
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+
+
+def parse_fields_param(request, allowed_fields):
+    """
+    `?fields=title,year` parametresini doğrulanmış bir alan listesine çevirir.
+    Parametre yoksa None döner; bilinmeyen alanlar ValueError fırlatır.
+    """
+    raw = request.query_params.get('fields')
+    if not raw:
+        return None
+
+    fields = [name.strip() for name in raw.split(',') if name.strip()]
+    unknown = [name for name in fields if name not in allowed_fields]
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(unknown)}")
+    return fields
+
+
+class KeysetPagination:
+    """
+    (sıralama alanı, movie_id) çifti üzerinden keyset sayfalama.
+
+    DRF'nin CursorPagination'ı konumu sadece ilk sıralama alanından alır; yıl
+    veya puan gibi çok tekrar eden ve NULL olabilen alanlarda OFFSET'e düşer.
+    Burada sonraki sayfa `(alan, movie_id) > (son değer, son id)` koşuluyla
+    okunur; NULL değerler her iki yönde de en sona konur.
+    """
+    cursor_query_param = 'cursor'
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+    tiebreaker = 'movie_id'
+
+    def __init__(self, ordering):
+        self.descending = ordering.startswith('-')
+        self.field = ordering.lstrip('-')
+
+    def get_ordering(self):
+        expression = F(self.field).desc(nulls_last=True) if self.descending else F(self.field).asc(nulls_last=True)
+        return [expression, self.tiebreaker]
+
+    def get_page_size(self, request):
+        try:
+            return _positive_int(
+                request.query_params[self.page_size_query_param], strict=True, cutoff=self.max_page_size
+            )
+        except (KeyError, ValueError):
+            return self.page_size
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            value, last_id = json.loads(urlsafe_b64decode(encoded.encode('ascii')))
+        except (TypeError, ValueError, UnicodeError):
+            raise NotFound('Invalid cursor')
+        if not isinstance(last_id, str):
+            raise NotFound('Invalid cursor')
+        return value, last_id
+
+    def clean_cursor_value(self, model, value):
+        """
+        Checks the decoded sort value against the model field (see encode_cursor);
+        raises NotFound if it could not have come from a page of this ordering.
+        """
+        field = model._meta.get_field(self.field)
+        if value is None:
+            if not field.null:
+                raise NotFound('Invalid cursor')
+            return None
+        if isinstance(field, models.DecimalField):
+            # Decimal değerler cursor'a metin olarak yazılır
+            try:
+                value = Decimal(value) if isinstance(value, str) else None
+            except InvalidOperation:
+                value = None
+            if value is None or not value.is_finite():
+                raise NotFound('Invalid cursor')
+            return value
+        expected = int if isinstance(field, models.IntegerField) else str
+        if type(value) is not expected:
+            raise NotFound('Invalid cursor')
+        return value
+
+    def encode_cursor(self, instance):
+        value = getattr(instance, self.field)
+        if value is not None and not isinstance(value, (int, str)):
+            value = str(value)
+        payload = json.dumps([value, getattr(instance, self.tiebreaker)])
+        return urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+
+    def _after(self, value, last_id):
+        tie = Q(**{self.tiebreaker + '__gt': last_id})
+        if value is None:
+            # NULL'lar en sonda, aralarında sadece id sırası var
+            return Q(**{self.field + '__isnull': True}) & tie
+        beyond = Q(**{self.field + ('__lt' if self.descending else '__gt'): value})
+        return beyond | (Q(**{self.field: value}) & tie) | Q(**{self.field + '__isnull': True})
+
+    def paginate_queryset(self, queryset, request):
+        self.request = request
+        page_size = self.get_page_size(request)
+        cursor = self.decode_cursor(request)
+
+        queryset = queryset.order_by(*self.get_ordering())
+        if cursor is not None:
+            value, last_id = cursor
+            queryset = queryset.filter(self._after(self.clean_cursor_value(queryset.model, value), last_id))
+
+        results = list(queryset[:page_size + 1])
+        self.page = results[:page_size]
+        self.next_cursor = self.encode_cursor(self.page[-1]) if len(results) > page_size else None
+        return self.page
+
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+        return replace_query_param(
+            self.request.build_absolute_uri(), self.cursor_query_param, self.next_cursor
+        )
+
+    def get_paginated_response(self, data):
+        return Response({'next': self.get_next_link(), 'results': data})
+
+
+class ChangeFeedPagination:
+    """
+    Değişiklik akışı (/movies/changes/) sayfalaması. Konum `?since=` token'ıdır
+    (bkz. api/change_feed.py); yanıttaki `since` istemcinin saklayacağı token,
+    `next` ise sayfa dolduysa bir sonraki sayfanın adresidir.
+    """
+    since_query_param = 'since'
+    page_size = 500
+    page_size_query_param = 'page_size'
+    max_page_size = 5000
+
+    def get_page_size(self, request):
+        try:
+            return _positive_int(
+                request.query_params[self.page_size_query_param], strict=True, cutoff=self.max_page_size
+            )
+        except (KeyError, ValueError):
+            return self.page_size
+
+    def get_paginated_response(self, request, data, since, has_more):
+        next_link = None
+        if has_more:
+            next_link = replace_query_param(request.build_absolute_uri(), self.since_query_param, since)
+        return Response({'next': next_link, 'since': since, 'results': data})
+
+
+def keyset_after(fields, values, descending=False):
+    """
+    `(fields) > (values)` koşulunu sözlük sırasıyla kurar (keyset sayfalama için).
+    SQLite artan sıralamada NULL'ları başa koyduğu için NULL her değerden küçük sayılır.
+    descending=True ise `(fields) < (values)` kurulur; bu durumda alanlar NULL olamaz.
+    """
+    beyond, bound = ('__lt', '__lte') if descending else ('__gt', '__gte')
+    condition = Q(pk__in=[])
+    equal = Q()
+    for field, value in zip(fields, values):
+        if value is None:
+            condition |= equal & Q(**{field + '__isnull': False})
+            equal &= Q(**{field + '__isnull': True})
+        else:
+            condition |= equal & Q(**{field + beyond: value})
+            equal &= Q(**{field: value})
+    if values[0] is not None:
+        # İlk alan için ayrıca aralık koşulu: OR'lu ifade tek başına indeks aralığına
+        # çevrilemez, SQLite tüm kalan satırları okuyup sıralardı
+        condition &= Q(**{fields[0] + bound: values[0]})
+    return condition
+
+
+def encode_keyset_cursor(values):
+    return urlsafe_b64encode(json.dumps(list(values)).encode('utf-8')).decode('ascii')
+
+
+def decode_keyset_cursor(encoded, length):
+    """Returns the cursor values (a list of `length` items) or None; raises NotFound if malformed."""
+    if not encoded:
+        return None
+    try:
+        values = json.loads(urlsafe_b64decode(encoded.encode('ascii')))
+    except (TypeError, ValueError, UnicodeError):
+        raise NotFound('Invalid cursor')
+    if not isinstance(values, list) or len(values) != length:
+        raise NotFound('Invalid cursor')
+    return values
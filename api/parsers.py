@@ -0,0 +1,186 @@
+"""
+XML istek parser'ları.
+
+Gövde kilitli bir lxml parser'ı ile ayrıştırılır: DTD yüklenmez, entity
+çözülmez, ağa çıkılmaz; boyut ve derinlik sınırlıdır. Ağaç doğrudan
+serializer'ın beklediği dict/list/str yapısına çevrilir. Şemalı parser'lar
+gövdeyi serializer'a gitmeden önce XSD ile doğrular; geçersiz istekler 400 ile
+erkenden reddedilir. Derlenmiş şemalar `schema_registry` üzerinden süreç başına
+bir kere derlenir.
+"""
+import os
+import threading
+import time
+
+from django.conf import settings
+from lxml import etree
+from rest_framework import status
+from rest_framework.exceptions import APIException, ParseError
+from rest_framework.parsers import BaseParser
+
+from . import metrics
+from .xml_cache import schema_registry
+
+
+class RequestBodyTooLarge(APIException):
+    status_code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    default_detail = 'Request body is too large.'
+    default_code = 'request_too_large'
+
+
+class ValidationStats:
+    """Thread-safe counters of schema validation calls and the time they took."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def record(self, seconds, valid):
+        with self._lock:
+            self.count += 1
+            self.invalid += 0 if valid else 1
+            self.total_seconds += seconds
+            self.max_seconds = max(self.max_seconds, seconds)
+
+    def reset(self):
+        with self._lock:
+            self.count = 0
+            self.invalid = 0
+            self.total_seconds = 0.0
+            self.max_seconds = 0.0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'count': self.count,
+                'invalid': self.invalid,
+                'total_ms': self.total_seconds * 1000,
+                'avg_ms': self.total_seconds * 1000 / self.count if self.count else 0.0,
+                'max_ms': self.max_seconds * 1000,
+            }
+
+
+validation_stats = ValidationStats()
+
+
+_PROLOG_SKIP = ((b'<?', b'?>'), (b'<!--', b'-->'))
+
+
+def _has_doctype(body):
+    """True if a <!DOCTYPE> follows the XML declaration, comments and PIs at the start of `body`."""
+    pos = 3 if body.startswith(b'\xef\xbb\xbf') else 0
+    while True:
+        while pos < len(body) and body[pos] in b' \t\r\n':
+            pos += 1
+        for start, end in _PROLOG_SKIP:
+            if body.startswith(start, pos):
+                pos = body.find(end, pos + len(start))
+                if pos < 0:
+                    return False
+                pos += len(end)
+                break
+        else:
+            return body.startswith(b'<!DOCTYPE', pos)
+
+
+def _lxml_parser(encoding=None):
+    # huge_tree=False: libxml2'nin metin düğümü ve iç içelik sınırları açık kalır
+    return etree.XMLParser(
+        encoding=encoding, resolve_entities=False, no_network=True, load_dtd=False, dtd_validation=False,
+        huge_tree=False, collect_ids=False, remove_comments=True, remove_pis=True,
+    )
+
+
+def read_body(stream, max_size=None):
+    """Reads at most `max_size` (XML_MAX_BODY_SIZE) bytes; a longer body raises RequestBodyTooLarge."""
+    max_size = settings.XML_MAX_BODY_SIZE if max_size is None else max_size
+    if stream is None:
+        return b''
+    body = stream.read(max_size + 1)
+    if len(body) > max_size:
+        raise RequestBodyTooLarge(f'Request body exceeds {max_size} bytes.')
+    return body
+
+
+def parse_document(body, encoding=None):
+    """
+    Parses `body` (bytes) with the hardened parser and returns the root element.
+    DTD'li (<!DOCTYPE ...>) belgeler entity tanımları ayrıştırılmadan reddedilir.
+    """
+    # DOCTYPE kök elemandan önce gelmek zorundadır; ayrıştırmadan önce baş kısma bakılır
+    if _has_doctype(body):
+        raise ParseError('XML parse error - DTDs are not allowed.')
+
+    try:
+        root = etree.fromstring(body, parser=_lxml_parser(encoding))
+    except (etree.XMLSyntaxError, ValueError) as exc:
+        raise ParseError(f'XML parse error - {exc}')
+    if root is None:
+        raise ParseError('XML parse error - empty document.')
+    # UTF-8 dışı kodlamalar ön kontrolden geçebilir; entity'ler zaten çözülmemiştir
+    if root.getroottree().docinfo.internalDTD is not None:
+        raise ParseError('XML parse error - DTDs are not allowed.')
+    return root
+
+
+def element_to_data(element, max_depth=None, depth=0):
+    """
+    Converts an element to the structure XMLParser produced: children become a dict
+    (or a list for <list-item> children), leaves become their text (None if empty).
+    Değerler string kalır; tip dönüşümünü serializer alanları yapar.
+    """
+    if max_depth is None:
+        max_depth = settings.XML_MAX_DEPTH
+    if depth >= max_depth:
+        raise ParseError(f'XML parse error - elements are nested deeper than {max_depth} levels.')
+
+    children = list(element)
+    if not children:
+        return element.text
+    if children[0].tag == 'list-item':
+        return [element_to_data(child, max_depth, depth + 1) for child in children]
+    return {child.tag: element_to_data(child, max_depth, depth + 1) for child in children}
+
+
+class HardenedXMLParser(BaseParser):
+    """Drop-in replacement of rest_framework_xml's XMLParser on top of the hardened lxml parser."""
+
+    media_type = 'application/xml'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        with metrics.timed('parse', parser=type(self).__name__):
+            return self.to_data(self.parse_root(stream, parser_context))
+
+    def to_data(self, root):
+        return element_to_data(root)
+
+    def parse_root(self, stream, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        return parse_document(read_body(stream), encoding)
+
+
+class SchemaValidatingXMLParser(HardenedXMLParser):
+    """
+    HardenedXMLParser that validates the body against `schema_path` before converting it.
+    Subclasses set `schema_path`.
+    """
+
+    schema_path = None
+
+    def to_data(self, root):
+        schema = schema_registry.get(self.schema_path)
+        start = time.perf_counter()
+        valid = schema.validate(root)
+        validation_stats.record(time.perf_counter() - start, valid)
+        if not valid:
+            error = schema.error_log.last_error
+            raise ParseError(f"XML schema validation error - line {error.line}: {error.message}")
+
+        return element_to_data(root)
+
+
+class MoviePayloadXMLParser(SchemaValidatingXMLParser):
+    """Movie create/update bodies, validated against schemas/movie_payload.xsd."""
+
+    schema_path = os.path.join(settings.BASE_DIR, 'schemas', 'movie_payload.xsd')
@@ -0,0 +1,81 @@
+from io import StringIO
+from itertools import islice
+
+from django.http import StreamingHttpResponse
+from django.utils.xmlutils import SimplerXMLGenerator
+from rest_framework_xml.renderers import XMLRenderer
+
+
+class RenderedFragment(dict):
+    """Serialized data together with its already rendered XML (the children of its element)."""
+
+    __slots__ = ('xml',)
+
+    def __init__(self, data, xml):
+        super().__init__(data)
+        self.xml = xml
+
+
+class FragmentXMLRenderer(XMLRenderer):
+    """
+    XMLRenderer that writes a RenderedFragment's `xml` as is instead of walking its data.
+    Diğer tüm veriler için çıktı XMLRenderer ile birebir aynıdır.
+    """
+
+    def _to_xml(self, xml, data):
+        if isinstance(data, RenderedFragment):
+            # ignorableWhitespace içeriği kaçışlamadan yazar; parça zaten kaçışlanmış XML'dir
+            xml.ignorableWhitespace(data.xml)
+        else:
+            super()._to_xml(xml, data)
+
+
+class StreamingXMLRenderer(FragmentXMLRenderer):
+    """
+    XMLRenderer ile aynı çıktıyı (<root><list-item>...</list-item></root>) üretir,
+    fakat tüm belgeyi bellekte kurmak yerine parça parça üretir.
+    """
+
+    def render_stream(self, items):
+        """Yields the serialized document chunk by chunk for an iterable of item batches."""
+        yield f'<?xml version="1.0" encoding="{self.charset}"?>\n<{self.root_tag_name}>'
+
+        for batch in items:
+            stream = StringIO()
+            xml = SimplerXMLGenerator(stream, self.charset)
+            self._to_xml(xml, batch)
+            yield stream.getvalue()
+
+        yield f'</{self.root_tag_name}>'
+
+
+def iterate_serialized(queryset, serializer_class, chunk_size=2000, **serializer_kwargs):
+    """
+    Queryset'i `.iterator(chunk_size=...)` ile okur ve her `chunk_size` kayıtlık
+    grubu serialize edilmiş bir liste olarak döner.
+    """
+    rows = queryset.iterator(chunk_size=chunk_size)
+    while True:
+        batch = list(islice(rows, chunk_size))
+        if not batch:
+            return
+        yield serializer_class(batch, many=True, **serializer_kwargs).data
+
+
+def streaming_xml_response(queryset, serializer_class, chunk_size=2000, **serializer_kwargs):
+    """Builds a StreamingHttpResponse that renders `queryset` as XML without loading it all."""
+    return stream_xml_batches(iterate_serialized(queryset, serializer_class, chunk_size, **serializer_kwargs))
+
+
+def stream_xml_batches(batches):
+    """Builds a StreamingHttpResponse that renders an iterable of serialized item batches as one XML list."""
+    renderer = StreamingXMLRenderer()
+    return StreamingHttpResponse(
+        renderer.render_stream(batches),
+        content_type=f'{renderer.media_type}; charset={renderer.charset}',
+    )
+
+
+def wants_stream(request):
+    """`?stream=true` ile tam liste (export) akış olarak istenir."""
+    return request.query_params.get('stream', '').lower() in ('1', 'true', 'yes')
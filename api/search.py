@@ -0,0 +1,188 @@
+from contextlib import contextmanager
+from decimal import Decimal, InvalidOperation
+
+from django.db import connection
+from django.db.models import IntegerField, Q
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Lower
+
+from .models import Movie
+
+FTS_TABLE = 'api_movie_fts'
+TRIGRAM_TABLE = 'api_movie_title_trgm'
+
+# ?ordering= için izin verilen değerler (hepsi indeksli alanlar)
+ORDERING_CHOICES = (
+    'movie_id', 'title', '-title', 'year', '-year', 'rating', '-rating',
+    '-watch_count', '-average_user_rating',
+)
+
+# 0005 migration'ındaki tetikleyicilerle aynı; deferred_fts_index() bunları
+# geçici olarak kaldırıp geri oluşturur.
+FTS_TRIGGERS = {
+    'api_movie_fts_ai': """
+        CREATE TRIGGER IF NOT EXISTS api_movie_fts_ai AFTER INSERT ON api_movie BEGIN
+            INSERT INTO api_movie_fts(rowid, title, plot) VALUES (new.rowid, new.title, new.plot);
+            INSERT INTO api_movie_title_trgm(rowid, title) VALUES (new.rowid, new.title);
+        END
+    """,
+    'api_movie_fts_ad': """
+        CREATE TRIGGER IF NOT EXISTS api_movie_fts_ad AFTER DELETE ON api_movie BEGIN
+            INSERT INTO api_movie_fts(api_movie_fts, rowid, title, plot) VALUES ('delete', old.rowid, old.title, old.plot);
+            INSERT INTO api_movie_title_trgm(api_movie_title_trgm, rowid, title) VALUES ('delete', old.rowid, old.title);
+        END
+    """,
+    'api_movie_fts_au': """
+        CREATE TRIGGER IF NOT EXISTS api_movie_fts_au AFTER UPDATE OF title, plot ON api_movie BEGIN
+            INSERT INTO api_movie_fts(api_movie_fts, rowid, title, plot) VALUES ('delete', old.rowid, old.title, old.plot);
+            INSERT INTO api_movie_title_trgm(api_movie_title_trgm, rowid, title) VALUES ('delete', old.rowid, old.title);
+            INSERT INTO api_movie_fts(rowid, title, plot) VALUES (new.rowid, new.title, new.plot);
+            INSERT INTO api_movie_title_trgm(rowid, title) VALUES (new.rowid, new.title);
+        END
+    """,
+}
+
+_fts_tables = None
+
+
+def fts_tables():
+    """Returns the FTS5 tables created by the 0005 migration (empty on non-SQLite databases)."""
+    global _fts_tables
+    if _fts_tables is None:
+        if connection.vendor != 'sqlite':
+            _fts_tables = set()
+        else:
+            existing = set(connection.introspection.table_names())
+            _fts_tables = {FTS_TABLE, TRIGRAM_TABLE} & existing
+    return _fts_tables
+
+
+def _fts_phrase(text):
+    # Kullanıcı girdisi FTS5 sorgu sözdizimi olarak yorumlanmasın diye tırnak içine alınır
+    return '"%s"' % text.replace('"', '""')
+
+
+def rebuild_fts_index():
+    """
+    Rebuilds the FTS5 tables from api_movie (needed after VACUUM renumbers rowids)
+    and recreates any missing sync trigger.
+    """
+    tables = sorted(fts_tables())
+    with connection.cursor() as cursor:
+        if len(tables) == 2:
+            for sql in FTS_TRIGGERS.values():
+                cursor.execute(sql)
+        for table in tables:
+            cursor.execute("INSERT INTO %s(%s) VALUES ('rebuild')" % (table, table))
+    return tables
+
+
+@contextmanager
+def deferred_fts_index():
+    """
+    Drops the FTS sync triggers for the duration of a bulk load and rebuilds
+    the index once at the end.
+
+    Satır başına iki FTS5 yazması büyük importları birkaç kat yavaşlatır; tek
+    seferlik 'rebuild' çok daha ucuzdur. Bu sürede yeni filmler aramada görünmez.
+    Süreç yarıda öldürülürse `rebuild_search_index` tetikleyicileri geri kurar.
+    """
+    if len(fts_tables()) < 2:
+        yield
+        return
+    with connection.cursor() as cursor:
+        for name in FTS_TRIGGERS:
+            cursor.execute('DROP TRIGGER IF EXISTS %s' % name)
+    try:
+        yield
+    finally:
+        rebuild_fts_index()
+
+
+def _rowid_in(queryset, table, match):
+    rowid = RawSQL('%s.rowid' % connection.ops.quote_name(Movie._meta.db_table), [], output_field=IntegerField())
+    matches = RawSQL(
+        'SELECT rowid FROM %s WHERE %s MATCH %%s' % (table, table), [match], output_field=IntegerField()
+    )
+    if '_rowid' not in queryset.query.annotations:
+        queryset = queryset.alias(_rowid=rowid)
+    return queryset.filter(_rowid__in=matches)
+
+
+def _int_param(params, name):
+    value = params.get(name)
+    if value in (None, ''):
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"'{name}' must be an integer.")
+
+
+def search_movies(params):
+    """
+    Builds the Movie queryset for the search endpoint from query parameters.
+    Raises ValueError for invalid parameter values.
+    """
+    movies = Movie.objects.all()
+
+    # Tam metin arama (başlık + konu), tüm kelimeler eşleşmeli
+    q = params.get('q', '').strip()
+    if q:
+        if FTS_TABLE in fts_tables():
+            match = ' '.join(_fts_phrase(term) for term in q.split())
+            movies = _rowid_in(movies, FTS_TABLE, match)
+        else:
+            for term in q.split():
+                movies = movies.filter(Q(title__icontains=term) | Q(plot__icontains=term))
+
+    # Başlık içinde geçen metin; trigram indeksi en az 3 karakterle çalışır
+    title = params.get('title', '').strip()
+    if title:
+        if TRIGRAM_TABLE in fts_tables() and len(title) >= 3:
+            movies = _rowid_in(movies, TRIGRAM_TABLE, _fts_phrase(title))
+        else:
+            movies = movies.filter(title__icontains=title)
+
+    # Başlık öneki: Lower(title) fonksiyonel indeksi üzerinde aralık sorgusu.
+    # SQLite'ın lower()'ı sadece ASCII harfleri dönüştürdüğü için diğer durumda istartswith kullanılır.
+    prefix = params.get('title_prefix', '')
+    if prefix:
+        if prefix.isascii():
+            lowered = prefix.lower()
+            movies = movies.alias(title_lower=Lower('title')).filter(
+                title_lower__gte=lowered, title_lower__lt=lowered + '\U0010ffff'
+            )
+        else:
+            movies = movies.filter(title__istartswith=prefix)
+
+    year_min = _int_param(params, 'year_min')
+    if year_min is not None:
+        movies = movies.filter(year__gte=year_min)
+    year_max = _int_param(params, 'year_max')
+    if year_max is not None:
+        movies = movies.filter(year__lte=year_max)
+
+    director = params.get('director', '').strip()
+    if director:
+        movies = movies.filter(director=director)
+
+    min_rating = params.get('min_rating')
+    if min_rating:
+        try:
+            min_rating = Decimal(min_rating)
+        except InvalidOperation:
+            raise ValueError("'min_rating' must be a number.")
+        # NaN ve Infinity de ayrıştırılır ama ORM lookup'ı kurarken ValidationError verir
+        if not min_rating.is_finite():
+            raise ValueError("'min_rating' must be a number.")
+        movies = movies.filter(rating__gte=min_rating)
+
+    return movies
+
+
+def get_ordering(params):
+    ordering = params.get('ordering') or 'movie_id'
+    if ordering not in ORDERING_CHOICES:
+        raise ValueError(f"'ordering' must be one of: {', '.join(ORDERING_CHOICES)}.")
+    return ordering
@@ -1,5 +1,7 @@
+from collections import Counter
+
 from rest_framework import serializers
-from .models import Movie, WatchedMovie, Comment
+from .models import Movie, WatchedMovie, Comment, ImportJob, ImportJobItem
 from django.contrib.auth.models import User
 
 # --- Kullanıcı Serializer'ları ---
@@ -27,9 +29,25 @@ class UserRegisterSerializer(serializers.ModelSerializer):
 
 # --- Film Serializer'ı ---
 class MovieSerializer(serializers.ModelSerializer):
+    # Tür ve oyuncular isimleriyle gösterilir; listelerde prefetch_related ile yüklenmeli (N+1 olmasın)
+    genres = serializers.SlugRelatedField(many=True, read_only=True, slug_field='name')
+    actors = serializers.SlugRelatedField(many=True, read_only=True, slug_field='name')
+
     class Meta:
         model = Movie
-        fields = '__all__' # Modeldeki tüm alanları dahil et
+        # user_rating_sum sadece ortalamayı güncellemek için tutulur, API'de gösterilmez
+        exclude = ('user_rating_sum',)
+        # Sayaçlar sinyallerle güncellenir, istemci tarafından yazılamaz
+        read_only_fields = ('watch_count', 'comment_count', 'user_rating_count', 'average_user_rating')
+
+    def __init__(self, *args, **kwargs):
+        # `fields` verilirse sadece o alanlar serialize edilir (?fields= projeksiyonu için)
+        fields = kwargs.pop('fields', None)
+        super().__init__(*args, **kwargs)
+
+        if fields is not None:
+            for field_name in set(self.fields) - set(fields):
+                self.fields.pop(field_name)
 
 # --- Yorum Serializer'ı ---
 class CommentSerializer(serializers.ModelSerializer):
@@ -50,4 +68,24 @@ class WatchedMovieSerializer(serializers.ModelSerializer):
     class Meta:
         model = WatchedMovie
         fields = ['id', 'user', 'movie', 'movie_title', 'watched_date', 'user_rating']
-        read_only_fields = ('user',)
\ No newline at end of file
+        read_only_fields = ('user',)
+
+# --- TMDB Toplu Import Serializer'ları ---
+class ImportJobItemSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ImportJobItem
+        fields = ['title', 'status', 'movie_id', 'error']
+
+
+class ImportJobSerializer(serializers.ModelSerializer):
+    # Kalemler prefetch edildiği için sayımlar ek sorgu atmadan Python'da yapılır
+    counts = serializers.SerializerMethodField()
+    items = ImportJobItemSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = ImportJob
+        fields = ['id', 'status', 'created_at', 'started_at', 'finished_at', 'counts', 'items']
+
+    def get_counts(self, job):
+        counts = Counter(item.status for item in job.items.all())
+        return {status: counts.get(status, 0) for status, label in ImportJobItem.STATUS_CHOICES}
@@ -0,0 +1,107 @@
+from django.contrib.auth.models import User
+from django.db.backends.signals import connection_created
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from . import change_feed, html_cache, metrics, movie_cache, movie_stats, xpath_catalog
+from .authentication import token_cache
+from .models import Comment, Genre, Movie, Person, WatchedMovie
+
+
+@receiver(connection_created)
+def track_connection_queries(sender, connection, **kwargs):
+    """Yeni açılan her bağlantının sorguları istek metriklerine sayılır."""
+    metrics.install_query_counter(connection)
+
+
+@receiver(post_save, sender=Movie)
+@receiver(post_delete, sender=Movie)
+def invalidate_movie_html(sender, instance, **kwargs):
+    """Film değiştiğinde ya da silindiğinde önbellekteki HTML sayfalarını geçersiz kıl."""
+    html_cache.invalidate_movie(instance.movie_id)
+    movie_cache.invalidate_movies([instance.movie_id], using=kwargs.get('using'))
+    # XPath kataloğu commit sonrası, bir sonraki sorgudan önce yamalanır
+    xpath_catalog.movies_changed([instance.movie_id], using=kwargs.get('using'))
+
+
+@receiver(post_delete, sender=Movie)
+def movie_deleted(sender, instance, **kwargs):
+    """Silinen film değişiklik akışına tombstone olarak yazılır."""
+    change_feed.record_deletions([instance.movie_id], using=kwargs.get('using'))
+
+
+@receiver(m2m_changed, sender=Movie.genres.through)
+@receiver(m2m_changed, sender=Movie.actors.through)
+def movie_credits_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Tür/oyuncu bağlantıları değişince ilgili filmlerin HTML sayfaları ve XML parçaları
+    geçersiz kılınır, filmler değişiklik akışında değişmiş sayılır.
+    """
+    if not reverse:
+        if action.startswith('post_'):
+            html_cache.invalidate_movie(instance.pk)
+            movie_cache.invalidate_movies([instance.pk], using=kwargs.get('using'))
+            change_feed.touch_movies([instance.pk], using=kwargs.get('using'))
+        return
+    if action in ('post_add', 'post_remove'):
+        movie_ids = list(pk_set)
+    elif action == 'pre_clear':
+        # Tür/kişi tarafından clear(): hangi filmlerin etkilendiği silinmeden önce okunur
+        movie_ids = list(instance.movies.values_list('pk', flat=True))
+    else:
+        return
+    html_cache.invalidate_movies(movie_ids)
+    movie_cache.invalidate_movies(movie_ids, using=kwargs.get('using'))
+    change_feed.touch_movies(movie_ids, using=kwargs.get('using'))
+
+
+@receiver(post_save, sender=Genre)
+@receiver(post_save, sender=Person)
+@receiver(pre_delete, sender=Genre)
+@receiver(pre_delete, sender=Person)
+def credit_name_changed(sender, instance, created=False, **kwargs):
+    """
+    Yeniden adlandırılan ya da silinen tür/kişinin filmleri değişmiş sayılır.
+    Silmede ara tablo satırları CASCADE ile gider ve m2m_changed gönderilmez.
+    """
+    if created:
+        return
+    movie_ids = list(instance.movies.values_list('pk', flat=True))
+    html_cache.invalidate_movies(movie_ids)
+    movie_cache.invalidate_movies(movie_ids, using=kwargs.get('using'))
+    change_feed.touch_movies(movie_ids, using=kwargs.get('using'))
+
+
+@receiver(post_save, sender=WatchedMovie)
+def watched_movie_saved(sender, instance, created, **kwargs):
+    if created:
+        movie_stats.record_watch(instance.movie_id, instance.user_rating)
+
+
+@receiver(post_delete, sender=WatchedMovie)
+def watched_movie_deleted(sender, instance, **kwargs):
+    movie_stats.remove_watch(instance.movie_id, instance.user_rating)
+
+
+@receiver(post_save, sender=Comment)
+def comment_saved(sender, instance, created, **kwargs):
+    if created:
+        movie_stats.record_comment(instance.movie_id)
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    movie_stats.remove_comment(instance.movie_id)
+
+
+@receiver(post_delete, sender=Token)
+def token_deleted(sender, instance, **kwargs):
+    token_cache.invalidate(instance.key)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, **kwargs):
+    """Pasifleştirilen ya da yetkisi değişen kullanıcının önbellekteki token'ları düşürülür."""
+    token_cache.invalidate_user(instance.pk)
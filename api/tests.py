@@ -1,9 +1,129 @@
-from django.test import TestCase
+import asyncio
+import gzip
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO, StringIO
+from unittest import mock
+
+import requests
+from lxml import etree
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+from django.test import TestCase, override_settings
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework.test import APITestCase # API testleri için daha kullanışlı
 from rest_framework import status
 from django.contrib.auth.models import User
-from .models import Movie, Comment, WatchedMovie
+from rest_framework.authtoken.models import Token
+from rest_framework_xml.renderers import XMLRenderer
+from . import import_jobs, metrics
+from .parsers import validation_stats
+from .models import Genre, Movie, Comment, Person, WatchedMovie, ImportJob
+from .movie_cache import FragmentCache, fragment_cache, movie_fragments, render_fragment
+from .serializers import MovieSerializer
+from .authentication import token_cache
+from .tmdb import RateLimiter, TMDBClient
+from .xml_cache import schema_registry, xslt_registry
+from .views import movie_prefetches, project_movies
+from .pagination import encode_keyset_cursor
+from .xml_export import shard_bounds
+from .xml_generator import MAX_PLOT_LENGTH
+from .xml_import import bulk_upsert_movies, movie_row_from_element
+from .xpath_catalog import catalog, xpath_cache
+
+def response_html(response):
+    """Akıtılan (streaming) ve normal yanıtların gövdesini metin olarak döner."""
+    content = b''.join(response.streaming_content) if response.streaming else response.content
+    return content.decode('utf-8')
+
+
+class QueryCountAssertionsMixin:
+    """
+    N+1 regresyonlarını yakalamak için sorgu sayısı kontrolleri.
+    assertNumQueries'ten farkı: üst sınır koyar ve aşıldığında atılan sorguları listeler.
+    """
+
+    @contextmanager
+    def assertMaxQueries(self, max_queries, using='default'):
+        with CaptureQueriesContext(connections[using]) as context:
+            yield context
+        executed = len(context.captured_queries)
+        if executed > max_queries:
+            queries = '\n'.join(
+                f'{i}. {query["sql"]}' for i, query in enumerate(context.captured_queries, start=1)
+            )
+            self.fail(f'{executed} queries executed, at most {max_queries} expected:\n{queries}')
+
+
+class FakeTMDBServer:
+    """
+    Testlerde TMDB yerine kullanılan yerel HTTP sunucusu.
+    `fail_next` kadar istek 503 ile, `delay` saniye bekleyerek yanıtlanır.
+    """
+
+    def __init__(self, movies):
+        self.movies = movies
+        self.requests = []
+        self.fail_next = 0
+        self.delay = 0
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'  # keep-alive
+
+            def do_GET(self):
+                fake.requests.append((self.client_address, self.path))
+                time.sleep(fake.delay)
+                if fake.fail_next:
+                    fake.fail_next -= 1
+                    body, code = b'{}', 503
+                else:
+                    query = requests.utils.unquote(self.path.split('query=')[1].split('&')[0]).replace('+', ' ')
+                    results = [movie for movie in fake.movies if movie['title'] == query]
+                    body, code = json.dumps({'results': results}).encode(), 200
+                try:
+                    self.send_response(code)
+                    self.send_header('Content-Type', 'application/json')
+                    self.send_header('Content-Length', str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # istemci zaman aşımıyla bağlantıyı kapattı
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.server.server_port}/3'
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+TEST_CACHES = {**settings.CACHES, 'tmdb': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'test-tmdb'}}
+TMDB_MOVIES = [
+    {'id': 27205, 'title': 'Inception', 'release_date': '2010-07-15', 'overview': 'Dreams.',
+     'poster_path': '/inception.jpg', 'vote_average': 8.4},
+    {'id': 157336, 'title': 'Interstellar', 'release_date': '2014-11-05', 'overview': 'Space.',
+     'poster_path': None, 'vote_average': 8.5},
+]
+
 
 class MovieAPITests(APITestCase):
     # Bu sınıf, filmlerle ilgili API testlerini gruplayacak
@@ -32,6 +152,50 @@ class MovieAPITests(APITestCase):
         # DRF XML Renderer varsayılan olarak <root><list-item>... yapısını kullanır
         # Bu yüzden içeriği kontrol etmek biraz daha karmaşık olabilir, şimdilik durum kodu yeterli.
 
+    def test_movie_list_cursor_pagination(self):
+        """Film listesinin movie_id üzerinden cursor ile sayfalandığını test et."""
+        for i in range(5):
+            Movie.objects.create(movie_id=f'page{i:03d}', title=f'Paged Movie {i}')
+
+        url = reverse('api:movie-list-create')
+        response = self.client.get(url, {'page_size': 4})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        first_ids = [item['movie_id'] for item in response.data['results']]
+        self.assertEqual(first_ids, ['page000', 'page001', 'page002', 'page003'])
+        self.assertIsNotNone(response.data['next'])
+
+        response = self.client.get(response.data['next'])
+        second_ids = [item['movie_id'] for item in response.data['results']]
+        self.assertEqual(second_ids, ['page004', 'test001'])
+        self.assertIsNone(response.data['next'])
+
+    def test_movie_list_fields_projection(self):
+        """`fields` parametresiyle sadece istenen alanların döndüğünü test et."""
+        url = reverse('api:movie-list-create')
+        response = self.client.get(url, {'fields': 'title,year'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(set(response.data['results'][0]), {'title', 'year'})
+        self.assertNotIn(b'<plot>', response.content)
+
+        response = self.client.get(url, {'fields': 'title,unknown'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_movie_list_streaming(self):
+        """`stream=true` ile tüm listenin XMLRenderer ile aynı çıktıda akış olarak geldiğini test et."""
+        for i in range(5):
+            Movie.objects.create(movie_id=f'stream{i:03d}', title=f'Streamed Movie {i}')
+
+        url = reverse('api:movie-list-create')
+        response = self.client.get(url, {'stream': 'true'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        content = b''.join(response.streaming_content)
+
+        expected = XMLRenderer().render(
+            MovieSerializer(Movie.objects.order_by('movie_id'), many=True).data
+        ).encode('utf-8')
+        self.assertEqual(content, expected)
+
     def test_get_movie_detail(self):
         """Belirli bir filmin detaylarının alınabildiğini test et."""
         url = reverse('api:movie-detail', kwargs={'movie_id': self.movie.movie_id})
@@ -121,7 +285,7 @@ class UserAuthAPITests(APITestCase):
 # -----------------------------------------------------------------------------
 #                   İZLENENLER LİSTESİ VE YORUM TESTLERİ
 # -----------------------------------------------------------------------------
-class InteractionAPITests(APITestCase):
+class InteractionAPITests(QueryCountAssertionsMixin, APITestCase):
 
     def setUp(self):
         """Bu test sınıfı için gerekli olan kullanıcı ve film nesnelerini oluştur."""
@@ -175,3 +339,1502 @@ class InteractionAPITests(APITestCase):
         response = self.client.get(url, format='xml')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertIn(b'<body>Another test comment.</body>', response.content)
+
+    def test_comment_list_query_count_is_constant(self):
+        """Yorum sayısı artsa da yorum listesinin sabit sayıda sorgu attığını test et."""
+        for i in range(30):
+            author = User.objects.create(username=f'commenter{i}')
+            Comment.objects.create(author=author, movie=self.movie, body=f'Comment {i}')
+
+        url = reverse('api:comment-list-create', kwargs={'movie_id': self.movie.movie_id})
+        with self.assertMaxQueries(2): # film + yorumlar (yazarlar JOIN ile)
+            response = self.client.get(url, {'page_size': 20})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 20)
+        self.assertEqual(response.data['results'][0]['author_username'], 'commenter29')
+
+        response = self.client.get(response.data['next'])
+        self.assertEqual(len(response.data['results']), 10)
+
+    def test_watched_list_query_count_is_constant(self):
+        """İzlenenler listesinin film başlıkları için ekstra sorgu atmadığını test et."""
+        for i in range(30):
+            movie = Movie.objects.create(movie_id=f'watched{i:03d}', title=f'Watched Movie {i}')
+            WatchedMovie.objects.create(user=self.user, movie=movie)
+
+        url = reverse('api:watched-list')
+        with self.assertMaxQueries(1):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 30)
+        self.assertEqual(response.data['results'][0]['movie_title'], 'Watched Movie 29')
+
+
+# -----------------------------------------------------------------------------
+#                   XSLT / HTML TESTLERİ
+# -----------------------------------------------------------------------------
+class XSLTCacheTests(APITestCase):
+
+    def setUp(self):
+        self.movie = Movie.objects.create(movie_id='xslt001', title='XSLT Movie', year=2020)
+        xslt_registry.clear()
+        caches['html'].clear()
+
+    def test_stylesheet_compiled_once(self):
+        """Aynı stylesheet'in ikinci istekte yeniden derlenmediğini test et."""
+        url = reverse('api:movie-detail-html', kwargs={'movie_id': self.movie.movie_id})
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_200_OK)
+        caches['html'].clear() # HTML önbelleğini atla, XSLT tekrar çalışsın
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_200_OK)
+        self.assertEqual(xslt_registry.stats(), {'hits': 1, 'misses': 1})
+
+    def test_stylesheet_reloaded_on_change(self):
+        """Dosyanın mtime değeri değişince stylesheet'in yeniden derlendiğini test et."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'test.xsl')
+            with open(path, 'w') as f:
+                f.write(
+                    '<xsl:stylesheet version="1.0" xmlns:xsl="http://www.w3.org/1999/XSL/Transform">'
+                    '<xsl:template match="/"><out>v1</out></xsl:template></xsl:stylesheet>'
+                )
+            first = xslt_registry.get(path)
+            self.assertIs(xslt_registry.get(path), first)
+
+            with open(path, 'w') as f:
+                f.write(
+                    '<xsl:stylesheet version="1.0" xmlns:xsl="http://www.w3.org/1999/XSL/Transform">'
+                    '<xsl:template match="/"><out>v2</out></xsl:template></xsl:stylesheet>'
+                )
+            os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 1_000_000_000))
+            second = xslt_registry.get(path)
+            self.assertIsNot(second, first)
+            self.assertIn(b'v2', etree.tostring(second(etree.fromstring('<a/>'))))
+
+    def test_stylesheet_not_shared_between_threads(self):
+        """Her thread'in kendi derlenmiş XSLT kopyasını aldığını test et."""
+        path = os.path.join(settings.BASE_DIR, 'xslt', 'movie_to_html.xsl')
+        main_transform = xslt_registry.get(path)
+        result = []
+        thread = threading.Thread(target=lambda: result.append(xslt_registry.get(path)))
+        thread.start()
+        thread.join()
+        self.assertIsNot(result[0], main_transform)
+
+
+class HTMLCacheTests(APITestCase):
+
+    def setUp(self):
+        self.movie = Movie.objects.create(movie_id='html001', title='Cached Movie', year=2021)
+        caches['html'].clear()
+
+    def test_detail_page_served_from_cache(self):
+        """İkinci istekte sayfanın veritabanına gitmeden önbellekten geldiğini test et."""
+        url = reverse('api:movie-detail-html', kwargs={'movie_id': self.movie.movie_id})
+        first = self.client.get(url)
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        with self.assertNumQueries(0):
+            second = self.client.get(url)
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second['ETag'], first['ETag'])
+
+    def test_conditional_get_returns_304(self):
+        """ETag veya Last-Modified ile gelen koşullu isteğe 304 dönüldüğünü test et."""
+        url = reverse('api:movie-detail-html', kwargs={'movie_id': self.movie.movie_id})
+        first = self.client.get(url)
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=first['Last-Modified'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_cache_invalidated_on_save_and_delete(self):
+        """Film güncellenince detay ve liste sayfalarının yeniden üretildiğini test et."""
+        detail_url = reverse('api:movie-detail-html', kwargs={'movie_id': self.movie.movie_id})
+        list_url = reverse('api:movie-list-html')
+        self.client.get(detail_url)
+        response_html(self.client.get(list_url))
+
+        self.movie.title = 'Renamed Movie'
+        self.movie.save()
+        self.assertIn('Renamed Movie', self.client.get(detail_url).content.decode('utf-8'))
+        self.assertIn('Renamed Movie', response_html(self.client.get(list_url)))
+
+        self.movie.delete()
+        self.assertNotIn('Renamed Movie', response_html(self.client.get(list_url)))
+
+
+# -----------------------------------------------------------------------------
+#                   YÖNETİM KOMUTU TESTLERİ
+# -----------------------------------------------------------------------------
+class LoadMoviesCommandTests(TestCase):
+
+    def test_load_movies_sequential(self):
+        """Komutun geçerli dosyaları yükleyip geçersiz olanı raporladığını test et."""
+        out, err = StringIO(), StringIO()
+        call_command('load_movies_from_xml', stdout=out, stderr=err)
+        self.assertEqual(Movie.objects.count(), 3)
+        self.assertIn('3 movies created, 0 movies updated, 1 files failed', out.getvalue())
+        self.assertIn('yanlis.xml', err.getvalue())
+
+    def test_load_movies_parallel_upsert(self):
+        """Process pool ile yüklemenin mevcut kayıtları güncellediğini test et."""
+        Movie.objects.create(movie_id='mov001', title='Old Title')
+        out = StringIO()
+        call_command('load_movies_from_xml', workers=2, batch_size=2, stdout=out, stderr=StringIO())
+        self.assertIn('2 movies created, 1 movies updated, 1 files failed', out.getvalue())
+        inception = Movie.objects.get(pk='mov001')
+        self.assertEqual(inception.title, 'Inception')
+        self.assertEqual(inception.director, 'Christopher Nolan')
+
+    def test_movies_document_is_rejected_by_schema(self):
+        """Çok filmli <movies> (export) belgesi tek film dosyası olarak şema hatası vermeli."""
+        with tempfile.TemporaryDirectory() as tmp:
+            with open(os.path.join(tmp, 'export.xml'), 'w', encoding='utf-8') as f:
+                f.write('<movies><movie id="m1"><title>Inception</title></movie></movies>')
+            out, err = StringIO(), StringIO()
+            call_command('load_movies_from_xml', directory=tmp, stdout=out, stderr=err)
+        self.assertIn('0 movies created, 0 movies updated, 1 files failed', out.getvalue())
+        self.assertIn('XML VALIDATION ERROR', err.getvalue())
+
+
+class LoadLargeMoviesCommandTests(TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.xml_path = os.path.join(self.tmp_dir.name, 'movies.xml')
+        with open(self.xml_path, 'w', encoding='utf-8') as f:
+            f.write('<?xml version="1.0" encoding="UTF-8"?>\n<movies>\n')
+            for i in range(1, 6):
+                f.write(f'  <movie id="gen_{i:06d}"><title>Generated Movie {i}</title>'
+                        f'<year>2000</year><rating>7.5</rating></movie>\n')
+            f.write('  <movie id="bad_000001"><titl>Broken</titl></movie>\n')
+            f.write('</movies>\n')
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_streaming_import_validates_and_checkpoints(self):
+        """Büyük dosyanın batch'ler halinde yüklendiğini ve checkpoint yazıldığını test et."""
+        out, err = StringIO(), StringIO()
+        call_command('load_large_movies_xml', file=self.xml_path, batch_size=2, stdout=out, stderr=err)
+        self.assertEqual(Movie.objects.count(), 5)
+        self.assertIn('5 movies created, 0 movies updated, 1 movies failed', out.getvalue())
+        self.assertIn('bad_000001', err.getvalue())
+        with open(self.xml_path + '.checkpoint') as f:
+            self.assertEqual(f.read(), 'gen_000005')
+
+    def test_resume_from_checkpoint(self):
+        """--resume ile checkpoint'teki id'ye kadar olan filmlerin atlandığını test et."""
+        with open(self.xml_path + '.checkpoint', 'w') as f:
+            f.write('gen_000003')
+        out = StringIO()
+        call_command('load_large_movies_xml', file=self.xml_path, resume=True, stdout=out, stderr=StringIO())
+        self.assertEqual(
+            sorted(Movie.objects.values_list('movie_id', flat=True)), ['gen_000004', 'gen_000005']
+        )
+        self.assertIn('3 skipped', out.getvalue())
+
+    def test_search_index_is_rebuilt_after_import(self):
+        """Tetikleyiciler import boyunca kaldırılsa da sonunda arama indeksi güncel olmalı."""
+        call_command('load_large_movies_xml', file=self.xml_path, stdout=StringIO(), stderr=StringIO())
+        response = self.client.get(reverse('api:movie-search'), {'q': 'generated', 'page_size': 10})
+        self.assertEqual(len(response.data['results']), 5)
+        # Tetikleyiciler geri kurulmuş olmalı: yeni film de indekse girer
+        Movie.objects.create(movie_id='later', title='Generated Later')
+        response = self.client.get(reverse('api:movie-search'), {'title': 'ted Lat'})
+        self.assertEqual([item['movie_id'] for item in response.data['results']], ['later'])
+
+
+class ParsingBenchmarkCommandTests(TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.xml_path = os.path.join(self.tmp_dir.name, 'movies.xml')
+        with open(self.xml_path, 'w', encoding='utf-8') as f:
+            f.write('<movies>')
+            for i in range(50):
+                f.write(f'<movie id="gen_{i:06d}"><title>Movie {i}</title></movie>')
+            f.write('</movies>')
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_benchmark_writes_json_report(self):
+        """Tüm stratejilerin aynı film sayısını bulduğunu ve JSON raporunun yazıldığını test et."""
+        output = os.path.join(self.tmp_dir.name, 'bench.json')
+        call_command(
+            'test_parsing_performance', file=self.xml_path, repeat=2, warmup=0,
+            no_isolate=True, output=output, stdout=StringIO(),
+        )
+        with open(output) as f:
+            report = json.load(f)
+        self.assertEqual(len(report['strategies']), 6)
+        for result in report['strategies'].values():
+            self.assertEqual(result['count'], 50)
+            self.assertLessEqual(result['min'], result['median'])
+            self.assertLessEqual(result['median'], result['p95'])
+
+    def test_benchmark_without_rss_measurement(self):
+        """resource ve psutil yoksa (ör. Windows) komut tracemalloc tepe değeriyle çalışmalı."""
+        output = os.path.join(self.tmp_dir.name, 'bench.json')
+        module = 'api.management.commands.test_parsing_performance'
+        with mock.patch(f'{module}.resource', None), mock.patch(f'{module}.psutil', None):
+            call_command(
+                'test_parsing_performance', file=self.xml_path, repeat=1, warmup=0, strategies='dom',
+                no_isolate=True, output=output, stdout=StringIO(),
+            )
+        with open(output) as f:
+            result = json.load(f)['strategies']['dom']
+        self.assertEqual((result['count'], result['peak_rss_kb'], result['peak_rss_delta_kb']), (50, None, None))
+        self.assertGreater(result['tracemalloc_peak_kb'], 0)
+
+    def test_benchmark_fails_on_regression(self):
+        """Baseline'dan eşikten fazla yavaş olan stratejide komutun hata verdiğini test et."""
+        baseline = os.path.join(self.tmp_dir.name, 'baseline.json')
+        with open(baseline, 'w') as f:
+            json.dump({'strategies': {'dom': {'median': 1e-9}}}, f)
+        with self.assertRaises(CommandError):
+            call_command(
+                'test_parsing_performance', file=self.xml_path, repeat=1, warmup=0, strategies='dom',
+                no_isolate=True, baseline=baseline, threshold=10, stdout=StringIO(),
+            )
+
+
+class GenerateLargeXMLCommandTests(TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _generate(self, name, **options):
+        output = os.path.join(self.tmp_dir.name, name)
+        call_command('generate_large_xml', count=25000, output=output, stdout=StringIO(), **options)
+        return output
+
+    def test_output_is_reproducible_across_shards(self):
+        """Aynı seed ile tek dosya ve shard'lı üretimin aynı filmleri verdiğini test et."""
+        single = self._generate('single.xml', seed=7)
+        self._generate('sharded.xml', seed=7, shards=2)
+
+        def movies(path):
+            with open(path, encoding='utf-8') as f:
+                return [line for line in f if 'movies>' not in line and not line.startswith('<?xml')]
+
+        sharded = (movies(os.path.join(self.tmp_dir.name, 'sharded.part001.xml'))
+                   + movies(os.path.join(self.tmp_dir.name, 'sharded.part002.xml')))
+        self.assertEqual(movies(single), sharded)
+        self.assertEqual(movies(single), movies(self._generate('again.xml', seed=7)))
+        self.assertNotEqual(movies(single), movies(self._generate('other.xml', seed=8)))
+
+    def test_full_field_mix_is_schema_valid(self):
+        """Tüm alanlarla (gzip, CDATA) üretilen filmlerin XSD'ye uygun olduğunu test et."""
+        output = self._generate(
+            'full.xml', plot_length=120, genres=3, actors=2, cdata=True, director=True, gzip=True,
+        )
+        xmlschema = etree.XMLSchema(etree.parse(os.path.join(settings.BASE_DIR, 'schemas', 'movie_schema.xsd')))
+        with gzip.open(output + '.gz') as f:
+            root = etree.parse(f).getroot()
+        self.assertEqual(len(root), 25000)
+        self.assertTrue(all(xmlschema.validate(movie) for movie in root[:500]))
+        self.assertEqual(len(root[0].findall('actors/actor')), 2)
+
+    def test_plot_length_is_bounded_by_source_text(self):
+        """Kaynak metinden uzun --plot-length reddedilmeli; üst sınırda tam uzunlukta plot üretilmeli."""
+        output = os.path.join(self.tmp_dir.name, 'long.xml')
+        with self.assertRaises(CommandError):
+            call_command('generate_large_xml', count=2, output=output, plot_length=MAX_PLOT_LENGTH + 1, stdout=StringIO())
+        call_command('generate_large_xml', count=2, output=output, plot_length=MAX_PLOT_LENGTH, stdout=StringIO())
+        root = etree.parse(output).getroot()
+        self.assertEqual([len(plot) for plot in root.xpath('movie/plot/text()')], [MAX_PLOT_LENGTH] * 2)
+
+
+# -----------------------------------------------------------------------------
+#                   FİLM SAYAÇLARI TESTLERİ
+# -----------------------------------------------------------------------------
+class MovieStatsTests(APITestCase):
+
+    def setUp(self):
+        self.movie = Movie.objects.create(movie_id='stats001', title='Stats Movie')
+        self.users = [User.objects.create(username=f'statsuser{i}') for i in range(3)]
+
+    def test_counters_follow_creates_and_deletes(self):
+        """İzleme ve yorum eklenip silindikçe sayaçların ve ortalamanın güncellendiğini test et."""
+        first = WatchedMovie.objects.create(user=self.users[0], movie=self.movie, user_rating=Decimal('8.0'))
+        WatchedMovie.objects.create(user=self.users[1], movie=self.movie, user_rating=Decimal('7.0'))
+        WatchedMovie.objects.create(user=self.users[2], movie=self.movie)
+        comment = Comment.objects.create(author=self.users[0], movie=self.movie, body='Nice')
+
+        self.movie.refresh_from_db()
+        self.assertEqual(self.movie.watch_count, 3)
+        self.assertEqual(self.movie.user_rating_count, 2)
+        self.assertEqual(self.movie.average_user_rating, Decimal('7.50'))
+        self.assertEqual(self.movie.comment_count, 1)
+
+        first.delete()
+        comment.delete()
+        self.movie.refresh_from_db()
+        self.assertEqual(self.movie.watch_count, 2)
+        self.assertEqual(self.movie.average_user_rating, Decimal('7.00'))
+        self.assertEqual(self.movie.comment_count, 0)
+
+        WatchedMovie.objects.filter(user_rating__isnull=False).get().delete()
+        self.movie.refresh_from_db()
+        self.assertIsNone(self.movie.average_user_rating)
+
+    def test_recompute_command_repairs_counters(self):
+        """recompute_movie_stats komutunun bozulmuş sayaçları düzelttiğini test et."""
+        WatchedMovie.objects.create(user=self.users[0], movie=self.movie, user_rating=Decimal('9.0'))
+        Comment.objects.create(author=self.users[0], movie=self.movie, body='Great')
+        Movie.objects.filter(pk=self.movie.pk).update(watch_count=42, comment_count=0, average_user_rating=None)
+
+        call_command('recompute_movie_stats', batch_size=1, stdout=StringIO())
+        self.movie.refresh_from_db()
+        self.assertEqual(self.movie.watch_count, 1)
+        self.assertEqual(self.movie.comment_count, 1)
+        self.assertEqual(self.movie.average_user_rating, Decimal('9.00'))
+
+    def test_counters_exposed_read_only(self):
+        """Sayaçların API'de gösterildiğini ama istemci tarafından değiştirilemediğini test et."""
+        WatchedMovie.objects.create(user=self.users[0], movie=self.movie)
+        url = reverse('api:movie-detail', kwargs={'movie_id': self.movie.movie_id})
+        response = self.client.get(url)
+        self.assertIn(b'<watch_count>1</watch_count>', response.content)
+        self.assertNotIn(b'user_rating_sum', response.content)
+
+        admin = User.objects.create_superuser(username='statsadmin', password='password123', email='a@test.com')
+        self.client.force_authenticate(user=admin)
+        self.client.put(url, {'movie_id': 'stats001', 'title': 'Stats Movie', 'watch_count': 99}, format='xml')
+        self.movie.refresh_from_db()
+        self.assertEqual(self.movie.watch_count, 1)
+
+
+# -----------------------------------------------------------------------------
+#                   ARAMA TESTLERİ
+# -----------------------------------------------------------------------------
+class MovieSearchTests(APITestCase):
+
+    def setUp(self):
+        Movie.objects.create(movie_id='s1', title='Inception', year=2010, director='Christopher Nolan',
+                             rating=Decimal('8.8'), plot='A thief who steals corporate secrets through dreams.')
+        Movie.objects.create(movie_id='s2', title='Interstellar', year=2014, director='Christopher Nolan',
+                             rating=Decimal('8.7'), plot='Explorers travel through a wormhole in space.')
+        Movie.objects.create(movie_id='s3', title='Parasite', year=2019, director='Bong Joon Ho',
+                             rating=Decimal('8.5'), plot='Greed and class discrimination threaten a family.')
+        Movie.objects.create(movie_id='s4', title='Untitled Draft', year=None, rating=None)
+        self.url = reverse('api:movie-search')
+
+    def _ids(self, response):
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        return [item['movie_id'] for item in response.data['results']]
+
+    def test_full_text_and_title_filters(self):
+        """Tam metin, başlık alt-metni ve önek aramalarını test et."""
+        self.assertEqual(self._ids(self.client.get(self.url, {'q': 'dreams thief'})), ['s1'])
+        self.assertEqual(self._ids(self.client.get(self.url, {'title': 'ERSTEL'})), ['s2'])
+        self.assertEqual(self._ids(self.client.get(self.url, {'title_prefix': 'in'})), ['s1', 's2'])
+        # FTS5 sözdizimi karakterleri hata vermemeli
+        self.assertEqual(self._ids(self.client.get(self.url, {'q': 'wormhole" OR "x'})), [])
+
+    def test_range_filters_and_ordering(self):
+        """Yıl aralığı, yönetmen, minimum puan ve sıralama filtrelerini test et."""
+        response = self.client.get(self.url, {'year_min': 2011, 'year_max': 2020, 'ordering': '-year'})
+        self.assertEqual(self._ids(response), ['s3', 's2'])
+        response = self.client.get(self.url, {'director': 'Christopher Nolan', 'min_rating': '8.8'})
+        self.assertEqual(self._ids(response), ['s1'])
+        response = self.client.get(self.url, {'ordering': 'rating'})
+        self.assertEqual(self._ids(response), ['s3', 's2', 's1', 's4'])
+        self.assertEqual(self.client.get(self.url, {'year_min': 'abc'}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(self.url, {'ordering': 'plot'}).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_keyset_pagination_with_ties_and_nulls(self):
+        """Tekrarlanan ve NULL değerlerde de keyset sayfalamanın her filmi bir kez döndürdüğünü test et."""
+        for i in range(7):
+            Movie.objects.create(movie_id=f'tie{i}', title=f'Tie {i}', year=2010 if i % 2 else None)
+
+        for ordering in ('year', '-year'):
+            seen = []
+            response = self.client.get(self.url, {'ordering': ordering, 'page_size': 3})
+            seen += self._ids(response)
+            while response.data['next']:
+                response = self.client.get(response.data['next'])
+                seen += self._ids(response)
+            self.assertEqual(len(seen), Movie.objects.count())
+            self.assertEqual(set(seen), set(Movie.objects.values_list('movie_id', flat=True)))
+
+    def test_malformed_cursor_and_rating_rejected(self):
+        """Sıralama alanına uymayan cursor değerleri 404, sonlu olmayan min_rating 400 dönmeli."""
+        for ordering, values in (
+            ('year', ['abc', 'x']), ('year', [{}, 'x']), ('year', [2010, 5]), ('rating', ['NaN', 's1']),
+            ('rating', [8.5, 's1']), ('title', [['a'], 's1']), ('title', [None, 's1']),
+        ):
+            with self.subTest(ordering=ordering, values=values):
+                response = self.client.get(self.url, {'ordering': ordering, 'cursor': encode_keyset_cursor(values)})
+                self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.get(self.url, {'ordering': 'rating', 'cursor': encode_keyset_cursor(['8.6', 's9'])})
+        self.assertEqual(self._ids(response), ['s2', 's1', 's4'])
+
+        for value in ('NaN', 'sNaN', 'Infinity', '-inf', 'abc'):
+            with self.subTest(min_rating=value):
+                response = self.client.get(self.url, {'min_rating': value})
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_fts_index_follows_updates(self):
+        """Başlık güncellenince ve film silinince FTS indeksinin güncellendiğini test et."""
+        movie = Movie.objects.get(pk='s3')
+        movie.title = 'Memories of Murder'
+        movie.save()
+        self.assertEqual(self._ids(self.client.get(self.url, {'q': 'memories'})), ['s3'])
+        self.assertEqual(self._ids(self.client.get(self.url, {'title': 'Parasite'})), [])
+        movie.delete()
+        self.assertEqual(self._ids(self.client.get(self.url, {'q': 'memories'})), [])
+
+
+class XPathCatalogTests(APITestCase):
+
+    def setUp(self):
+        catalog.reset()
+        xpath_cache.clear()
+        Movie.objects.create(movie_id='x1', title='Inception', year=2010, director='Christopher Nolan', rating=Decimal('8.8'))
+        Movie.objects.create(movie_id='x2', title='Interstellar', year=2014, director='Christopher Nolan', rating=Decimal('8.7'))
+        Movie.objects.create(movie_id='x3', title='Parasite', year=2019, director='Bong Joon Ho', rating=Decimal('8.5'))
+        self.url = reverse('api:movie-xpath')
+
+    def tearDown(self):
+        catalog.reset()
+
+    def _query(self, expression, **params):
+        response = self.client.get(self.url, {'xpath': expression, **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.content)
+        return etree.fromstring(response.content)
+
+    def test_nodeset_and_scalar_results(self):
+        """Düğüm kümesi, metin ve sayı sonuçlarını ve limit'i test et."""
+        result = self._query("/movies/movie[director='Christopher Nolan' and rating > 8.7]")
+        self.assertEqual(result.get('count'), '1')
+        self.assertEqual(result.findtext('movie/title'), 'Inception')
+
+        result = self._query('/movies/movie[year > 2000]/@id', limit=2)
+        self.assertEqual((result.get('count'), result.get('returned')), ('3', '2'))
+        self.assertEqual([v.text for v in result.findall('value')], ['x1', 'x2'])
+
+        result = self._query('count(/movies/movie)')
+        self.assertEqual((result.get('type'), result.text), ('number', '3'))
+
+    def test_document_is_patched_on_save_and_delete(self):
+        """Katalog kurulduktan sonra film ekleme/güncelleme/silmenin yamalandığını test et."""
+        self._query('/movies')
+        with self.captureOnCommitCallbacks(execute=True):
+            Movie.objects.create(movie_id='x4', title='Memories of Murder', year=2003)
+            movie = Movie.objects.get(pk='x1')
+            movie.title = 'Inception (2010)'
+            movie.save()
+            Movie.objects.filter(pk='x3').delete()
+
+        result = self._query('/movies/movie/title/text()')
+        self.assertEqual([v.text for v in result], ['Inception (2010)', 'Interstellar', 'Memories of Murder'])
+        self.assertEqual(len(catalog), 3)
+
+    def test_changes_from_other_processes_are_applied(self):
+        """Sinyal ipucu olmadan (başka süreç) yapılan değişiklikler değişiklik akışından yamalanmalı."""
+        self._query('/movies')
+        with mock.patch.object(catalog, 'mark_changed'), self.captureOnCommitCallbacks(execute=True):
+            movie = Movie.objects.get(pk='x1')
+            movie.title = 'Inception (2010)'
+            movie.save()
+            Movie.objects.filter(pk='x3').delete()
+
+        result = self._query('/movies/movie/title/text()')
+        self.assertEqual(len(result), 3)
+        with self.settings(XPATH_CATALOG_SYNC_INTERVAL=0):
+            result = self._query('/movies/movie/title/text()')
+        self.assertEqual([v.text for v in result], ['Inception (2010)', 'Interstellar'])
+
+    def test_rebuild_does_not_block_queries(self):
+        """Doküman baştan kurulurken diğer istekler beklemeden eski dokümanı sorgulamalı."""
+        self._query('/movies')
+        compiled = xpath_cache.get('count(/movies/movie)')
+        real_rows, seen = catalog._rows, []
+
+        def rows(queryset):
+            def other_request():
+                catalog.refresh(0.01)
+                seen.append(etree.fromstring(catalog.query(compiled, 10)).text)
+
+            thread = threading.Thread(target=other_request)
+            thread.start()
+            thread.join(5)
+            return real_rows(queryset)
+
+        with mock.patch('api.xpath_catalog.FULL_RELOAD_THRESHOLD', 0), mock.patch.object(catalog, '_rows', rows):
+            with self.captureOnCommitCallbacks(execute=True):
+                Movie.objects.create(movie_id='x4', title='Memories of Murder', year=2003)
+            result = self._query('count(/movies/movie)')
+        self.assertEqual(seen, ['3'])
+        self.assertEqual(result.text, '4')
+
+    def test_compiled_expressions_are_cached(self):
+        """Aynı ifade ikinci kez derlenmemeli."""
+        self._query('//movie')
+        self._query('//movie')
+        self.assertEqual((xpath_cache.stats()['misses'], xpath_cache.stats()['hits']), (1, 1))
+
+    def test_invalid_expression_and_timeout(self):
+        """Geçersiz ifade 400, süre aşımı 503 dönmeli."""
+        self.assertEqual(self.client.get(self.url, {'xpath': '//movie[@'}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(self.url, {'xpath': '$undefined'}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_400_BAD_REQUEST)
+        # Havuzdaki değerlendirme süreyi aşarsa istek beklemeden döner
+        with self.settings(XPATH_TIMEOUT=0.05), mock.patch.object(catalog, 'query', lambda *args: time.sleep(0.5)):
+            response = self.client.get(self.url, {'xpath': '//movie'})
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+
+    def test_unbounded_expressions_are_rejected(self):
+        """Maliyeti doküman boyutuyla sınırlı olmayan ifadeler derlenmeden 400 dönmeli."""
+        rejected = [
+            '//movie[count(//*) > 0]',
+            '//movie[year * /movies/movie]',
+            '//movie[../movie]',
+            '//movie[preceding-sibling::movie]',
+            "document('/etc/passwd')",
+            'a[b[c[d[e]]]]',
+            'concat(., ., ., ., ., ., .)',
+        ]
+        for expression in rejected:
+            with self.subTest(expression=expression):
+                response = self.client.get(self.url, {'xpath': expression})
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(xpath_cache.stats()['misses'], 0)
+
+        result = self._query("//movie[starts-with(title, 'In') and year * 2 > 4020]/title/text()")
+        self.assertEqual([v.text for v in result], ['Interstellar'])
+
+
+class TokenAuthCacheTests(APITestCase):
+
+    def setUp(self):
+        token_cache.clear()
+        self.user = User.objects.create(username='cacheduser')
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        self.url = reverse('api:watched-list')
+
+    def test_repeated_requests_skip_token_query(self):
+        """İkinci istekte token sorgusu atılmamalı."""
+        with CaptureQueriesContext(connections['default']) as first:
+            self.assertEqual(self.client.get(self.url).status_code, status.HTTP_200_OK)
+        with CaptureQueriesContext(connections['default']) as second:
+            self.assertEqual(self.client.get(self.url).status_code, status.HTTP_200_OK)
+        self.assertEqual(len(second), len(first) - 1)
+        self.assertEqual((token_cache.stats()['hits'], token_cache.stats()['misses']), (1, 1))
+
+    def test_deleted_token_and_inactive_user_are_rejected(self):
+        """Token silinince veya kullanıcı pasifleşince önbellekteki kayıt kullanılmamalı."""
+        self.client.get(self.url)
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_401_UNAUTHORIZED)
+
+        self.user.is_active = True
+        self.user.save()
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_200_OK)
+        self.token.delete()
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+
+@override_settings(CACHES=TEST_CACHES, TMDB_API_KEY='test-key')
+class TMDBClientTests(APITestCase):
+
+    def setUp(self):
+        caches['tmdb'].clear()
+
+    def test_retries_pooling_and_cache(self):
+        """503 yanıtları tekrar denenmeli, bağlantı yeniden kullanılmalı, aynı sorgu önbellekten gelmeli."""
+        with FakeTMDBServer(TMDB_MOVIES) as server:
+            client = TMDBClient(base_url=server.url, backoff_factor=0)
+            server.fail_next = 2
+            self.assertEqual(client.search_movie('Inception')[0]['id'], 27205)
+            self.assertEqual(client.search_movie('Interstellar')[0]['id'], 157336)
+            self.assertEqual(client.search_movie('Inception')[0]['id'], 27205)
+            client.close()
+
+        self.assertEqual(len(server.requests), 4)
+        # Tüm istekler tek bir keep-alive bağlantısı üzerinden gitmeli
+        self.assertEqual(len({address for address, path in server.requests}), 1)
+        self.assertIn('api_key=test-key', server.requests[0][1])
+
+    def test_timeout_and_async_variant(self):
+        """Okuma zaman aşımı her iki varyantta hata vermeli; async varyant tekrar denemeli ve aynı sonucu dönmeli."""
+        with FakeTMDBServer(TMDB_MOVIES) as server:
+            client = TMDBClient(base_url=server.url, timeout=(1, 0.2), max_retries=0, pool_size=2)
+            server.delay = 0.5
+            with self.assertRaises(requests.exceptions.RequestException):
+                client.search_movie('Inception')
+            with self.assertRaises(requests.exceptions.RequestException):
+                asyncio.run(client.asearch_movie('Inception'))
+            client.close()
+
+            server.delay = 0
+            client = TMDBClient(base_url=server.url, backoff_factor=0, pool_size=2)
+            server.fail_next = 1
+
+            async def search_all():
+                return await asyncio.gather(*(client.asearch_movie(title) for title in ('Interstellar', 'Inception', 'Parasite')))
+
+            results = asyncio.run(search_all())
+            client.close()
+        self.assertEqual([r[0]['title'] if r else None for r in results], ['Interstellar', 'Inception', None])
+
+    async def test_async_import_view(self):
+        """Async import view'ı yalnızca admin token'ıyla film aktarmalı, tekrar aktarımda 409 dönmeli."""
+        admin = await User.objects.acreate(username='asyncadmin', is_staff=True)
+        token = await Token.objects.acreate(user=admin)
+        plain = await Token.objects.acreate(user=await User.objects.acreate(username='asyncplain'))
+        url = reverse('api:async-import-movie')
+        body = '<importRequest><title>Inception</title></importRequest>'
+
+        def post(key, content=body):
+            return self.async_client.post(url, content, content_type='application/xml', headers={'Authorization': f'Token {key}'})
+
+        with FakeTMDBServer(TMDB_MOVIES) as server, self.settings(TMDB_API_BASE_URL=server.url):
+            self.assertEqual((await post(plain.key)).status_code, status.HTTP_403_FORBIDDEN)
+            self.assertEqual((await post(token.key, '<importRequest/>')).status_code, status.HTTP_400_BAD_REQUEST)
+            response = await post(token.key)
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.content)
+            self.assertEqual(etree.fromstring(response.content).findtext('title'), 'Inception')
+            self.assertEqual((await post(token.key)).status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual((await Movie.objects.aget(pk='tmdb_27205')).year, 2010)
+        self.assertEqual(len(server.requests), 1)
+
+    def test_import_view_uses_client(self):
+        """Import view'ı yerel sunucudan film aktarmalı, tekrar aktarımda TMDB'ye gitmemeli."""
+        admin = User.objects.create(username='tmdbadmin', is_staff=True)
+        self.client.force_authenticate(user=admin)
+        url = reverse('api:import-movie')
+        body = '<importRequest><title>Inception</title></importRequest>'
+        with FakeTMDBServer(TMDB_MOVIES) as server, self.settings(TMDB_API_BASE_URL=server.url):
+            response = self.client.post(url, body, content_type='application/xml')
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.content)
+            response = self.client.post(url, body, content_type='application/xml')
+            self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+
+        movie = Movie.objects.get(pk='tmdb_27205')
+        self.assertEqual((movie.year, movie.poster_url), (2010, 'https://image.tmdb.org/t/p/w500/inception.jpg'))
+        self.assertEqual(len(server.requests), 1)
+
+
+@override_settings(CACHES=TEST_CACHES, TMDB_API_KEY='test-key')
+class BatchImportTests(APITestCase):
+
+    def setUp(self):
+        caches['tmdb'].clear()
+        self.admin = User.objects.create(username='batchadmin', is_staff=True)
+        self.client.force_authenticate(user=self.admin)
+        self.url = reverse('api:import-movies-batch')
+
+    def test_batch_job_is_queued_and_processed(self):
+        """Toplu istek 202 ile iş id'si dönmeli; worker mevcut filmi tek sorguda duplicate işaretlemeli."""
+        Movie.objects.create(movie_id='tmdb_157336', title='Interstellar')
+        body = ('<importRequest><title>Inception</title><title>Interstellar</title>'
+                '<title>Unknown Film</title><title>Inception</title></importRequest>')
+        response = self.client.post(self.url, body, content_type='application/xml')
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED, response.content)
+        job_url = response['Location']
+        self.assertEqual(response.data['counts']['pending'], 3)
+
+        with FakeTMDBServer(TMDB_MOVIES) as server, self.settings(TMDB_API_BASE_URL=server.url):
+            out = StringIO()
+            call_command('process_import_jobs', once=True, workers=2, stdout=out)
+        self.assertIn('1 duplicate, 1 imported, 1 not_found', out.getvalue())
+
+        response = self.client.get(job_url)
+        self.assertEqual(response.data['status'], ImportJob.STATUS_DONE)
+        self.assertEqual(
+            [(item['title'], item['status']) for item in response.data['items']],
+            [('Inception', 'imported'), ('Interstellar', 'duplicate'), ('Unknown Film', 'not_found')],
+        )
+        self.assertTrue(Movie.objects.filter(pk='tmdb_27205', year=2010).exists())
+
+    def test_movie_inserted_concurrently_is_not_reported_imported(self):
+        """Okumadan sonra başka bir worker'ın eklediği film "imported" değil duplicate işaretlenmeli."""
+        job = import_jobs.create_job(['Interstellar', 'Inception'], self.admin)
+        Movie.objects.create(movie_id='tmdb_157336', title='Interstellar')
+        lookups = [({'movie_id': 'tmdb_157336', 'title': 'Interstellar'}, None), ({'movie_id': 'tmdb_27205', 'title': 'Inception'}, None)]
+        classify = import_jobs._classify
+        calls = []
+
+        def stale_classify(items, lookups, existing):
+            # İlk denemede film henüz yokmuş gibi davran
+            calls.append(existing)
+            return classify(items, lookups, existing if len(calls) > 1 else set())
+
+        items = list(job.items.order_by('id'))
+        with mock.patch('api.import_jobs._classify', stale_classify):
+            import_jobs._store_chunk(items, lookups)
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(
+            list(job.items.order_by('id').values_list('title', 'status')),
+            [('Interstellar', 'duplicate'), ('Inception', 'imported')],
+        )
+        self.assertEqual(Movie.objects.get(pk='tmdb_157336').title, 'Interstellar')
+        self.assertTrue(Movie.objects.filter(pk='tmdb_27205').exists())
+
+    def test_rejects_non_admin_and_empty_requests(self):
+        """Admin olmayanlar ve başlıksız istekler reddedilmeli."""
+        response = self.client.post(self.url, '<importRequest/>', content_type='application/xml')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.client.force_authenticate(user=User.objects.create(username='plainuser'))
+        response = self.client.post(self.url, '<importRequest><title>X</title></importRequest>', content_type='application/xml')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_rate_limiter_spaces_calls(self):
+        """Saniyede 50 istek sınırıyla 6 çağrı en az 0.1 saniye sürmeli."""
+        limiter = RateLimiter(50)
+        start = time.monotonic()
+        for _ in range(6):
+            limiter.acquire()
+        self.assertGreaterEqual(time.monotonic() - start, 0.095)
+
+
+class SQLiteTuningTests(TestCase):
+
+    def test_connection_pragmas_are_applied(self):
+        """Ayarlardaki PRAGMA'lar Django bağlantısına uygulanmış olmalı."""
+        with connections['default'].cursor() as cursor:
+            cursor.execute('PRAGMA synchronous')
+            self.assertEqual(cursor.fetchone()[0], 1)  # NORMAL
+            cursor.execute('PRAGMA busy_timeout')
+            self.assertEqual(cursor.fetchone()[0], settings.SQLITE_PRAGMAS['busy_timeout'])
+
+    def test_benchmark_command_reports_both_configurations(self):
+        """Benchmark komutu varsayılan ve ayarlı yapılandırmalar için JSON rapor yazmalı."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            output = os.path.join(tmp_dir, 'sqlite.json')
+            call_command('benchmark_sqlite', rows=200, readers=1, writers=1, duration=0.2, output=output, stdout=StringIO())
+            with open(output) as f:
+                report = json.load(f)
+        self.assertEqual(set(report), {'default', 'tuned'})
+        self.assertGreater(report['tuned']['writes']['ops_per_sec'], 0)
+
+
+class GenreActorTests(QueryCountAssertionsMixin, APITestCase):
+
+    def _row(self, movie_id, genres, actors):
+        return {'movie_id': movie_id, 'title': movie_id.title(), 'year': None, 'director': None, 'plot': None,
+                'poster_url': None, 'rating': None, 'genres': genres, 'actors': actors}
+
+    def test_import_links_genres_and_actors(self):
+        """XML'deki tür ve oyuncular tekrar etmeden kaydedilmeli ve güncellenmeli."""
+        call_command('load_movies_from_xml', stdout=StringIO(), stderr=StringIO())
+        inception = Movie.objects.get(pk='mov001')
+        self.assertEqual(sorted(inception.genres.values_list('name', flat=True)), ['Action', 'Sci-Fi', 'Thriller'])
+        self.assertIn('Leonardo DiCaprio', inception.actors.values_list('name', flat=True))
+        # Aynı tür birden fazla filmde geçse de tek satır olmalı
+        self.assertEqual(Genre.objects.filter(name='Sci-Fi').count(), 1)
+
+        # Yeniden import edilen filmin bağlantıları XML'dekilerle değişmeli
+        bulk_upsert_movies([self._row('mov001', ['Drama'], [])])
+        self.assertEqual(list(inception.genres.values_list('name', flat=True)), ['Drama'])
+        self.assertFalse(inception.actors.exists())
+
+    def test_movies_by_genre_and_actor_endpoints(self):
+        """Türe/oyuncuya göre listeler sayfa başına sabit sayıda sorgu atmalı."""
+        bulk_upsert_movies([
+            self._row(f'm{i:02d}', ['Drama', 'Crime'] if i % 2 else ['Comedy'], ['Ada Smith', f'Actor {i}'])
+            for i in range(20)
+        ])
+        url = reverse('api:movies-by-genre', kwargs={'name': 'Drama'})
+        with self.assertMaxQueries(4):
+            response = self.client.get(url, {'page_size': 5})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([m['movie_id'] for m in response.data['results']], ['m01', 'm03', 'm05', 'm07', 'm09'])
+        self.assertEqual(response.data['results'][0]['genres'], ['Crime', 'Drama'])
+
+        response = self.client.get(reverse('api:movies-by-actor', kwargs={'name': 'Ada Smith'}), {'fields': 'title'})
+        self.assertEqual(len(response.data['results']), 20)
+        self.assertEqual(set(response.data['results'][0]), {'title'})
+        self.assertEqual(
+            self.client.get(reverse('api:movies-by-genre', kwargs={'name': 'Western'})).status_code,
+            status.HTTP_404_NOT_FOUND,
+        )
+
+    def test_detail_html_lists_genres_and_actors(self):
+        """XSLT detay sayfası tür ve oyuncuları göstermeli; bağlantı değişince önbellek yenilenmeli."""
+        caches['html'].clear()
+        movie = Movie.objects.create(movie_id='htmlgenre', title='Genre Movie')
+        url = reverse('api:movie-detail-html', kwargs={'movie_id': movie.pk})
+        self.assertNotIn('Türler', self.client.get(url).content.decode())
+        movie.genres.add(Genre.objects.create(name='Mystery'))
+        movie.actors.add(Person.objects.create(name='Kemal Kaya'))
+        html = self.client.get(url).content.decode()
+        self.assertIn('<span>Mystery</span>', html)
+        self.assertIn('<span>Kemal Kaya</span>', html)
+
+
+class PayloadSchemaValidationTests(QueryCountAssertionsMixin, APITestCase):
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser(username='xsdadmin', password='password123', email='x@test.com')
+        self.client.force_authenticate(user=self.admin)
+        self.url = reverse('api:movie-list-create')
+        schema_registry.clear()
+        validation_stats.reset()
+
+    def test_valid_payload_accepted(self):
+        """Şemaya uyan gövde kabul edilmeli, doğrulama süresi ölçülmeli ve şema bir kere derlenmeli."""
+        for movie_id in ('xsd001', 'xsd002'):
+            data = {'movie_id': movie_id, 'title': 'Schema Movie', 'year': 2021, 'rating': '7.5', 'plot': None}
+            response = self.client.post(self.url, data, format='xml')
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(schema_registry.stats(), {'hits': 1, 'misses': 1})
+        stats = validation_stats.stats()
+        self.assertEqual((stats['count'], stats['invalid']), (2, 0))
+        self.assertGreater(stats['total_ms'], 0)
+
+        # GET yanıtı (salt okunur alanlarıyla) PUT ile geri gönderilebilmeli
+        detail_url = reverse('api:movie-detail', kwargs={'movie_id': 'xsd001'})
+        body = self.client.get(detail_url).content
+        response = self.client.put(detail_url, body, content_type='application/xml')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_invalid_payload_rejected_before_serializer(self):
+        """Şemaya uymayan gövde serializer çalışmadan (sorgu atılmadan) 400 ile reddedilmeli."""
+        cases = [
+            {'movie_id': 'xsd003', 'title': 'Bad Rating', 'rating': '11.0'},
+            {'movie_id': 'xsd003', 'title': 'Bad Year', 'year': 'nineteen'},
+            {'movie_id': 'xsd003'},
+            {'movie_id': 'xsd003', 'title': 'Unknown Field', 'budget': 100},
+        ]
+        for data in cases:
+            with self.assertMaxQueries(0):
+                response = self.client.post(self.url, data, format='xml')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn('XML schema validation error', str(response.data['detail']))
+        self.assertEqual(validation_stats.stats()['invalid'], len(cases))
+        self.assertFalse(Movie.objects.filter(pk='xsd003').exists())
+
+    def test_dtd_rejected(self):
+        """DOCTYPE içeren gövde (entity genişletme) reddedilmeli."""
+        body = ('<?xml version="1.0"?><!DOCTYPE root [<!ENTITY e "x">]>'
+                '<root><movie_id>xsd004</movie_id><title>&e;</title></root>')
+        response = self.client.post(self.url, body, content_type='application/xml')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Movie.objects.filter(pk='xsd004').exists())
+
+
+class HardenedXMLParserTests(APITestCase):
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser(username='parseradmin', password='password123', email='p@test.com')
+        self.client.force_authenticate(user=self.admin)
+
+    def test_same_structure_as_xml_parser(self):
+        """Yeni parser eski XMLParser ile aynı yapıyı (değerler string olarak) üretmeli."""
+        from rest_framework_xml.parsers import XMLParser
+        from .parsers import HardenedXMLParser
+        body = (b'<?xml version="1.0"?><!-- yorum --><root><title>T</title><year>2020</year><plot/>'
+                b'<genres><list-item>Drama</list-item><list-item>Crime</list-item></genres></root>')
+        data = HardenedXMLParser().parse(BytesIO(body))
+        self.assertEqual(data, {'title': 'T', 'year': '2020', 'plot': None, 'genres': ['Drama', 'Crime']})
+        self.assertEqual(XMLParser().parse(BytesIO(body))['genres'], data['genres'])
+
+    def test_billion_laughs_and_deep_nesting_rejected(self):
+        """DTD'li ve çok derin gövdeler 400, sınırı aşan gövdeler 413 ile reddedilmeli."""
+        movie = Movie.objects.create(movie_id='parser001', title='Parser Movie')
+        url = reverse('api:comment-list-create', kwargs={'movie_id': movie.pk})
+        laughs = '<!ENTITY a "aaaaaaaaaa">' + ''.join(f'<!ENTITY a{i} "{"&a;" * 10 if i == 1 else f"&a{i - 1};" * 10}">' for i in range(1, 9))
+        body = f'<?xml version="1.0"?><!DOCTYPE root [{laughs}]><root><body>&a8;</body></root>'
+        response = self.client.post(url, body, content_type='application/xml')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('DTDs are not allowed', str(response.data['detail']))
+
+        with self.settings(XML_MAX_DEPTH=5):
+            response = self.client.post(url, '<root>' + '<a>' * 6 + '</a>' * 6 + '</root>', content_type='application/xml')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        with self.settings(XML_MAX_BODY_SIZE=100):
+            body = f'<importRequest><title>{"x" * 200}</title></importRequest>'
+            for name in ('api:import-movie', 'api:import-movies-batch'):
+                response = self.client.post(reverse(name), body, content_type='application/xml')
+                self.assertEqual(response.status_code, status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+        response = self.client.post(reverse('api:import-movies-batch'), '<importRequest>', content_type='application/xml')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_benchmark_command(self):
+        """benchmark_xml_parser komutu iki parser'ı da ölçüp rapor yazmalı."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            output = os.path.join(tmp_dir, 'parser.json')
+            call_command('benchmark_xml_parser', movies=5, plot_size=100, iterations=2, output=output, stdout=StringIO())
+            with open(output) as f:
+                report = json.load(f)
+        self.assertEqual(set(report['single movie']), {'rest_framework_xml', 'hardened'})
+        self.assertIsNotNone(report['billion laughs']['hardened']['error'])
+
+
+class MetricsTests(APITestCase):
+
+    def setUp(self):
+        metrics.registry.clear()
+        caches['html'].clear()
+        Movie.objects.create(movie_id='metrics001', title='Metrics Movie')
+
+    def test_request_metrics_exported(self):
+        """Görünüm gecikmesi, sorgu sayısı, render/XSLT süresi ve önbellek sayaçları /metrics'te görünmeli."""
+        self.client.get(reverse('api:movie-list-create'))
+        self.client.get(reverse('api:movie-detail-html', kwargs={'movie_id': 'metrics001'}))
+
+        response = self.client.get('/metrics')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        text = response.content.decode()
+        self.assertIn('# TYPE movieapp_http_request_duration_seconds histogram', text)
+        self.assertIn(
+            'movieapp_http_request_duration_seconds_count{method="GET",status="200",view="api:movie-list-create"} 1', text
+        )
+        self.assertIn('movieapp_db_queries_per_request_bucket{method="GET",view="api:movie-list-create",le="+Inf"} 1', text)
+        self.assertIn('movieapp_xml_render_seconds_count{view="api:movie-list-create"} 1', text)
+        self.assertIn('movieapp_xslt_transform_seconds_count{stylesheet="movie_to_html.xsl"} 1', text)
+        self.assertIn('movieapp_cache_misses_total{cache="xslt"}', text)
+
+        queries = metrics.aggregate()['movieapp_db_queries_per_request']['values']
+        self.assertGreater(queries[(('method', 'GET'), ('view', 'api:movie-list-create'))]['sum'], 0)
+
+    def test_snapshots_aggregated_across_processes(self):
+        """METRICS_DIR'deki diğer süreçlerin snapshot'ları toplanmalı, ölü süreçlerinki silinmeli."""
+        self.client.get(reverse('api:movie-list-create'))
+        with tempfile.TemporaryDirectory() as tmp_dir, self.settings(METRICS_DIR=tmp_dir):
+            metrics.flush()
+            with open(os.path.join(tmp_dir, f'{os.getpid()}.json')) as f:
+                snapshot = json.load(f)
+            # Aynı snapshot'ı canlı başka bir süreç (test sürecinin ebeveyni) yazmış gibi davran
+            with open(os.path.join(tmp_dir, f'{os.getppid()}.json'), 'w') as f:
+                json.dump(snapshot, f)
+            dead_path = os.path.join(tmp_dir, '999999999.json')
+            with open(dead_path, 'w') as f:
+                json.dump(snapshot, f)
+
+            aggregated = metrics.aggregate()['movieapp_http_request_duration_seconds']['values']
+            key = (('method', 'GET'), ('status', '200'), ('view', 'api:movie-list-create'))
+            self.assertEqual(aggregated[key]['count'], 2)
+            self.assertFalse(os.path.exists(dead_path))
+
+    def test_dead_process_check_does_not_signal_on_windows(self):
+        """Windows'ta süreç kontrolü os.kill kullanmamalı (orada kill süreci sonlandırır)."""
+        with tempfile.TemporaryDirectory() as tmp_dir, self.settings(METRICS_DIR=tmp_dir):
+            dead_path = os.path.join(tmp_dir, '999999999.json')
+            with open(dead_path, 'w') as f:
+                json.dump({}, f)
+            with mock.patch.object(metrics, 'psutil', None), mock.patch.object(metrics.os, 'name', 'nt'), \
+                    mock.patch.object(metrics, '_windows_pid_alive', return_value=False) as alive, \
+                    mock.patch.object(metrics.os, 'kill') as kill:
+                metrics.aggregate()
+            alive.assert_called_once_with(999999999)
+            kill.assert_not_called()
+            self.assertFalse(os.path.exists(dead_path))
+
+    def test_streaming_duration_covers_the_stream(self):
+        """Akış yanıtlarının süresi, boyutu ve sorguları gövde tükenip yanıt kapanınca kaydedilmeli."""
+        from django.http import StreamingHttpResponse
+        from django.test import RequestFactory
+
+        def chunks():
+            yield b'<movies>'
+            time.sleep(0.05)
+            Movie.objects.count()
+            yield b'</movies>'
+
+        async def async_chunks():
+            yield b'<movies>'
+            await asyncio.sleep(0.05)
+            yield b'</movies>'
+
+        duration = 'movieapp_http_request_duration_seconds'
+        labels = (('method', 'GET'), ('status', '200'), ('view', 'unmatched'))
+        for make_chunks in (chunks, async_chunks):
+            metrics.registry.clear()
+            middleware = metrics.MetricsMiddleware(lambda request: StreamingHttpResponse(make_chunks()))
+            response = middleware(RequestFactory().get('/stream'))
+            self.assertNotIn(duration, metrics.aggregate())
+
+            if response.is_async:
+                async def consume():
+                    return b''.join([chunk async for chunk in response])
+                body = asyncio.run(consume())
+            else:
+                body = b''.join(response)
+            response.close()
+
+            aggregated = metrics.aggregate()
+            self.assertEqual(aggregated[duration]['values'][labels]['count'], 1)
+            self.assertGreaterEqual(aggregated[duration]['values'][labels]['sum'], 0.05)
+            size = aggregated['movieapp_http_response_size_bytes']['values'][labels[:1] + labels[2:]]
+            self.assertEqual(size['sum'], len(body))
+            queries = aggregated['movieapp_db_queries_per_request']['values'][labels[:1] + labels[2:]]
+            self.assertEqual(queries['sum'], 0 if response.is_async else 1)
+
+    def test_streaming_closed_early_is_recorded(self):
+        """İstemci akışı yarıda bırakırsa (close) istek yine bir kez kaydedilmeli."""
+        from django.http import StreamingHttpResponse
+        from django.test import RequestFactory
+
+        middleware = metrics.MetricsMiddleware(lambda request: StreamingHttpResponse(iter([b'a', b'b'])))
+        response = middleware(RequestFactory().get('/stream'))
+        next(iter(response))
+        response.close()
+        response.close()
+        values = metrics.aggregate()['movieapp_http_request_duration_seconds']['values']
+        self.assertEqual(values[(('method', 'GET'), ('status', '200'), ('view', 'unmatched'))]['count'], 1)
+
+    def test_slow_requests_logged(self):
+        """Eşiği aşan istekler süre dökümüyle loglanmalı."""
+        with self.settings(METRICS_SLOW_REQUEST_SECONDS=0), self.assertLogs('api.metrics', 'WARNING') as logs:
+            self.client.get(reverse('api:movie-detail-html', kwargs={'movie_id': 'metrics001'}))
+        self.assertIn('api:movie-detail-html', logs.output[0])
+        self.assertIn('xslt=', logs.output[0])
+
+
+class HTMLCatalogTests(QueryCountAssertionsMixin, APITestCase):
+
+    def setUp(self):
+        caches['html'].clear()
+        titles = ['alien', 'Amadeus', 'Batman', 'Brazil', 'Casablanca', '8 Mile', 'Up']
+        Movie.objects.bulk_create(
+            Movie(movie_id=f'cat{i:02d}', title=title, year=1980 + i % 3) for i, title in enumerate(titles)
+        )
+        Movie.objects.create(movie_id='cat99', title='No Year')
+        self.url = reverse('api:movie-list-html')
+
+    def _titles(self, html):
+        return [a.text.strip() for a in etree.HTML(html).xpath('//section//a')]
+
+    def test_pages_follow_keyset_cursor(self):
+        """Katalog (büyük/küçük harf duyarsız title, movie_id) sırasıyla sayfalanmalı ve 'sonraki sayfa' bağlantısı izlenebilmeli."""
+        with self.assertMaxQueries(1):
+            response = self.client.get(self.url, {'page_size': 3})
+            self.assertTrue(response.streaming)
+            html = response_html(response)
+        self.assertEqual(self._titles(html), ['8 Mile', 'alien', 'Amadeus'])
+
+        seen = self._titles(html)
+        while 'Sonraki sayfa' in html:
+            next_url = etree.HTML(html).xpath('//nav/a[text()="Sonraki sayfa"]/@href')[0]
+            html = response_html(self.client.get(next_url))
+            seen += self._titles(html)
+        self.assertEqual(seen, sorted(Movie.objects.values_list('title', flat=True), key=str.lower))
+
+        # İkinci istek önbellekten, sorgusuz gelmeli
+        with self.assertMaxQueries(0):
+            response = self.client.get(self.url, {'page_size': 3})
+        self.assertEqual(self._titles(response.content.decode()), ['8 Mile', 'alien', 'Amadeus'])
+
+    def test_letter_and_year_grouping(self):
+        """group=letter/year bölüm başlıkları üretmeli; letter= ve year= süzmeli."""
+        html = response_html(self.client.get(self.url, {'group': 'letter'}))
+        self.assertEqual([h.text for h in etree.HTML(html).iter('h2')], ['#', 'A', 'B', 'C', 'N', 'U'])
+
+        html = response_html(self.client.get(self.url, {'group': 'letter', 'letter': 'a'}))
+        self.assertEqual(self._titles(html), ['alien', 'Amadeus'])
+
+        html = response_html(self.client.get(self.url, {'group': 'year', 'page_size': 4}))
+        self.assertEqual([h.text for h in etree.HTML(html).iter('h2')], ['Unknown', '1980'])
+        next_url = etree.HTML(html).xpath('//nav/a[text()="Sonraki sayfa"]/@href')[0]
+        html = response_html(self.client.get(next_url))
+        # Her sayfa kendi bölüm başlığıyla başlar
+        self.assertEqual([h.text for h in etree.HTML(html).iter('h2')], ['1981', '1982'])
+
+        response = self.client.get(self.url, {'group': 'decade'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_letter_filter_matches_group_headings(self):
+        """ASCII dışı harfler ve küçük hali birden fazla karakter olan İ, group=letter başlıklarıyla aynı filmleri süzmeli."""
+        for movie_id, title in (('tr1', 'Çiçek'), ('tr2', 'çay'), ('tr3', 'İstanbul'), ('tr4', 'ılık'), ('tr5', 'Işık')):
+            Movie.objects.create(movie_id=movie_id, title=title)
+        html = response_html(self.client.get(self.url, {'group': 'letter'}))
+        headings = {h.text for h in etree.HTML(html).iter('h2')}
+        self.assertTrue({'Ç', 'İ', 'I'} <= headings)
+
+        for letter, expected in (('Ç', {'çay', 'Çiçek'}), ('ç', {'çay', 'Çiçek'}), ('İ', {'İstanbul'}), ('i', {'ılık', 'Işık'})):
+            with self.subTest(letter=letter):
+                self.assertEqual(set(self._titles(response_html(self.client.get(self.url, {'letter': letter})))), expected)
+
+        for letter in ('ab', '8', 'ß'):
+            with self.subTest(letter=letter):
+                response = self.client.get(self.url, {'letter': letter})
+                self.assertFalse(response.streaming)
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_invalid_cursor_values_rejected_before_streaming(self):
+        """Çözülebilen ama değerleri bozuk ?after= akış başlamadan 400 dönmeli."""
+        for group, values in ((None, [1, 'cat01']), (None, ['a', None]), ('year', ['1980', 'a', 'cat01']), ('year', [{}, 'a', 'b'])):
+            with self.subTest(group=group, values=values):
+                params = {'after': encode_keyset_cursor(values), **({'group': group} if group else {})}
+                response = self.client.get(self.url, params)
+                self.assertFalse(response.streaming)
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        html = response_html(self.client.get(self.url, {'group': 'year', 'after': encode_keyset_cursor([None, 'no year', 'cat99'])}))
+        self.assertEqual(self._titles(html)[:3], ['alien', 'Brazil', 'Up'])
+
+
+class AsyncViewTests(TestCase):
+
+    def setUp(self):
+        caches['html'].clear()
+        self.user = User.objects.create_user(username='asyncuser', password='pw')
+        self.token = Token.objects.create(user=self.user)
+        Movie.objects.bulk_create(Movie(movie_id=f'async{i:02d}', title=f'Async Movie {i}') for i in range(5))
+        movie = Movie.objects.get(pk='async00')
+        movie.genres.add(Genre.objects.create(name='Drama'))
+        for i in range(3):
+            Comment.objects.create(movie=movie, author=self.user, body=f'yorum {i}')
+
+    async def test_detail_and_list_match_sync_format(self):
+        """Async detay ve liste, senkron endpoint'lerle aynı XML alanlarını döndürmeli; liste cursor ile sayfalanmalı."""
+        response = await self.async_client.get(reverse('api:async-movie-detail', kwargs={'movie_id': 'async00'}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        root = etree.fromstring(response.content)
+        self.assertEqual(root.findtext('title'), 'Async Movie 0')
+        self.assertEqual(root.findtext('genres/list-item'), 'Drama')
+
+        response = await self.async_client.get(reverse('api:async-movie-detail', kwargs={'movie_id': 'none'}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        url, seen = reverse('api:async-movie-list') + '?page_size=2', []
+        while url:
+            root = etree.fromstring((await self.async_client.get(url)).content)
+            seen += root.xpath('results/list-item/movie_id/text()')
+            url = root.findtext('next')
+        self.assertEqual(seen, [f'async{i:02d}' for i in range(5)])
+
+    async def test_comments_require_token_and_page_newest_first(self):
+        """Async yorum listesi token istemeli ve yorumları yeniden eskiye sayfalamalı."""
+        url = reverse('api:async-comment-list', kwargs={'movie_id': 'async00'})
+        response = await self.async_client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        headers = {'Authorization': f'Token {self.token.key}'}
+        root = etree.fromstring((await self.async_client.get(url, {'page_size': 2}, headers=headers)).content)
+        bodies = root.xpath('results/list-item/body/text()')
+        self.assertEqual(bodies, ['yorum 2', 'yorum 1'])
+        self.assertEqual(root.findtext('results/list-item/author_username'), 'asyncuser')
+
+        root = etree.fromstring((await self.async_client.get(root.findtext('next'), headers=headers)).content)
+        self.assertEqual(root.xpath('results/list-item/body/text()'), ['yorum 0'])
+        self.assertFalse(root.findtext('next'))
+
+        # Çözülebilen ama değerleri bozuk cursor 500 değil 404 dönmeli
+        for values in (['not-a-date', 1], [timezone.now().isoformat(), 'x'], [[], {}], ['2026-01-01T00:00:00', 1]):
+            with self.subTest(values=values):
+                response = await self.async_client.get(url, {'cursor': encode_keyset_cursor(values)}, headers=headers)
+                self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        response = await self.async_client.get(reverse('api:async-movie-list'), {'cursor': encode_keyset_cursor([{}])})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    async def test_html_detail_shares_cache_and_metrics(self):
+        """Async HTML detay, senkron görünümle aynı önbelleği kullanmalı ve metriklere işlenmeli."""
+        metrics.registry.clear()
+        url = reverse('api:async-movie-detail-html', kwargs={'movie_id': 'async00'})
+        response = await self.async_client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('Async Movie 0', response.content.decode())
+
+        response = await self.async_client.get(url, headers={'If-None-Match': response['ETag']})
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        text = metrics.render_prometheus()
+        self.assertIn('movieapp_xslt_transform_seconds_count{stylesheet="movie_to_html.xsl"} 1', text)
+        # Sorgular sync_to_async thread'inde çalışsa da isteğe sayılmalı
+        queries = metrics.aggregate()['movieapp_db_queries_per_request']['values']
+        self.assertGreater(queries[(('method', 'GET'), ('view', 'api:async-movie-detail-html'))]['sum'], 0)
+
+
+class MovieFragmentCacheTests(QueryCountAssertionsMixin, APITestCase):
+
+    def setUp(self):
+        fragment_cache.clear()
+        self.user = User.objects.create_user(username='fragmentuser', password='pw')
+        Movie.objects.bulk_create(
+            Movie(movie_id=f'frag{i:02d}', title=f'Fragment <Movie> {i}', rating=Decimal('7.5')) for i in range(6)
+        )
+        Movie.objects.get(pk='frag00').genres.add(Genre.objects.create(name='Drama'))
+        self.detail_url = reverse('api:movie-detail', kwargs={'movie_id': 'frag00'})
+
+    def _expected(self, movie_id):
+        movie = project_movies(Movie.objects.all(), None).get(pk=movie_id)
+        return XMLRenderer().render(MovieSerializer(movie).data).encode()
+
+    def test_detail_and_list_served_from_cache(self):
+        """İkinci istekten itibaren detay tek sürüm sorgusuyla, liste tek sorguyla gelmeli; çıktı XMLRenderer ile aynı olmalı."""
+        self.assertEqual(self.client.get(self.detail_url).content, self._expected('frag00'))
+        with self.assertMaxQueries(1):
+            response = self.client.get(self.detail_url)
+        self.assertEqual(response.content, self._expected('frag00'))
+        self.assertEqual(response.data['genres'], ['Drama'])
+
+        url = reverse('api:movie-list-create')
+        cold = self.client.get(url, {'page_size': 4})
+        with self.assertMaxQueries(1):
+            warm = self.client.get(url, {'page_size': 4})
+        self.assertEqual(warm.content, cold.content)
+        self.assertEqual([item['movie_id'] for item in warm.data['results']], [f'frag{i:02d}' for i in range(4)])
+        self.assertGreater(fragment_cache.stats()['hit_rate'], 0.5)
+
+        # ?fields= projeksiyonu önbelleği kullanmaz
+        response = self.client.get(url, {'fields': 'title'})
+        self.assertEqual(set(response.data['results'][0]), {'title'})
+
+    def test_refreshed_on_changes(self):
+        """Sinyaller, sayaç güncellemeleri, tür değişikliği ve toplu import önbellekteki parçayı yenilemeli."""
+        self.client.get(self.detail_url)
+
+        Comment.objects.create(movie_id='frag00', author=self.user, body='yorum')
+        self.assertEqual(self.client.get(self.detail_url).data['comment_count'], 1)
+
+        Movie.objects.get(pk='frag00').genres.add(Genre.objects.create(name='Crime'))
+        self.assertEqual(self.client.get(self.detail_url).data['genres'], ['Crime', 'Drama'])
+
+        bulk_upsert_movies([{'movie_id': 'frag00', 'title': 'Imported Title', 'year': 2001, 'director': None,
+                             'plot': None, 'poster_url': None, 'rating': None, 'genres': [], 'actors': []}])
+        self.assertEqual(self.client.get(self.detail_url).content, self._expected('frag00'))
+
+        Movie.objects.filter(pk='frag00').delete()
+        self.assertEqual(self.client.get(self.detail_url).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_changes_from_other_processes_are_seen(self):
+        """Bu süreçte geçersiz kılınmayan (başka süreçte yapılmış) değişiklik updated_at'ten fark edilmeli."""
+        list_url = reverse('api:movie-list-create')
+        self.client.get(self.detail_url)
+        self.client.get(list_url, {'page_size': 2})
+
+        # QuerySet.update() sinyal göndermez: başka bir worker'ın ya da komutun yazması gibi
+        Movie.objects.filter(pk__in=['frag00', 'frag01']).update(title='Elsewhere', updated_at=timezone.now())
+        self.assertEqual(self.client.get(self.detail_url).data['title'], 'Elsewhere')
+        titles = [item['title'] for item in self.client.get(list_url, {'page_size': 2}).data['results']]
+        self.assertEqual(titles, ['Elsewhere', 'Elsewhere'])
+
+        Movie.objects.filter(pk='frag00').delete()
+        self.assertEqual(self.client.get(self.detail_url).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_counter_updates_do_not_block_other_fragments(self):
+        """Liste okunurken gelen yorum/izleme sadece o filmin parçasını yazdırmamalı, sayfanın geri kalanı önbelleğe girmeli."""
+        movies = list(project_movies(Movie.objects.all(), None).order_by('pk')[:4])
+        generation = fragment_cache.generation
+        # İstek okurken başka istekler sayaçları günceller
+        Comment.objects.create(movie_id='frag00', author=self.user, body='yorum')
+        WatchedMovie.objects.create(user=self.user, movie_id='frag01', user_rating=Decimal('6.0'))
+        movie_fragments(movies, movie_prefetches(), generation)
+
+        cached = fragment_cache.get_many({movie.movie_id: movie.updated_at for movie in movies})
+        self.assertEqual(set(cached), {'frag02', 'frag03'})
+
+        url = reverse('api:movie-list-create')
+        self.client.get(url, {'page_size': 4})
+        with self.assertMaxQueries(1):
+            response = self.client.get(url, {'page_size': 4})
+        self.assertEqual([item['comment_count'] for item in response.data['results']], [1, 0, 0, 0])
+        self.assertEqual(response.data['results'][1]['watch_count'], 1)
+
+    def test_lru_bounded_by_entries_and_bytes(self):
+        """En uzun süre kullanılmayan parça düşmeli; toplam boyut sınırı aşılmamalı; eski nesilden gelen yazım atılmalı."""
+        cache = FragmentCache(maxsize=2, max_bytes=1000)
+        fragments = {movie_id: render_fragment({'movie_id': movie_id}) for movie_id in 'abc'}
+        cache.set_many({'a': (1, fragments['a']), 'b': (1, fragments['b'])}, cache.generation)
+        cache.get_many({'a': 1})
+        cache.set_many({'c': (1, fragments['c'])}, cache.generation)
+        self.assertEqual(set(cache.get_many({'a': 1, 'b': 1, 'c': 1})), {'a', 'c'})
+
+        # Farklı sürüm istenirse parça kullanılmaz ve düşer
+        self.assertEqual(cache.get_many({'a': 2}), {})
+        self.assertEqual(cache.get_many({'a': 1}), {})
+
+        # Okuma başladıktan sonra geçersiz kılınan film yazılmaz, diğerleri yazılır
+        generation = cache.generation
+        cache.invalidate_many(['a'])
+        cache.set_many({'a': (1, fragments['a']), 'b': (1, fragments['b'])}, generation)
+        self.assertEqual(set(cache.get_many({'a': 1, 'b': 1})), {'b'})
+        cache.set_many({'a': (1, fragments['a'])}, cache.generation)
+        self.assertEqual(set(cache.get_many({'a': 1})), {'a'})
+
+        # Kayıt sınırı aşılınca düşen kayıttan önce başlamış okumaların hiçbir parçası yazılmaz
+        bounded = FragmentCache(max_invalidations=1)
+        generation = bounded.generation
+        bounded.invalidate_many(['x'])
+        bounded.invalidate_many(['y'])
+        bounded.set_many({'c': (1, fragments['c'])}, generation)
+        self.assertEqual(bounded.get_many({'c': 1}), {})
+        bounded.set_many({'c': (1, fragments['c'])}, bounded.generation)
+        self.assertEqual(set(bounded.get_many({'c': 1})), {'c'})
+
+        generation = cache.generation
+        cache.clear()
+        cache.set_many({'c': (1, fragments['c'])}, generation)
+        self.assertEqual(cache.get_many({'c': 1}), {})
+
+        cache.set_many({'big': (1, render_fragment({'plot': 'x' * 2000}))}, cache.generation)
+        self.assertLessEqual(cache.stats()['bytes'], 1000)
+        self.assertEqual(cache.get_many({'big': 1}), {})
+
+
+class ExportMoviesCommandTests(TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.rows = [
+            {'movie_id': f'exp{i:03d}', 'title': f'Export <Movie> {i}', 'year': 1990 + i, 'director': None,
+             'plot': 'Plot\x01 text' if i == 0 else None, 'poster_url': f'https://example.com/{i}.jpg',
+             'rating': Decimal('7.5'), 'genres': ['Drama', 'Crime'] if i % 2 else [], 'actors': [f'Actor {i}']}
+            for i in range(25)
+        ]
+        bulk_upsert_movies(self.rows)
+        user = User.objects.create_user(username='exporter', password='pw')
+        Comment.objects.create(movie_id='exp001', author=user, body='Harika!')
+        WatchedMovie.objects.create(user=user, movie_id='exp001', user_rating=Decimal('8.0'))
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _export(self, name, **options):
+        output = os.path.join(self.tmp_dir.name, name)
+        call_command('export_movies', output=output, stdout=StringIO(), stderr=StringIO(), **options)
+        return output
+
+    def test_sharded_gzip_xml_is_schema_valid_and_reimportable(self):
+        """Shard'lı gzip XML çıktısı XSD'ye uymalı, tüm filmleri sırasıyla içermeli ve geri import edilebilmeli."""
+        self._export('movies.xml', gzip=True, shards=3, batch_size=4,
+                     with_credits=True, with_comments=True, with_stats=True, validate=True)
+        xmlschema = etree.XMLSchema(etree.parse(os.path.join(settings.BASE_DIR, 'schemas', 'movie_export.xsd')))
+        import_schema = etree.XMLSchema(etree.parse(os.path.join(settings.BASE_DIR, 'schemas', 'movie_schema.xsd')))
+
+        movies = []
+        for part in range(1, 4):
+            with gzip.open(os.path.join(self.tmp_dir.name, f'movies.part{part:03d}.xml.gz')) as f:
+                document = etree.parse(f)
+            # Her shard <movies> kökü dahil bir bütün olarak şemaya uymalı
+            xmlschema.assertValid(document)
+            # İçe aktarma şeması sadece tek <movie> belgelerini kabul eder
+            self.assertFalse(import_schema.validate(document))
+            movies += list(document.getroot())
+        self.assertEqual([movie.get('id') for movie in movies], [row['movie_id'] for row in self.rows])
+
+        # XML'de yazılamayan kontrol karakterleri atılır, gerisi aynen geri okunur
+        expected = [{**row, 'plot': row['plot'] and row['plot'].replace('\x01', '')} for row in self.rows]
+        self.assertEqual([movie_row_from_element(movie) for movie in movies], expected)
+
+        stats = movies[1].find('stats')
+        self.assertEqual((stats.get('watchCount'), stats.get('commentCount')), ('1', '1'))
+        self.assertEqual(movies[1].findtext('comments/comment'), 'Harika!')
+        self.assertIsNone(movies[0].find('genres'))
+
+    def test_ndjson_export(self):
+        """NDJSON çıktısı satır başına bir film içermeli."""
+        output = self._export('movies.ndjson', format='ndjson', with_credits=True, with_stats=True)
+        with open(output, encoding='utf-8') as f:
+            lines = [json.loads(line) for line in f]
+        self.assertEqual(len(lines), 25)
+        self.assertEqual(lines[1]['genres'], ['Drama', 'Crime'])
+        self.assertEqual(lines[1]['rating'], 7.5)
+        self.assertEqual(lines[1]['average_user_rating'], 8.0)
+        self.assertNotIn('comments', lines[1])
+
+        with self.assertRaises(CommandError):
+            self._export('movies.ndjson', format='ndjson', validate=True)
+
+        # --output verilmezse uzantı formattan gelir
+        with override_settings(BASE_DIR=self.tmp_dir.name):
+            call_command('export_movies', format='ndjson', stdout=StringIO())
+        self.assertTrue(os.path.exists(os.path.join(self.tmp_dir.name, 'data', 'export', 'movies.ndjson')))
+
+    def test_shard_bounds_walk_the_primary_key(self):
+        """Shard sınırları, pk birden çok keyset sayfasında gezilse de eşit sayıda film bölmeli."""
+        with mock.patch('api.xml_export.BOUNDS_BATCH_SIZE', 4):
+            bounds = shard_bounds(4)
+        ids = [row['movie_id'] for row in self.rows]
+        self.assertEqual(bounds, [(None, ids[6]), (ids[6], ids[12]), (ids[12], ids[18]), (ids[18], None)])
+        self.assertEqual(shard_bounds(30)[-1], (ids[24], None))
+
+
+@override_settings(CHANGE_FEED_SETTLE_SECONDS=0)
+class ChangeFeedTests(QueryCountAssertionsMixin, APITestCase):
+
+    def setUp(self):
+        fragment_cache.clear()
+        self.url = reverse('api:movie-changes')
+        self.user = User.objects.create_user(username='mirror', password='pw')
+        Movie.objects.bulk_create(Movie(movie_id=f'chg{i}', title=f'Change {i}') for i in range(4))
+        Movie.objects.get(pk='chg3').genres.add(Genre.objects.create(name='Noir'))
+
+    def _sync(self, since=None, **params):
+        """Bir aynanın yapacağı gibi `next` bitene kadar sayfaları okur; (değişiklikler, yeni token) döner."""
+        response = self.client.get(self.url, {'since': since, **params} if since else params)
+        changes = list(response.data['results'])
+        while response.data['next']:
+            # Aynı sayfayı tekrar döndüren bir akış sonsuz döngüye girmesin
+            self.assertLess(len(changes), 100)
+            response = self.client.get(response.data['next'])
+            changes.extend(response.data['results'])
+        return changes, response.data['since']
+
+    def test_full_sync_then_delta(self):
+        """İlk senkron tüm filmleri, sonraki sadece eklenen/güncellenen/silinenleri getirmeli."""
+        changes, since = self._sync(page_size=3)
+        self.assertEqual(sorted(change['movie_id'] for change in changes), ['chg0', 'chg1', 'chg2', 'chg3'])
+        self.assertEqual({change['change'] for change in changes}, {'upsert'})
+        self.assertEqual(self._sync(since)[0], [])
+
+        movie = Movie.objects.get(pk='chg0')
+        movie.title = 'Renamed'
+        movie.save()
+        Comment.objects.create(movie_id='chg1', author=self.user, body='yorum')
+        Movie.objects.filter(pk='chg2').delete()
+        Genre.objects.filter(name='Noir').update(name='Neo-noir')  # UPDATE sinyalsiz: akışa girmez
+        bulk_upsert_movies([{'movie_id': 'chg9', 'title': 'Imported', 'year': None, 'director': None,
+                             'plot': None, 'poster_url': None, 'rating': None, 'genres': [], 'actors': []}])
+
+        changes, since = self._sync(since)
+        by_id = {change['movie_id']: change for change in changes}
+        self.assertEqual(set(by_id), {'chg0', 'chg1', 'chg2', 'chg9'})
+        self.assertEqual(by_id['chg0']['movie']['title'], 'Renamed')
+        self.assertEqual(by_id['chg1']['movie']['comment_count'], 1)
+        self.assertEqual((by_id['chg2']['change'], set(by_id['chg2'])), ('delete', {'change', 'movie_id', 'changed_at'}))
+        self.assertEqual([change['changed_at'] for change in changes], sorted(change['changed_at'] for change in changes))
+
+        # Tür adının değişmesi filmini de değişmiş sayar; sayfa iki sorguyla okunur (parçalar önbellekte)
+        Genre.objects.get(name='Neo-noir').save()
+        self.client.get(self.url, {'since': since})
+        with self.assertMaxQueries(2):
+            changes, since = self._sync(since)
+        self.assertEqual([(change['movie_id'], change['movie']['genres']) for change in changes], [('chg3', ['Neo-noir'])])
+
+    def test_bulk_import_pages_through_equal_timestamps(self):
+        """Toplu import'un aynı zaman damgalı satırları sayfa sınırında tekrar etmeden bir kez gelmeli."""
+        _, since = self._sync()
+        bulk_upsert_movies([
+            {'movie_id': f'blk{i:03d}', 'title': f'Bulk {i}', 'year': None, 'director': None,
+             'plot': None, 'poster_url': None, 'rating': None, 'genres': [], 'actors': []}
+            for i in range(7)
+        ])
+        self.assertEqual(len(set(Movie.objects.filter(pk__startswith='blk').values_list('updated_at', flat=True))), 1)
+
+        changes, _ = self._sync(since, page_size=2)
+        self.assertEqual([change['movie_id'] for change in changes], [f'blk{i:03d}' for i in range(7)])
+
+    def test_settle_window_stream_and_invalid_token(self):
+        """Son saniyeler verilmemeli; akış tüm değişiklikleri ve token'ı vermeli; bozuk token 404 olmalı."""
+        _, since = self._sync()
+        Movie.objects.filter(pk='chg1').delete()
+        with override_settings(CHANGE_FEED_SETTLE_SECONDS=3600):
+            response = self.client.get(self.url, {'since': since})
+        self.assertEqual((response.data['results'], response.data['since']), ([], since))
+
+        response = self.client.get(self.url, {'since': since, 'stream': 'true'})
+        root = etree.fromstring(b''.join(response.streaming_content))
+        self.assertEqual(
+            [(item.findtext('change'), item.findtext('movie_id')) for item in root.iter('list-item')], [('delete', 'chg1')]
+        )
+        self.assertEqual(self._sync(response['X-Change-Feed-Since'])[0], [])
+
+        root = etree.fromstring(b''.join(self.client.get(self.url, {'stream': 'true'}).streaming_content))
+        self.assertEqual(sorted(root.xpath('list-item/movie/title/text()')), ['Change 0', 'Change 2', 'Change 3'])
+        self.assertEqual(self.client.get(self.url, {'since': 'bozuk'}).status_code, status.HTTP_404_NOT_FOUND)
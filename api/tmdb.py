@@ -0,0 +1,165 @@
+"""
+The Movie Database (TMDB) API istemcisi.
+
+Tüm istekler tek bir requests.Session üzerinden gider; bağlantılar keep-alive
+ile havuzda tutulur (urllib3 havuzu thread-safe'tir). Geçici hatalar (429, 5xx,
+bağlantı hataları) üstel bekleme ile yeniden denenir. Başarılı yanıtlar sorgu
+anahtarına göre 'tmdb' önbelleğinde saklanır, aynı başlık ikinci kez
+TMDB'ye sorulmaz.
+
+requests'in async API'si yoktur; asearch_movie() aynı havuzlu oturumu istemcinin
+kendi sınırlı thread havuzunda (bağlantı başına bir thread) kullanır.
+"""
+import asyncio
+import contextvars
+import functools
+import hashlib
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.conf import settings
+from django.core.cache import caches
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+TMDB_CACHE_ALIAS = 'tmdb'
+POSTER_BASE_URL = 'https://image.tmdb.org/t/p/w500'
+
+
+class RateLimiter:
+    """Thread-safe limiter that spaces calls to at most `rate` per second."""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate
+        self._next = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        # Her çağrı kendi zaman dilimini ayırır, kilit dışında uyur
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class TMDBClient:
+    """Pooled TMDB client with timeouts, retries and a persistent response cache."""
+
+    def __init__(self, api_key=None, base_url=None, timeout=None, max_retries=None, backoff_factor=None,
+                 pool_size=10, rate_limiter=None):
+        # Verilmeyen değerler her istekte ayarlardan okunur
+        self.rate_limiter = rate_limiter
+        self.pool_size = pool_size
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        self._api_key = api_key
+        self._base_url = base_url
+        self._timeout = timeout
+
+        retry = Retry(
+            total=settings.TMDB_MAX_RETRIES if max_retries is None else max_retries,
+            backoff_factor=settings.TMDB_RETRY_BACKOFF if backoff_factor is None else backoff_factor,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=('GET',),
+            respect_retry_after_header=True,
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    @property
+    def api_key(self):
+        return self._api_key or settings.TMDB_API_KEY
+
+    @property
+    def base_url(self):
+        return (self._base_url or settings.TMDB_API_BASE_URL).rstrip('/')
+
+    @property
+    def timeout(self):
+        return self._timeout or settings.TMDB_TIMEOUT
+
+    def _cache_key(self, path, params):
+        # api_key anahtara girmez; anahtar değişse de önbellek geçerli kalır
+        payload = json.dumps([self.base_url, path, sorted(params.items())], ensure_ascii=False)
+        return 'tmdb:' + hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+    def get(self, path, **params):
+        """GETs `path` (e.g. '/search/movie') and returns the decoded JSON, using the cache."""
+        cache = caches[TMDB_CACHE_ALIAS]
+        key = self._cache_key(path, params)
+        data = cache.get(key)
+        if data is not None:
+            return data
+
+        # Hız sınırı sadece TMDB'ye giden isteklere uygulanır, önbellek isabetlerine değil
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+        response = self.session.get(
+            self.base_url + path, params={**params, 'api_key': self.api_key}, timeout=self.timeout
+        )
+        response.raise_for_status()
+        data = response.json()
+        cache.set(key, data)
+        return data
+
+    def search_movie(self, title):
+        """Returns the TMDB search results (a list of dicts) for `title`."""
+        return self.get('/search/movie', query=title).get('results') or []
+
+    def _get_executor(self):
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.pool_size, thread_name_prefix='tmdb')
+            return self._executor
+
+    async def asearch_movie(self, title):
+        """
+        Async variant of search_movie() with the same timeouts, retries, rate limit and
+        cache. At most pool_size lookups run at once; the others wait without a thread.
+        """
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(
+            self._get_executor(), functools.partial(context.run, self.search_movie, title)
+        )
+
+    def close(self):
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+        self.session.close()
+
+
+def movie_fields_from_result(result):
+    """Maps a TMDB search result to Movie field values."""
+    release_date = result.get('release_date')
+    poster_path = result.get('poster_path')
+    return {
+        'movie_id': f"tmdb_{result['id']}",
+        'title': result.get('title'),
+        'year': int(release_date.split('-')[0]) if release_date else None,
+        'plot': result.get('overview'),
+        'poster_url': f"{POSTER_BASE_URL}{poster_path}" if poster_path else None,
+        'rating': result.get('vote_average'),
+    }
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """Returns the process-wide TMDBClient (one connection pool per process)."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = TMDBClient()
+        return _client
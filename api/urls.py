@@ -1,5 +1,5 @@
 from django.urls import path
-from . import views
+from . import async_views, views
 from rest_framework.authtoken.views import obtain_auth_token
 
 
@@ -25,12 +25,33 @@ urlpatterns = [
     path('movies/<str:movie_id>/comments/', views.comment_list_create_view, name='comment-list-create'),
     # Filmleri listelemek ve yeni film eklemek için (POST)
     path('movies/', views.movie_list_create_view, name='movie-list-create'),
+    # Film arama ve filtreleme (movies/<movie_id>/ kalıbından önce gelmeli)
+    path('movies/search/', views.movie_search_view, name='movie-search'),
+    # Katalog aynaları için artımlı değişiklik akışı (?since=<token>)
+    path('movies/changes/', views.movie_changes_view, name='movie-changes'),
+    # Bellekteki katalog dokümanı üzerinde XPath sorgusu
+    path('movies/xpath/', views.movie_xpath_view, name='movie-xpath'),
     # Belirli bir filmi getirmek( GET), güncellemek (PUT), silmek (DELETE) için
     path('movies/<str:movie_id>/', views.movie_detail_view, name='movie-detail'),
 
 
+    # Türe ve oyuncuya göre filmler
+    path('genres/', views.genre_list_view, name='genre-list'),
+    path('genres/<str:name>/movies/', views.movies_by_genre_view, name='movies-by-genre'),
+    path('actors/<str:name>/movies/', views.movies_by_actor_view, name='movies-by-actor'),
+
+    # Sık okunan endpoint'lerin async sürümleri (ASGI altında worker thread'i bağlamaz)
+    path('async/movies/', async_views.movie_list_async_view, name='async-movie-list'),
+    path('async/movies/<str:movie_id>/', async_views.movie_detail_async_view, name='async-movie-detail'),
+    path('async/movies/<str:movie_id>/comments/', async_views.comment_list_async_view, name='async-comment-list'),
+    path('async/html/movies/<str:movie_id>/', async_views.movie_detail_html_async_view, name='async-movie-detail-html'),
+    path('async/import/movie/', async_views.import_movie_async_view, name='async-import-movie'),
+
     # TMDB'den film içe aktarmak için
     path('import/movie/', views.import_movie_from_tmdb_view, name='import-movie'),
+    # Çok sayıda başlığı kuyruğa alan toplu import ve iş durumu
+    path('import/movies/', views.batch_import_movies_view, name='import-movies-batch'),
+    path('import/jobs/<int:job_id>/', views.import_job_detail_view, name='import-job-detail'),
 ]
 
     
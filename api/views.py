@@ -2,25 +2,48 @@
 
 
 
+import logging
 import os
+from functools import lru_cache
 from lxml import etree
-from django.http import HttpResponse
+from django.http import Http404, HttpResponse
 from django.conf import settings
 
 import requests
 
-from .models import Movie, WatchedMovie, Comment
-from .serializers import MovieSerializer, UserRegisterSerializer, UserSerializer, WatchedMovieSerializer, CommentSerializer
+from .models import Genre, Movie, Person, WatchedMovie, Comment, ImportJob
+from .parsers import HardenedXMLParser, MoviePayloadXMLParser
+from .pagination import (
+    ChangeFeedPagination, CommentCursorPagination, KeysetPagination, MovieCursorPagination,
+    WatchedMovieCursorPagination,
+    decode_keyset_cursor, encode_keyset_cursor, keyset_after, parse_fields_param,
+)
+from .search import get_ordering, search_movies
+from .renderers import stream_xml_batches, streaming_xml_response, wants_stream
+from .xml_cache import xslt_registry
+from . import change_feed, html_cache, import_jobs, metrics, movie_cache, tmdb, xpath_catalog
+from .authentication import CachedTokenAuthentication
+from .serializers import (
+    CommentSerializer, ImportJobSerializer, MovieSerializer, UserRegisterSerializer, UserSerializer,
+    WatchedMovieSerializer,
+)
 from django.contrib.auth.models import User
+from django.db.models import Prefetch, Q
+from django.db.models.functions import Lower
 from django.shortcuts import get_object_or_404
+from django.urls import reverse
 
-from rest_framework.decorators import api_view, authentication_classes, permission_classes
-from rest_framework.authentication import TokenAuthentication
+from rest_framework.decorators import api_view, authentication_classes, parser_classes, permission_classes
 from rest_framework.permissions import IsAuthenticated, IsAdminUser, AllowAny
+from rest_framework.exceptions import NotFound, ParseError
+from rest_framework.fields import DateTimeField
 from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
 from rest_framework import status
 from rest_framework.authtoken.models import Token
 
+logger = logging.getLogger(__name__)
+
 # --- AUTH VIEWS ---
 
 @api_view(['POST'])
@@ -42,15 +65,61 @@ def register_user_view(request):
 
 # --- MOVIE VIEWS ---
 
+MOVIE_RELATION_FIELDS = ('genres', 'actors')
+
+
+def project_movies(movies, fields, *extra_fields):
+    """
+    Applies the ?fields= projection to a Movie queryset. Genres and actors are
+    prefetched (one query each per page) only when they are serialized.
+    """
+    if fields is not None:
+        columns = [name for name in fields if name not in MOVIE_RELATION_FIELDS]
+        # Sadece istenen kolonları SELECT et (örn. plot'u hiç okumamak için)
+        movies = movies.only(*columns, *extra_fields) if columns or extra_fields else movies.only('movie_id')
+    relations = [name for name in MOVIE_RELATION_FIELDS if fields is None or name in fields]
+    return movies.prefetch_related(*movie_prefetches(relations))
+
+
+def movie_prefetches(relations=MOVIE_RELATION_FIELDS):
+    return [
+        Prefetch(name, queryset=(Genre if name == 'genres' else Person).objects.order_by('name'))
+        for name in relations
+    ]
+
+
+def paginate_movies(paginator, request, movies, fields, *extra_fields):
+    """
+    Paginates `movies` and returns the paginated response. Without ?fields= the
+    serialized movies come from the fragment cache (api/movie_cache.py); genres and
+    actors are only prefetched for the movies that are not cached.
+    """
+    if fields is None:
+        generation = movie_cache.fragment_cache.generation
+        page = paginator.paginate_queryset(movies, request)
+        return paginator.get_paginated_response(movie_cache.movie_fragments(page, movie_prefetches(), generation))
+    page = paginator.paginate_queryset(project_movies(movies, fields, *extra_fields), request)
+    return paginator.get_paginated_response(MovieSerializer(page, many=True, fields=fields).data)
+
+
 @api_view(['GET', 'POST'])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 @permission_classes([AllowAny]) # GET için herkese izin ver
+@parser_classes([MoviePayloadXMLParser]) # gövde serializer'dan önce XSD ile doğrulanır
 def movie_list_create_view(request):
-    """Lists all movies or creates a new one."""
+    """Lists movies page by page (cursor on movie_id) or creates a new one."""
     if request.method == 'GET':
-        movies = Movie.objects.all()
-        serializer = MovieSerializer(movies, many=True)
-        return Response(serializer.data)
+        try:
+            fields = parse_fields_param(request, MovieSerializer().fields)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        if wants_stream(request):
+            # Tüm katalog export'u: sayfalama yok, kayıtlar parça parça gönderilir
+            movies = project_movies(Movie.objects.all(), fields).order_by('movie_id')
+            return streaming_xml_response(movies, MovieSerializer, fields=fields)
+
+        return paginate_movies(MovieCursorPagination(), request, Movie.objects.all(), fields)
 
     elif request.method == 'POST':
         # Sadece adminler yeni film ekleyebilir
@@ -67,40 +136,119 @@ def movie_list_create_view(request):
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
-def movie_list_html_view(request):
+def movie_search_view(request):
     """
-    Tüm filmlerin listesini XSLT ile HTML'e dönüştürerek sunar.
+    Searches movies by full text (q), title substring/prefix, year range, director
+    and minimum rating. Results are sorted by `ordering` and keyset-paginated.
     """
     try:
-        movies = Movie.objects.all()
-        
-        # 1. Tüm filmleri bir XML ağacına dönüştür
-        root = etree.Element("movies")
-        for movie_obj in movies:
-            movie_element = etree.Element("movie", id=str(movie_obj.movie_id))
-            etree.SubElement(movie_element, "title").text = movie_obj.title
-            root.append(movie_element)
-        
+        fields = parse_fields_param(request, MovieSerializer().fields)
+        ordering = get_ordering(request.query_params)
+        movies = search_movies(request.query_params)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-        html_result = apply_xslt_transform(root, 'movies_list_to_html.xsl')
-        
-        return HttpResponse(html_result, content_type='text/html')
+    return paginate_movies(KeysetPagination(ordering), request, movies, fields, ordering.lstrip('-'))
 
-    except Exception as e:
-        return HttpResponse(f"<h1>An error occurred.</h1><p>{e}</p>", status=500)
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def movie_xpath_view(request):
+    """
+    Evaluates an XPath expression (?xpath=) against the in-memory <movies> catalog.
+    Node-set results are limited to ?limit= (at most XPATH_MAX_RESULTS) nodes.
+    """
+    limit = request.query_params.get('limit')
+    try:
+        limit = int(limit) if limit else None
+        if limit is not None and limit < 0:
+            raise ValueError("'limit' must not be negative.")
+        content = xpath_catalog.evaluate(request.query_params.get('xpath', ''), limit)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    except TimeoutError:
+        return Response({'error': 'XPath evaluation timed out.'}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+    return HttpResponse(content, content_type='application/xml')
+
+
+# Akış (?stream=true) sırasında tek sorguda okunan değişiklik sayısı
+CHANGE_STREAM_BATCH_SIZE = 2000
+_change_timestamp = DateTimeField()
 
 
+def change_items(changes, generation):
+    """
+    Serializes (changed_at, movie_id, movie) changes. Upserts carry the full movie
+    from the fragment cache; deletions only the id.
+    """
+    movies = [movie for _, _, movie in changes if movie is not None]
+    fragments = iter(movie_cache.movie_fragments(movies, movie_prefetches(), generation))
+    items = []
+    for changed_at, movie_id, movie in changes:
+        item = {
+            'change': 'delete' if movie is None else 'upsert',
+            'movie_id': movie_id,
+            'changed_at': _change_timestamp.to_representation(changed_at),
+        }
+        if movie is not None:
+            item['movie'] = next(fragments)
+        items.append(item)
+    return items
+
+
+def _stream_changes(after, until):
+    while True:
+        # Parçalar bu nesilden sonra geçersiz kılınırsa önbelleğe yazılmaz
+        generation = movie_cache.fragment_cache.generation
+        changes, has_more = change_feed.changes_after(after, until, CHANGE_STREAM_BATCH_SIZE)
+        if changes:
+            yield change_items(changes, generation)
+        if not has_more:
+            return
+        after = changes[-1][:2]
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def movie_changes_view(request):
+    """
+    Lists the movies created, updated or deleted after ?since= (the `since` token of
+    an earlier response), oldest change first. Without ?since= every movie is listed.
+    The most recent CHANGE_FEED_SETTLE_SECONDS are left for the next call.
+    ?stream=true returns every change in one streamed response; its token is in the
+    X-Change-Feed-Since header.
+    """
+    after = change_feed.decode_token(request.query_params.get('since'))
+    until = change_feed.settled_until()
+    end_token = change_feed.encode_token(change_feed.end_position(after, until))
+
+    if wants_stream(request):
+        # Akış `until`'e kadar her şeyi verdiği için son token baştan bellidir
+        response = stream_xml_batches(_stream_changes(after, until))
+        response['X-Change-Feed-Since'] = end_token
+        return response
+
+    paginator = ChangeFeedPagination()
+    generation = movie_cache.fragment_cache.generation
+    changes, has_more = change_feed.changes_after(after, until, paginator.get_page_size(request))
+    since = change_feed.encode_token(changes[-1][:2]) if has_more else end_token
+    return paginator.get_paginated_response(request, change_items(changes, generation), since, has_more)
+
 
 @api_view(['GET', 'PUT', 'DELETE'])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 @permission_classes([AllowAny]) # GET için herkese izin ver
+@parser_classes([MoviePayloadXMLParser]) # gövde serializer'dan önce XSD ile doğrulanır
 def movie_detail_view(request, movie_id):
     """Retrieve, update or delete a movie instance."""
-    movie = get_object_or_404(Movie, pk=movie_id)
-
     if request.method == 'GET':
-        serializer = MovieSerializer(movie)
-        return Response(serializer.data)
+        # Önbellekte güncel parça varsa sadece updated_at okunur
+        fragment = movie_cache.movie_fragment(movie_id, project_movies(Movie.objects.all(), None))
+        if fragment is None:
+            raise Http404('No Movie matches the given query.')
+        return Response(fragment)
+
+    movie = get_object_or_404(project_movies(Movie.objects.all(), None), pk=movie_id)
 
     # PUT ve DELETE için yetki kontrolü
     if not request.user.is_staff:
@@ -117,17 +265,62 @@ def movie_detail_view(request, movie_id):
         movie.delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
 
+# --- GENRE / ACTOR VIEWS ---
+
+def _related_movies_response(request, movies):
+    try:
+        fields = parse_fields_param(request, MovieSerializer().fields)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    # (tür, film) indeksi üzerinden movie_id sırasıyla keyset sayfalama
+    return paginate_movies(MovieCursorPagination(), request, movies, fields)
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def genre_list_view(request):
+    """Lists all genre names."""
+    return Response({'genres': list(Genre.objects.order_by('name').values_list('name', flat=True))})
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def movies_by_genre_view(request, name):
+    """Lists the movies of a genre page by page (cursor on movie_id)."""
+    genre = get_object_or_404(Genre, name=name)
+    return _related_movies_response(request, genre.movies.all())
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def movies_by_actor_view(request, name):
+    """Lists the movies of an actor page by page (cursor on movie_id)."""
+    person = get_object_or_404(Person, name=name)
+    return _related_movies_response(request, person.movies.all())
+
+
 # --- WATCHEDLIST VIEW ---
 
 @api_view(['GET', 'POST'])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 @permission_classes([IsAuthenticated]) # Sadece giriş yapmış kullanıcılar erişebilir
 def watched_list_view(request):
     """Retrieve or update the user's watched list."""
     if request.method == 'GET':
-        watched_items = WatchedMovie.objects.filter(user=request.user)
-        serializer = WatchedMovieSerializer(watched_items, many=True)
-        return Response(serializer.data)
+        # movie_title için her satırda ayrı sorgu atılmasın (N+1), film başlığı JOIN ile gelsin
+        watched_items = (
+            WatchedMovie.objects.filter(user=request.user)
+            .select_related('movie')
+            .only('id', 'user', 'watched_date', 'user_rating', 'movie__title')
+        )
+        if wants_stream(request):
+            return streaming_xml_response(watched_items, WatchedMovieSerializer)
+
+        paginator = WatchedMovieCursorPagination()
+        page = paginator.paginate_queryset(watched_items, request)
+        serializer = WatchedMovieSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
 
     elif request.method == 'POST':
         # Serializer'a hem datayı hem de user'ı vermek için context kullanıyoruz
@@ -148,16 +341,26 @@ def watched_list_view(request):
 # --- COMMENT VIEW ---
 
 @api_view(['GET', 'POST'])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 @permission_classes([IsAuthenticated])
 def comment_list_create_view(request, movie_id):
     """List comments for a movie or create a new one."""
     movie = get_object_or_404(Movie, pk=movie_id)
     
     if request.method == 'GET':
-        comments = Comment.objects.filter(movie=movie)
-        serializer = CommentSerializer(comments, many=True)
-        return Response(serializer.data)
+        # author_username için yazar bilgisi JOIN ile tek sorguda gelsin (N+1 olmasın)
+        comments = (
+            Comment.objects.filter(movie=movie)
+            .select_related('author')
+            .only('id', 'movie', 'body', 'created_at', 'author__username')
+        )
+        if wants_stream(request):
+            return streaming_xml_response(comments, CommentSerializer)
+
+        paginator = CommentCursorPagination()
+        page = paginator.paginate_queryset(comments, request)
+        serializer = CommentSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
 
     elif request.method == 'POST':
         serializer = CommentSerializer(data=request.data)
@@ -183,9 +386,19 @@ def movie_to_xml_etree_for_xslt(movie_obj):
         etree.SubElement(root, "year").text = str(movie_obj.year)
     if movie_obj.director:
         etree.SubElement(root, "director").text = movie_obj.director
-    
-    # TODO: Genre ve Actors alanlarını da buraya ekleyin
-    
+
+    # Şemadaki sırayla: title, year, director, genres, actors, plot, posterUrl, rating
+    genres = list(movie_obj.genres.all())
+    if genres:
+        genres_el = etree.SubElement(root, "genres")
+        for genre in genres:
+            etree.SubElement(genres_el, "genre").text = genre.name
+    actors = list(movie_obj.actors.all())
+    if actors:
+        actors_el = etree.SubElement(root, "actors")
+        for actor in actors:
+            etree.SubElement(actors_el, "actor").text = actor.name
+
     if movie_obj.plot:
         plot_el = etree.SubElement(root, "plot")
         plot_el.text = etree.CDATA(movie_obj.plot)
@@ -201,31 +414,187 @@ def apply_xslt_transform(xml_tree, xslt_filename):
     """Yardımcı fonksiyon: XML ağacına belirtilen XSLT'yi uygular ve HTML string'i döner."""
     try:
         xslt_path = os.path.join(settings.BASE_DIR, 'xslt', xslt_filename)
-        xslt_tree = etree.parse(xslt_path)
-        transform = etree.XSLT(xslt_tree)
-        html_tree = transform(xml_tree)
+        # Derlenmiş XSLT her istekte yeniden parse edilmez, registry'den alınır
+        transform = xslt_registry.get(xslt_path)
+        with metrics.timed('xslt', stylesheet=xslt_filename):
+            html_tree = transform(xml_tree)
         return etree.tostring(html_tree, pretty_print=True).decode('utf-8')
-    except Exception as e:
-        # Hatanın ne olduğunu daha net görmek için
-        print(f"XSLT Transformation Error: {e}")
+    except Exception:
+        logger.exception("XSLT transformation with %s failed", xslt_filename)
         raise
 
+# HTML katalog: ?group=letter|year ile bölümlere ayrılır, ?letter= / ?year= ile süzülür
+CATALOG_GROUPS = {
+    # grup: (sıralama alanları, satırdan bölüm anahtarı)
+    None: (('title_lower', 'movie_id'), lambda movie_id, title, year, title_lower: None),
+    'letter': (('title_lower', 'movie_id'), lambda movie_id, title, year, title_lower: _title_letter(title)),
+    'year': (
+        ('year', 'title_lower', 'movie_id'),
+        lambda movie_id, title, year, title_lower: str(year) if year is not None else 'Unknown',
+    ),
+}
+CATALOG_ROW_FIELDS = ('movie_id', 'title', 'year', 'title_lower')
+CATALOG_PAGE_SIZE = 100
+CATALOG_MAX_PAGE_SIZE = 1000
+# Bir bölüm en fazla bu kadar filmle tek seferde dönüştürülüp gönderilir
+CATALOG_SECTION_SIZE = 100
+SECTIONS_MARKER = '<!--sections-->'
+
+
+def _title_letter(title):
+    letter = title[:1].upper()
+    return letter if letter.isalpha() else '#'
+
+
+@lru_cache(maxsize=None)
+def _letter_variants(key):
+    """First characters whose _title_letter() is `key` (ör. 'I' için 'I', 'i' ve 'ı')."""
+    return tuple(c for c in map(chr, range(0x10000)) if c.upper() == key)
+
+
+def _letter_filter(key):
+    # ASCII harfler LOWER(title) aralığıyla (indeksli) aranır. SQLite LOWER() ASCII dışını
+    # dönüştürmez; bu harfler için her biçim ayrıca LIKE ile (ASCII dışında büyük/küçük
+    # harf duyarlı) aranır.
+    condition = Q(pk__in=[])
+    for c in _letter_variants(key):
+        if c.isascii():
+            if c.islower():
+                condition |= Q(title_lower__gte=c, title_lower__lt=chr(ord(c) + 1))
+        else:
+            condition |= Q(title__startswith=c)
+    return condition
+
+
+def _catalog_params(request):
+    """Validates the catalog query parameters; raises ValueError on bad input."""
+    params = request.query_params
+    group = params.get('group') or None
+    if group not in CATALOG_GROUPS:
+        raise ValueError(f"Unknown group '{group}'; use 'letter' or 'year'.")
+    try:
+        page_size = min(int(params.get('page_size', CATALOG_PAGE_SIZE)), CATALOG_MAX_PAGE_SIZE)
+        year = int(params['year']) if params.get('year') else None
+    except ValueError:
+        raise ValueError("page_size and year must be integers.")
+    if page_size < 1:
+        raise ValueError("page_size must be positive.")
+    # Akış başladıktan sonra hata dönülemez; harf burada bölüm başlığına (_title_letter) çevrilir
+    letter = params.get('letter', '').upper()
+    if letter and (len(letter) != 1 or not letter.isalpha()):
+        raise ValueError("letter must be a single letter.")
+    return {'group': group, 'page_size': page_size, 'year': year, 'letter': letter, 'after': params.get('after')}
+
+
+def _catalog_cursor(options):
+    """
+    Decodes ?after= for the group's ordering; raises NotFound if malformed. Sayfa
+    akıtıldığı için bozuk değerler sorgudan önce, yanıt başlamadan reddedilir.
+    """
+    ordering = CATALOG_GROUPS[options['group']][0]
+    after = decode_keyset_cursor(options['after'], len(ordering))
+    if after is not None:
+        for field, value in zip(ordering, after):
+            # Sadece year NULL olabilir
+            expected = int if field == 'year' else str
+            if type(value) is not expected and not (field == 'year' and value is None):
+                raise NotFound('Invalid cursor')
+    return after
+
+
+def _catalog_queryset(options, after):
+    ordering = CATALOG_GROUPS[options['group']][0]
+    # Büyük/küçük harf duyarsız sıralama; LOWER(title) ifadesi movie_title_lower_idx indeksiyle eşleşir
+    movies = Movie.objects.annotate(title_lower=Lower('title'))
+    if options['letter']:
+        # group=letter ile aynı anahtar: ilk harfi bu başlığın altında listelenen filmler
+        movies = movies.filter(_letter_filter(options['letter']))
+    if options['year'] is not None:
+        movies = movies.filter(year=options['year'])
+    if after is not None:
+        movies = movies.filter(keyset_after(ordering, after))
+    # Model nesnesi oluşturulmaz, sadece gereken sütunlar okunur
+    return movies.order_by(*ordering).values_list(*CATALOG_ROW_FIELDS)
+
+
+def _catalog_sections(rows, section_key):
+    """
+    Groups rows into (key, continued, rows) sections of at most CATALOG_SECTION_SIZE movies.
+    `continued`: bölüm, aynı anahtarlı önceki bölümün devamıdır.
+    """
+    section, key, continued = [], None, False
+    for row in rows:
+        row_key = section_key(*row)
+        if section and (row_key != key or len(section) >= CATALOG_SECTION_SIZE):
+            yield key, continued, section
+            section, continued = [], row_key == key
+        key = row_key
+        section.append(row)
+    if section:
+        yield key, continued, section
+
+
+def render_catalog_chunks(request, options, after):
+    """Yields the catalog page as HTML chunks: head, one chunk per section, foot."""
+    ordering, section_key = CATALOG_GROUPS[options['group']]
+    page_size = options['page_size']
+
+    head, _ = apply_xslt_transform(etree.Element('catalog'), 'movies_list_to_html.xsl').split(SECTIONS_MARKER, 1)
+    yield head
+
+    last_row, has_next = None, False
+
+    def page_rows():
+        nonlocal last_row, has_next
+        rows = _catalog_queryset(options, after)[:page_size + 1]
+        for index, row in enumerate(rows.iterator(chunk_size=CATALOG_SECTION_SIZE)):
+            if index == page_size:
+                has_next = True
+                return
+            last_row = row
+            yield row
+
+    for key, continued, section in _catalog_sections(page_rows(), section_key):
+        root = etree.Element('section')
+        if key is not None:
+            root.set('key', key)
+        if continued and key is not None:
+            root.set('continued', '1')
+        for movie_id, title, *_ in section:
+            movie_element = etree.SubElement(root, 'movie', id=str(movie_id))
+            etree.SubElement(movie_element, 'title').text = title
+        yield apply_xslt_transform(root, 'movies_list_to_html.xsl')
+
+    catalog = etree.Element('catalog')
+    # Sayfa önbelleğe girdiği için bağlantılar host içermez
+    url = request.get_full_path()
+    if options['after']:
+        catalog.set('first', remove_query_param(url, 'after'))
+    if has_next:
+        values = dict(zip(CATALOG_ROW_FIELDS, last_row))
+        catalog.set('next', replace_query_param(url, 'after', encode_keyset_cursor(values[f] for f in ordering)))
+    _, foot = apply_xslt_transform(catalog, 'movies_list_to_html.xsl').split(SECTIONS_MARKER, 1)
+    yield foot
+
+
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def movie_list_html_view(request):
     """
-    Tüm filmlerin listesini XSLT ile HTML'e dönüştürerek sunar.
+    Film kataloğunu XSLT ile HTML'e dönüştürür. Sayfalar (lower(title), movie_id) üzerinden
+    keyset ile okunur ve bölüm bölüm akıtılır (?page_size=, ?after=, ?group=, ?letter=, ?year=).
     """
     try:
-        movies = Movie.objects.all()
-        root = etree.Element("movies")
-        for movie_obj in movies:
-            movie_element = etree.Element("movie", id=str(movie_obj.movie_id))
-            etree.SubElement(movie_element, "title").text = movie_obj.title
-            root.append(movie_element)
-        
-        html_result = apply_xslt_transform(root, 'movies_list_to_html.xsl')
-        return HttpResponse(html_result, content_type='text/html')
+        options = _catalog_params(request)
+        after = _catalog_cursor(options)
+    except (ValueError, NotFound) as e:
+        return HttpResponse(f"<h1>Invalid request.</h1><p>{e}</p>", status=400)
+
+    query = '&'.join(f'{name}={options[name]}' for name in sorted(options))
+    try:
+        return html_cache.streamed_html_response(
+            request, html_cache.list_key(query), lambda: render_catalog_chunks(request, options, after)
+        )
     except Exception as e:
         return HttpResponse(f"<h1>An error occurred.</h1><p>{e}</p>", status=500)
 
@@ -236,12 +605,15 @@ def movie_detail_html_view(request, movie_id):
     """
     Bir filmin XML verisini XSLT ile HTML'e dönüştürür ve tarayıcıda gösterir.
     """
-    try:
-        movie_obj = get_object_or_404(Movie, pk=movie_id)
+    def render():
+        movie_obj = get_object_or_404(project_movies(Movie.objects.all(), None), pk=movie_id)
         # XSLT için özel olarak oluşturduğumuz XML oluşturma fonksiyonunu kullanalım
         xml_tree = movie_to_xml_etree_for_xslt(movie_obj)
-        html_result = apply_xslt_transform(xml_tree, 'movie_to_html.xsl')
-        return HttpResponse(html_result, content_type='text/html')
+        return apply_xslt_transform(xml_tree, 'movie_to_html.xsl')
+
+    try:
+        # Render edilmiş sayfa önbellekteyse veritabanına ve XSLT'ye hiç gidilmez
+        return html_cache.cached_html_response(request, html_cache.detail_key(movie_id), render)
     except Exception as e:
         return HttpResponse(f"<h1>An error occurred.</h1><p>{e}</p>", status=500)
     
@@ -251,7 +623,7 @@ def movie_detail_html_view(request, movie_id):
 
 
 @api_view(['POST'])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 @permission_classes([IsAdminUser]) # Sadece adminler film içe aktarabilsin
 def import_movie_from_tmdb_view(request):
     """
@@ -263,54 +635,86 @@ def import_movie_from_tmdb_view(request):
     if request.content_type != 'application/xml':
         return Response({'error': 'Content-Type must be application/xml'}, status=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE)
     
+    # Gövde hatası (413 dahil) aşağıdaki genel hata yakalayıcısına düşmesin
     try:
-        xml_doc = etree.fromstring(request.body)
-        movie_title_to_search = xml_doc.findtext('title')
-        if not movie_title_to_search:
-            return Response({'error': "A 'title' element is required in the request body."}, status=status.HTTP_400_BAD_REQUEST)
-        
-        # 1. TMDB API'ye istek atma
-        tmdb_api_key = settings.TMDB_API_KEY
-        if not tmdb_api_key:
+        xml_doc = HardenedXMLParser().parse_root(request.stream)
+    except ParseError as e:
+        return Response({'error': f'Invalid XML: {e.detail}'}, status=status.HTTP_400_BAD_REQUEST)
+
+    movie_title_to_search = xml_doc.findtext('title')
+    if not movie_title_to_search:
+        return Response({'error': "A 'title' element is required in the request body."}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        # 1. TMDB API'ye istek atma (havuzlu oturum, zaman aşımı, tekrar deneme ve önbellek ile)
+        if not settings.TMDB_API_KEY:
             return Response({'error': 'TMDB API key is not configured on the server.'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-        search_url = f"https://api.themoviedb.org/3/search/movie?api_key={tmdb_api_key}&query={movie_title_to_search}"
-        
-        response = requests.get(search_url)
-        response.raise_for_status() # Hata varsa exception fırlatır
-        
-        search_results = response.json()
-        
-        if not search_results.get('results'):
+        search_results = tmdb.get_client().search_movie(movie_title_to_search)
+        if not search_results:
             return Response({'error': f"No movie found on TMDB with the title '{movie_title_to_search}'."}, status=status.HTTP_404_NOT_FOUND)
-        
-        tmdb_movie = search_results['results'][0]
-        
-        # ... (veri aktarma ve kaydetme mantığı aynı) ...
-        tmdb_id = tmdb_movie.get('id')
-        
-        if Movie.objects.filter(movie_id=f"tmdb_{tmdb_id}").exists():
-             return Response({'error': f"Movie '{tmdb_movie.get('title')}' already exists in the database."}, status=status.HTTP_409_CONFLICT)
-
-        new_movie_id = f"tmdb_{tmdb_id}"
-        new_movie = Movie.objects.create(
-            movie_id=new_movie_id,
-            title=tmdb_movie.get('title'),
-            year=int(tmdb_movie.get('release_date', '0-0-0').split('-')[0]) if tmdb_movie.get('release_date') else None,
-            plot=tmdb_movie.get('overview'),
-            poster_url=f"https://image.tmdb.org/t/p/w500{tmdb_movie.get('poster_path')}" if tmdb_movie.get('poster_path') else None,
-            rating=tmdb_movie.get('vote_average')
-        )
+
+        movie_fields = tmdb.movie_fields_from_result(search_results[0])
+        if Movie.objects.filter(movie_id=movie_fields['movie_id']).exists():
+             return Response({'error': f"Movie '{movie_fields['title']}' already exists in the database."}, status=status.HTTP_409_CONFLICT)
+
+        new_movie = Movie.objects.create(**movie_fields)
 
         # Oluşturulan nesneyi MovieSerializer ile XML'e dönüştürerek döndür
         serializer = MovieSerializer(new_movie)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
-    except requests.exceptions.HTTPError as e:
+    except (requests.exceptions.HTTPError, requests.exceptions.RetryError) as e:
         return Response({'error': f"Error communicating with TMDB API: {e}"}, status=status.HTTP_502_BAD_GATEWAY)
     except requests.exceptions.RequestException as e:
         return Response({'error': f"A network error occurred: {e}"}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
-    except etree.XMLSyntaxError:
-        return Response({'error': 'Invalid XML syntax.'}, status=status.HTTP_400_BAD_REQUEST)
     except Exception as e:
-        return Response({'error': f"An unexpected error occurred: {str(e)}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file
+        return Response({'error': f"An unexpected error occurred: {str(e)}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@api_view(['POST'])
+@authentication_classes([CachedTokenAuthentication])
+@permission_classes([IsAdminUser])
+def batch_import_movies_view(request):
+    """
+    Queues a TMDB import of many titles and returns the job (202 Accepted).
+    İstek XML'i: <importRequest><title>Inception</title><title>Alien</title></importRequest>
+    Job is processed by `python manage.py process_import_jobs`.
+    """
+    if request.content_type != 'application/xml':
+        return Response({'error': 'Content-Type must be application/xml'}, status=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE)
+
+    try:
+        xml_doc = HardenedXMLParser().parse_root(request.stream)
+    except ParseError as e:
+        return Response({'error': f'Invalid XML: {e.detail}'}, status=status.HTTP_400_BAD_REQUEST)
+
+    titles = [title.text for title in xml_doc.findall('title') if title.text and title.text.strip()]
+    if not titles:
+        return Response({'error': "At least one 'title' element is required in the request body."}, status=status.HTTP_400_BAD_REQUEST)
+    if len(titles) > settings.IMPORT_JOB_MAX_TITLES:
+        return Response({'error': f"At most {settings.IMPORT_JOB_MAX_TITLES} titles can be imported per request."}, status=status.HTTP_400_BAD_REQUEST)
+
+    job = import_jobs.create_job(titles, request.user)
+    job = ImportJob.objects.prefetch_related('items').get(pk=job.pk)
+    response = Response(ImportJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+    response['Location'] = request.build_absolute_uri(reverse('api:import-job-detail', args=[job.pk]))
+    return response
+
+
+@api_view(['GET'])
+@authentication_classes([CachedTokenAuthentication])
+@permission_classes([IsAdminUser])
+def import_job_detail_view(request, job_id):
+    """Returns the status of a batch import job with per-title results."""
+    job = get_object_or_404(ImportJob.objects.prefetch_related('items'), pk=job_id)
+    return Response(ImportJobSerializer(job).data)
+
+
+# --- METRICS ---
+
+def metrics_view(request):
+    """Request/DB/XSLT/cache metrics of every worker process in the Prometheus text format."""
+    # Bu sürecin son değerleri de diğer süreçlerin görebileceği şekilde yazılır
+    metrics.flush()
+    return HttpResponse(metrics.render_prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,63 @@
+import os
+import threading
+
+from lxml import etree
+
+
+class CompiledFileRegistry:
+    """
+    Dosyadan derlenen lxml nesneleri (XSLT, XMLSchema) için süreç genelinde önbellek.
+
+    lxml'in derlenmiş XSLT nesneleri thread'ler arasında paylaşılmamalıdır, bu
+    yüzden her thread kendi kopyasını tutar. Dosyanın mtime değeri değişirse
+    kayıt yeniden derlenir.
+    """
+
+    def __init__(self, compile_fn):
+        self._compile_fn = compile_fn
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _entries(self):
+        # clear() çağrıldıysa bu thread'in eski kayıtlarını at
+        if getattr(self._local, 'generation', None) != self._generation:
+            self._local.entries = {}
+            self._local.generation = self._generation
+        return self._local.entries
+
+    def get(self, path):
+        """Returns the compiled object for `path`, compiling it on first use or after a change."""
+        path = os.fspath(path)
+        mtime = os.stat(path).st_mtime_ns
+        entries = self._entries()
+
+        entry = entries.get(path)
+        if entry is not None and entry[0] == mtime:
+            with self._lock:
+                self.hits += 1
+            return entry[1]
+
+        compiled = self._compile_fn(etree.parse(path))
+        entries[path] = (mtime, compiled)
+        with self._lock:
+            self.misses += 1
+        return compiled
+
+    def clear(self):
+        """Drops the compiled objects of every thread and resets the counters."""
+        with self._lock:
+            self._generation += 1
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses}
+
+
+xslt_registry = CompiledFileRegistry(etree.XSLT)
+# XMLSchema nesnesi son doğrulamanın error_log'unu tuttuğu için o da thread başınadır
+schema_registry = CompiledFileRegistry(etree.XMLSchema)
@@ -0,0 +1,266 @@
+"""
+Kataloğun dosyaya toplu export'u: movie_export.xsd'ye uygun <movies> XML'i ya da NDJSON.
+
+Filmler movie_id üzerinden keyset sayfalarıyla (LIMIT, OFFSET yok) okunur;
+tür/oyuncu ve yorumlar her sayfa için movie_id aralığıyla tek sorguda eklenir.
+XML, etree.xmlfile ile film film yazılır, belge ağacı hiç kurulmaz; bellek
+kullanımı toplam film sayısından bağımsızdır. Büyük export'lar movie_id
+aralıklarına bölünüp ayrı süreçlerde ayrı dosyalara yazılabilir.
+"""
+import gzip
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from decimal import Decimal
+
+import django
+from django.conf import settings
+from django.db import connections
+from lxml import etree
+
+from .models import Comment, Movie, MovieActor, MovieGenre
+from .xml_cache import schema_registry
+from .xml_generator import WRITE_BUFFER_SIZE, shard_paths
+
+FORMATS = ('xml', 'ndjson')
+EXPORT_SCHEMA_PATH = os.path.join(settings.BASE_DIR, 'schemas', 'movie_export.xsd')
+MOVIE_COLUMNS = ('movie_id', 'title', 'year', 'director', 'plot', 'poster_url', 'rating')
+STATS_COLUMNS = ('watch_count', 'comment_count', 'user_rating_count', 'average_user_rating')
+# shard_bounds'ın pk indeksinden tek sorguda okuduğu id sayısı
+BOUNDS_BATCH_SIZE = 10000
+# (satırdaki liste anahtarı, ara tablo, isim alanı, XML'deki çocuk etiketi)
+CREDIT_LINKS = [
+    ('genres', MovieGenre, 'genre__name', 'genre'),
+    ('actors', MovieActor, 'person__name', 'actor'),
+]
+# XML 1.0'da yazılamayan kontrol karakterleri (lxml bunlarda ValueError fırlatır)
+_XML_ILLEGAL_CHARS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]')
+
+
+class ExportOptions:
+    """What is exported besides the movie columns, and how it is written."""
+
+    def __init__(self, fmt='xml', use_gzip=False, credits=False, comments=False, stats=False,
+                 validate=False, batch_size=5000, using='default'):
+        self.fmt = fmt
+        self.use_gzip = use_gzip
+        self.credits = credits
+        self.comments = comments
+        self.stats = stats
+        self.validate = validate
+        self.batch_size = batch_size
+        self.using = using
+
+
+def shard_bounds(shards, using='default'):
+    """
+    Splits the movie_id space into `shards` ranges of (almost) equal movie count.
+    Returns [(low, high), ...]: low inclusive, high exclusive, None meaning open.
+    Filmden çok shard varsa bazı aralıklar boş kalır.
+    """
+    movies = Movie.objects.using(using).order_by('movie_id').values_list('movie_id', flat=True)
+    total = movies.count()
+    if not total:
+        return [(None, None)] * shards
+    # Sınırlar pk indeksi keyset sayfalarıyla bir kez gezilerek bulunur; OFFSET
+    # her sınır için tabloyu baştan o konuma kadar tarardı
+    targets = [total * n // shards for n in range(1, shards)]
+    edges = [None]
+    position, last = 0, None
+    while targets:
+        page = movies.filter(movie_id__gt=last) if last is not None else movies
+        batch = list(page[:BOUNDS_BATCH_SIZE])
+        if not batch:
+            break
+        while targets and targets[0] < position + len(batch):
+            edges.append(batch[targets.pop(0) - position])
+        position += len(batch)
+        last = batch[-1]
+    edges.append(None)
+    return list(zip(edges, edges[1:]))
+
+
+def iter_movie_batches(options, low=None, high=None):
+    """Yields lists of movie dicts in movie_id order, `options.batch_size` movies at a time."""
+    columns = MOVIE_COLUMNS + (STATS_COLUMNS if options.stats else ())
+    movies = Movie.objects.using(options.using).order_by('movie_id')
+    if high is not None:
+        movies = movies.filter(movie_id__lt=high)
+
+    page = movies.filter(movie_id__gte=low) if low is not None else movies
+    while True:
+        rows = [dict(zip(columns, values)) for values in page.values_list(*columns)[:options.batch_size]]
+        if not rows:
+            return
+        first, last = rows[0]['movie_id'], rows[-1]['movie_id']
+        if options.credits:
+            _attach_credits(rows, first, last, options.using)
+        if options.comments:
+            _attach_comments(rows, first, last, options.using)
+        yield rows
+        page = movies.filter(movie_id__gt=last)
+
+
+def _attach_credits(rows, first, last, using):
+    by_id = {row['movie_id']: row for row in rows}
+    for key, model, name_field, _ in CREDIT_LINKS:
+        for row in rows:
+            row[key] = []
+        # movie_id indeksi üzerinden aralık taraması; id sırası import edilen sırayı korur
+        links = (
+            model.objects.using(using)
+            .filter(movie_id__gte=first, movie_id__lte=last)
+            .order_by('movie_id', 'id')
+            .values_list('movie_id', name_field)
+        )
+        for movie_id, name in links:
+            by_id[movie_id][key].append(name)
+
+
+def _attach_comments(rows, first, last, using):
+    by_id = {row['movie_id']: row for row in rows}
+    for row in rows:
+        row['comments'] = []
+    comments = (
+        Comment.objects.using(using)
+        .filter(movie_id__gte=first, movie_id__lte=last)
+        .order_by('movie_id', 'id')
+        .values_list('movie_id', 'id', 'author__username', 'created_at', 'body')
+    )
+    for movie_id, comment_id, author, created_at, body in comments:
+        by_id[movie_id]['comments'].append(
+            {'id': comment_id, 'author': author, 'created_at': created_at, 'body': body}
+        )
+
+
+def _text(value):
+    return _XML_ILLEGAL_CHARS.sub('', value)
+
+
+def movie_element(row):
+    """Builds the <movie> element of a movie dict in movie_export.xsd order."""
+    movie = etree.Element('movie', id=row['movie_id'])
+    etree.SubElement(movie, 'title').text = _text(row['title'])
+    if row['year'] is not None:
+        # xs:gYear en az dört hane ister
+        etree.SubElement(movie, 'year').text = f"{row['year']:04d}"
+    if row['director'] is not None:
+        etree.SubElement(movie, 'director').text = _text(row['director'])
+    for key, _, _, item_tag in CREDIT_LINKS:
+        # Boş <genres/> şemaya aykırıdır, hiç yazılmaz
+        if row.get(key):
+            parent = etree.SubElement(movie, key)
+            for name in row[key]:
+                etree.SubElement(parent, item_tag).text = _text(name)
+    if row['plot'] is not None:
+        etree.SubElement(movie, 'plot').text = _text(row['plot'])
+    if row['poster_url'] is not None:
+        etree.SubElement(movie, 'posterUrl').text = _text(row['poster_url'])
+    if row['rating'] is not None:
+        etree.SubElement(movie, 'rating').text = f"{row['rating']:.1f}"
+    if 'watch_count' in row:
+        stats = etree.SubElement(
+            movie, 'stats', watchCount=str(row['watch_count']), commentCount=str(row['comment_count']),
+            userRatingCount=str(row['user_rating_count']),
+        )
+        if row['average_user_rating'] is not None:
+            stats.set('averageUserRating', str(row['average_user_rating']))
+    if row.get('comments'):
+        parent = etree.SubElement(movie, 'comments')
+        for comment in row['comments']:
+            etree.SubElement(
+                parent, 'comment', id=str(comment['id']), author=comment['author'],
+                createdAt=comment['created_at'].isoformat(),
+            ).text = _text(comment['body'])
+    return movie
+
+
+def _json_default(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f'{type(value).__name__} is not JSON serializable')
+
+
+def _write_xml(path, batches, options):
+    schema = schema_registry.get(EXPORT_SCHEMA_PATH) if options.validate else None
+    # Export şemasında <movie> sadece <movies> içinde tanımlı; her film tek başına bu kökle doğrulanır
+    wrapper = etree.Element('movies')
+    written = invalid = 0
+    # Sıkıştırmayı libxml2 yapar; çıktı Python'a hiç gelmez
+    with etree.xmlfile(path, encoding='utf-8', compression=6 if options.use_gzip else None) as xf:
+        xf.write_declaration()
+        with xf.element('movies'):
+            xf.write('\n')
+            for rows in batches:
+                for row in rows:
+                    movie = movie_element(row)
+                    if schema is not None:
+                        wrapper.append(movie)
+                        valid = schema.validate(wrapper)
+                        wrapper.remove(movie)
+                        if not valid:
+                            invalid += 1
+                            continue
+                    xf.write(movie, pretty_print=True)
+                    written += 1
+    return written, invalid
+
+
+def _write_ndjson(path, batches, options):
+    written = 0
+    if options.use_gzip:
+        output = gzip.open(path, 'wt', encoding='utf-8', compresslevel=6)
+    else:
+        output = open(path, 'w', encoding='utf-8', buffering=WRITE_BUFFER_SIZE)
+    encoder = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'), default=_json_default)
+    with output:
+        for rows in batches:
+            output.write(''.join(encoder.encode(row) + '\n' for row in rows))
+            written += len(rows)
+    return written, 0
+
+
+def export_shard(path, low, high, options):
+    """
+    Writes the movies with low <= movie_id < high to `path`.
+    Dosya önce geçici bir adla yazılır; yarım kalan export hedef dosyayı bozmaz.
+    Returns (path, written, invalid).
+    """
+    tmp_path = f'{path}.tmp'
+    write = _write_xml if options.fmt == 'xml' else _write_ndjson
+    try:
+        written, invalid = write(tmp_path, iter_movie_batches(options, low, high), options)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    os.replace(tmp_path, path)
+    return path, written, invalid
+
+
+def _init_worker():
+    # spawn ile başlayan süreçlerde Django kurulmamıştır; fork'ta setup() bir şey yapmaz
+    django.setup()
+
+
+def export(path, shards=1, workers=1, options=None):
+    """
+    Exports the catalog to `path` (or to `shards` files split by movie_id range).
+    Returns [(path, written, invalid), ...] in shard order.
+    """
+    options = options or ExportOptions()
+    paths = shard_paths(path, shards, options.use_gzip)
+    bounds = shard_bounds(shards, options.using) if shards > 1 else [(None, None)]
+    jobs = [(shard_path, low, high) for shard_path, (low, high) in zip(paths, bounds)]
+
+    if workers > 1 and len(jobs) > 1:
+        # Açık bağlantılar fork ile alt süreçlere kopyalanmasın
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs)), initializer=_init_worker) as executor:
+            futures = [executor.submit(export_shard, shard_path, low, high, options) for shard_path, low, high in jobs]
+            return [future.result() for future in futures]
+    return [export_shard(shard_path, low, high, options) for shard_path, low, high in jobs]
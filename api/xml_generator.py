@@ -0,0 +1,166 @@
+"""
+Büyük, tekrarlanabilir <movies> XML fixture'ları üretir.
+
+Filmler BLOCK_SIZE'lık bloklar halinde üretilir ve her bloğun rastgele sayı
+üreticisi (seed, blok numarası) ile başlatılır. Böylece aynı parametrelerle
+üretilen çıktı, kaç süreç veya shard kullanıldığından bağımsız olarak aynıdır.
+Bu modül Django'ya bağımlı değildir.
+"""
+import gzip
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+BLOCK_SIZE = 10000
+WRITE_BUFFER_SIZE = 1024 * 1024
+
+GENRES = [
+    'Action', 'Adventure', 'Animation', 'Comedy', 'Crime', 'Documentary', 'Drama',
+    'Family', 'Fantasy', 'History', 'Horror', 'Music', 'Mystery', 'Romance',
+    'Sci-Fi', 'Thriller', 'War', 'Western',
+]
+FIRST_NAMES = [
+    'Ada', 'Ali', 'Anna', 'Ayşe', 'Can', 'Deniz', 'Elif', 'Emma', 'James', 'John',
+    'Kemal', 'Leyla', 'Maria', 'Mehmet', 'Noah', 'Olivia', 'Selin', 'Zeynep',
+]
+LAST_NAMES = [
+    'Brown', 'Demir', 'Garcia', 'Johnson', 'Kaya', 'Lee', 'Martin', 'Miller',
+    'Öztürk', 'Smith', 'Şahin', 'Taylor', 'Wilson', 'Yılmaz',
+]
+LOREM_WORDS = (
+    'lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor '
+    'incididunt ut labore et dolore magna aliqua ut enim ad minim veniam quis nostrud '
+    'exercitation ullamco laboris nisi ut aliquip ex ea commodo consequat'
+).split()
+# Plot metinleri bu uzun metinden rastgele bir yerden kesilerek üretilir
+LOREM_TEXT = ' '.join(LOREM_WORDS * 400)
+# Kesimin başlayabileceği en az bir konum kalmalı (bkz. render_block'taki plot_span)
+MAX_PLOT_LENGTH = len(LOREM_TEXT) - 1
+
+
+class GeneratorOptions:
+    """Field mix of the generated movies."""
+
+    def __init__(self, plot_length=0, genres=0, actors=0, cdata=False, director=False):
+        if not 0 <= plot_length <= MAX_PLOT_LENGTH:
+            raise ValueError(f'plot_length must be between 0 and {MAX_PLOT_LENGTH}.')
+        self.plot_length = plot_length
+        self.genres = genres
+        self.actors = actors
+        self.cdata = cdata
+        self.director = director
+
+
+def render_block(block_index, count, seed, options):
+    """Returns the XML text of every <movie> in block `block_index` (at most BLOCK_SIZE movies)."""
+    rng = random.Random(f'{seed}:{block_index}')
+    getrandbits = rng.getrandbits
+    plot_span = len(LOREM_TEXT) - options.plot_length
+
+    start = block_index * BLOCK_SIZE
+    stop = min(start + BLOCK_SIZE, count)
+    parts = []
+    append = parts.append
+    for i in range(start + 1, stop + 1):
+        # Her film için tek bir rastgele sayıdan yıl ve puan türetilir
+        bits = getrandbits(32)
+        year = 1980 + bits % 45
+        rating = 10 + (bits >> 8) % 91
+
+        append(f'  <movie id="gen_{i:06d}">\n    <title>Generated Movie {i}</title>\n    <year>{year}</year>\n')
+        if options.director:
+            bits = getrandbits(16)
+            append(f'    <director>{FIRST_NAMES[bits % len(FIRST_NAMES)]} '
+                   f'{LAST_NAMES[(bits >> 8) % len(LAST_NAMES)]}</director>\n')
+        if options.genres:
+            first = getrandbits(16) % len(GENRES)
+            genres = ''.join(
+                f'<genre>{GENRES[(first + n * 7) % len(GENRES)]}</genre>'
+                for n in range(1 + first % options.genres)
+            )
+            append(f'    <genres>{genres}</genres>\n')
+        if options.actors:
+            actors = ''.join(
+                f'<actor>{FIRST_NAMES[bits % len(FIRST_NAMES)]} {LAST_NAMES[(bits >> 8) % len(LAST_NAMES)]}</actor>'
+                for bits in (getrandbits(16) for _ in range(options.actors))
+            )
+            append(f'    <actors>{actors}</actors>\n')
+        if options.plot_length:
+            offset = getrandbits(32) % plot_span
+            plot = LOREM_TEXT[offset:offset + options.plot_length]
+            if options.cdata:
+                append(f'    <plot><![CDATA[{plot}]]></plot>\n')
+            else:
+                append(f'    <plot>{plot}</plot>\n')
+        append(f'    <rating>{rating // 10}.{rating % 10}</rating>\n  </movie>\n')
+
+    return ''.join(parts)
+
+
+def block_count(count):
+    return (count + BLOCK_SIZE - 1) // BLOCK_SIZE
+
+
+def _open_output(path, use_gzip):
+    if use_gzip:
+        # Sıkıştırma seviyesi 6: hız/boyut dengesi için gzip'in varsayılanından hızlı
+        return gzip.open(path, 'wt', encoding='utf-8', compresslevel=6)
+    return open(path, 'w', encoding='utf-8', buffering=WRITE_BUFFER_SIZE)
+
+
+def write_document(path, blocks, count, seed, options, use_gzip=False):
+    """Writes a complete <movies> document made of the given block indexes."""
+    with _open_output(path, use_gzip) as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n<movies>\n')
+        for block_index in blocks:
+            f.write(render_block(block_index, count, seed, options))
+        f.write('</movies>\n')
+    return path
+
+
+def _render_block_args(args):
+    return render_block(*args)
+
+
+def shard_paths(path, shards, use_gzip=False):
+    """data/large_movies.xml -> data/large_movies.part001.xml, ..."""
+    base, ext = os.path.splitext(path[:-3] if path.endswith('.gz') else path)
+    suffix = ext + ('.gz' if use_gzip else '')
+    if shards == 1:
+        return [base + suffix]
+    return [f'{base}.part{n + 1:03d}{suffix}' for n in range(shards)]
+
+
+def generate(path, count, seed=42, options=None, shards=1, workers=1, use_gzip=False):
+    """
+    Generates `count` movies into `path` (or into `shards` separate documents).
+    Returns the list of written file paths.
+    """
+    options = options or GeneratorOptions()
+    paths = shard_paths(path, shards, use_gzip)
+    total_blocks = block_count(count)
+
+    if shards > 1:
+        # Her shard ayrı bir süreçte kendi dosyasını yazar (gzip dahil)
+        ranges = [
+            range(total_blocks * n // shards, total_blocks * (n + 1) // shards)
+            for n in range(shards)
+        ]
+        with ProcessPoolExecutor(max_workers=min(workers, shards)) as executor:
+            futures = [
+                executor.submit(write_document, shard_path, blocks, count, seed, options, use_gzip)
+                for shard_path, blocks in zip(paths, ranges)
+            ]
+            return [future.result() for future in futures]
+
+    if workers > 1:
+        # Bloklar paralel üretilir, sırayla tek dosyaya yazılır
+        with ProcessPoolExecutor(max_workers=workers) as executor, _open_output(paths[0], use_gzip) as f:
+            f.write('<?xml version="1.0" encoding="UTF-8"?>\n<movies>\n')
+            args = ((block_index, count, seed, options) for block_index in range(total_blocks))
+            for text in executor.map(_render_block_args, args, chunksize=4):
+                f.write(text)
+            f.write('</movies>\n')
+        return paths
+
+    return [write_document(paths[0], range(total_blocks), count, seed, options, use_gzip)]
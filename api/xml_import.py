@@ -0,0 +1,217 @@
+from decimal import Decimal
+
+from django.db import connections, router, transaction
+from django.utils import timezone
+from lxml import etree
+
+from . import html_cache, movie_cache, xpath_catalog
+from .models import Genre, Movie, MovieActor, MovieGenre, Person
+from .xml_cache import schema_registry
+
+# movie_id dışında XML'den okunan ve upsert sırasında güncellenen alanlar
+MOVIE_UPDATE_FIELDS = ['title', 'year', 'director', 'plot', 'poster_url', 'rating']
+
+# (satırdaki liste anahtarı, isim modeli, ara tablo modeli, ara tablodaki isim FK'sı)
+CREDIT_RELATIONS = [
+    ('genres', Genre, MovieGenre, 'genre_id'),
+    ('actors', Person, MovieActor, 'person_id'),
+]
+# <genres>/<actors> altındaki çocuk etiketleri
+CREDIT_ITEM_TAGS = {'genres': 'genre', 'actors': 'actor'}
+LINK_BATCH_SIZE = 5000
+# IN (...) sorgularında parametre sınırının altında kalmak için
+IN_CHUNK_SIZE = 500
+
+
+def movie_row_from_element(root):
+    """
+    Converts a validated <movie> element into a dict of Movie field values.
+    Raises ValueError if the id or title is missing.
+    """
+    # Her alan için ayrı findtext() yerine çocukları tek geçişte oku
+    texts = {}
+    credits = {'genres': [], 'actors': []}
+    for child in root:
+        if child.tag in CREDIT_ITEM_TAGS:
+            credits[child.tag] = [item.text.strip() for item in child if item.text and item.text.strip()]
+        else:
+            texts[child.tag] = child.text
+
+    movie_id = root.get('id')
+    title = texts.get('title')
+    if not movie_id or not title:
+        raise ValueError("Missing movie ID or title.")
+
+    year_str = texts.get('year')
+    rating_str = texts.get('rating')
+    return {
+        'movie_id': movie_id,
+        'title': title,
+        'year': int(year_str) if year_str and year_str.isdigit() else None,
+        'director': texts.get('director'),
+        'plot': texts.get('plot'), # CDATA içeriği otomatik olarak alınır
+        'poster_url': texts.get('posterUrl'),
+        'rating': Decimal(rating_str) if rating_str else None,
+        'genres': credits['genres'],
+        'actors': credits['actors'],
+    }
+
+
+# --- Process pool tarafı ---
+# Her worker süreci şemayı bir kere derler ve sonra sadece dosya ayrıştırır;
+# veritabanına hiç dokunmaz.
+
+_worker_schema = None
+
+
+def init_worker(schema_path):
+    global _worker_schema
+    _worker_schema = schema_registry.get(schema_path)
+
+
+def parse_movie_file(file_path):
+    """
+    Parses and validates one movie file.
+    Returns (file_path, row, None) on success and (file_path, None, error) on failure.
+    """
+    try:
+        xml_doc = etree.parse(file_path)
+        _worker_schema.assertValid(xml_doc)
+        return file_path, movie_row_from_element(xml_doc.getroot()), None
+    except etree.DocumentInvalid as e:
+        return file_path, None, f"XML VALIDATION ERROR: {e}"
+    except etree.XMLSyntaxError as e:
+        return file_path, None, f"XML SYNTAX ERROR: {e}"
+    except ValueError as e:
+        return file_path, None, f"Skipping file: {e}"
+    except Exception as e:
+        return file_path, None, f"An unexpected error occurred: {e}"
+
+
+def _upsert_statement(connection):
+    """
+    Builds the INSERT ... ON CONFLICT DO UPDATE statement for Movie and the
+    constant values used for columns that are not read from XML.
+    """
+    qn = connection.ops.quote_name
+    columns = []
+    defaults = {}
+    update_columns = list(MOVIE_UPDATE_FIELDS)
+    for field in Movie._meta.concrete_fields:
+        columns.append(field.name)
+        if field.name == 'movie_id' or field.name in MOVIE_UPDATE_FIELDS:
+            continue
+        if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False):
+            value = timezone.now()
+            if getattr(field, 'auto_now', False):
+                update_columns.append(field.name)
+        else:
+            value = field.get_default()
+        # Ham SQL'e ORM'in yazacağı biçimde verilir (örn. tarih +00:00 eki olmadan);
+        # aksi halde bu satırlar ORM ile yazılanlarla metin olarak doğru karşılaştırılmaz
+        defaults[field.name] = field.get_db_prep_save(value, connection)
+
+    sql = 'INSERT INTO %s (%s) VALUES (%s) ON CONFLICT (%s) DO UPDATE SET %s' % (
+        qn(Movie._meta.db_table),
+        ', '.join(qn(Movie._meta.get_field(name).column) for name in columns),
+        ', '.join(['%s'] * len(columns)),
+        qn(Movie._meta.pk.column),
+        ', '.join(
+            '%s = excluded.%s' % (qn(Movie._meta.get_field(name).column), qn(Movie._meta.get_field(name).column))
+            for name in update_columns
+        ),
+    )
+    return sql, columns, defaults
+
+
+def _existing_movie_ids(cursor, connection, movie_ids):
+    """Returns the ids in `movie_ids` that are already stored, querying in parameter-limited chunks."""
+    qn = connection.ops.quote_name
+    chunk_size = connection.features.max_query_params or len(movie_ids)
+    existing = []
+    for start in range(0, len(movie_ids), chunk_size):
+        chunk = movie_ids[start:start + chunk_size]
+        cursor.execute(
+            'SELECT %s FROM %s WHERE %s IN (%s)' % (
+                qn(Movie._meta.pk.column), qn(Movie._meta.db_table),
+                qn(Movie._meta.pk.column), ', '.join(['%s'] * len(chunk)),
+            ),
+            chunk,
+        )
+        existing.extend(row[0] for row in cursor.fetchall())
+    return existing
+
+
+def _name_ids(model, names, using):
+    """Inserts the missing names of `model` and returns {name: id} for all of `names`."""
+    model.objects.using(using).bulk_create([model(name=name) for name in names], ignore_conflicts=True)
+    names = list(names)
+    ids = {}
+    for start in range(0, len(names), IN_CHUNK_SIZE):
+        chunk = names[start:start + IN_CHUNK_SIZE]
+        ids.update(model.objects.using(using).filter(name__in=chunk).values_list('name', 'id'))
+    return ids
+
+
+def _store_credits(rows, existing, using):
+    """
+    Writes the genre and actor links of `rows`. Names are deduplicated for the
+    whole batch in memory, so each distinct name costs one insert at most.
+    Links of updated movies are replaced with the ones in the XML.
+    """
+    for key, name_model, link_model, name_field in CREDIT_RELATIONS:
+        rows_with_key = [row for row in rows if key in row]
+        if not rows_with_key:
+            continue
+
+        names = {name for row in rows_with_key for name in row[key]}
+        name_ids = _name_ids(name_model, names, using) if names else {}
+
+        replaced = [row['movie_id'] for row in rows_with_key if row['movie_id'] in existing]
+        for start in range(0, len(replaced), IN_CHUNK_SIZE):
+            link_model.objects.using(using).filter(movie_id__in=replaced[start:start + IN_CHUNK_SIZE]).delete()
+
+        links = [
+            link_model(movie_id=row['movie_id'], **{name_field: name_ids[name]})
+            for row in rows_with_key
+            for name in dict.fromkeys(row[key])
+        ]
+        link_model.objects.using(using).bulk_create(links, batch_size=LINK_BATCH_SIZE)
+
+
+def bulk_upsert_movies(rows):
+    """
+    Inserts or updates `rows` with a single executemany() of
+    INSERT ... ON CONFLICT DO UPDATE inside one transaction.
+    Returns (created_count, updated_count).
+
+    Model.objects.bulk_create(update_conflicts=True) ile aynı SQL'i üretir, fakat
+    satır başına model nesnesi ve alan hazırlığı yapmadığı için büyük importlarda
+    birkaç kat daha hızlıdır.
+    """
+    # Aynı batch içinde tekrar eden id'lerde son gelen kazanır
+    rows_by_id = {row['movie_id']: row for row in rows}
+    if not rows_by_id:
+        return 0, 0
+
+    connection = connections[router.db_for_write(Movie)]
+    with transaction.atomic(using=connection.alias):
+        # updated_at (auto_now) yazma kilidi alındıktan sonra belirlenir; değişiklik
+        # akışında zaman damgaları commit sırasından fazla geri kalmaz
+        sql, columns, defaults = _upsert_statement(connection)
+        params = [
+            tuple(row[name] if name in row else defaults[name] for name in columns)
+            for row in rows_by_id.values()
+        ]
+        with connection.cursor() as cursor:
+            existing = _existing_movie_ids(cursor, connection, list(rows_by_id))
+            cursor.executemany(sql, params)
+        # Tür ve oyuncu bağlantıları aynı transaction içinde yazılır
+        _store_credits(list(rows_by_id.values()), set(existing), connection.alias)
+
+    # Ham SQL model sinyallerini tetiklemez, önbelleği burada temizle.
+    # Yeni eklenen filmlerin detay sayfası zaten önbellekte olamaz.
+    html_cache.invalidate_movies(existing)
+    movie_cache.invalidate_movies(existing, using=connection.alias)
+    xpath_catalog.movies_changed(rows_by_id, using=connection.alias)
+    return len(rows_by_id) - len(existing), len(existing)
@@ -0,0 +1,413 @@
+"""
+XPath sorguları için bellekte tutulan <movies> katalog dokümanı.
+
+Doküman ilk sorguda veritabanından bir kez kurulur. Sonrasında sadece değişen
+filmler yeniden okunarak yamalanır. Değişen id'ler iki yerden gelir: bu
+süreçteki değişiklikler (sinyaller ve toplu import) "bekleyen" kümesine eklenir;
+diğer worker süreçlerinin değişiklikleri en fazla XPATH_CATALOG_SYNC_INTERVAL
+saniyede bir değişiklik akışından (Movie.updated_at ve MovieTombstone, bkz.
+api/change_feed.py) okunur. lxml ağacına sadece doküman kilidi altında
+dokunulur; veritabanı okumaları kilit dışında yapılır ve film kaydeden
+istekler uzun süren bir XPath sorgusunu beklemez.
+
+Çok sayıda film değiştiyse (ör. büyük bir import) doküman baştan kurulur. Yeni
+ağaç kilit dışında kurulur ve hazır olunca eskisiyle değiştirilir; kurulum
+sürerken sorgular eski dokümanla devam eder.
+
+Sorgular doküman kilidini ve havuzdaki bir thread'i tutar; libxml2 çalışan
+bir sorguyu durduramadığı için ifadeler derlenmeden önce check_expression ile
+maliyeti doküman boyutuyla sınırlı bir alt kümeye kısıtlanır.
+"""
+import copy
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from django.conf import settings
+from django.db import transaction
+from lxml import etree
+
+from . import change_feed
+from .models import Movie, MovieTombstone
+
+# plot alanı 1M+ filmde belleği birkaç kat büyüttüğü için dokümana alınmaz
+CATALOG_FIELDS = ('title', 'year', 'director', 'rating')
+MAX_EXPRESSION_LENGTH = 1000
+# libxml2 çalışan bir sorguyu durduramaz; maliyeti derlemeden önce ifadeyi
+# kısıtlayarak sınırlanır (bkz. check_expression)
+MAX_NESTING = 8
+MAX_PREDICATE_DEPTH = 3
+MAX_DESCENDANT_STEPS = 4
+# Kökten başlayan her yol (ör. string(.)) dokümanın tamamını okuyabilir
+MAX_PATHS = 6
+ALLOWED_AXES = frozenset({
+    'child', 'attribute', 'self', 'parent', 'descendant', 'descendant-or-self',
+})
+# Predicate içinde her düğüm için yeniden değerlendirilir; dokümanın geri kalanına
+# ulaşan adımlar sorguyu film sayısında karesel yapar
+PREDICATE_FORBIDDEN = frozenset({'//', '..', 'parent'})
+ALLOWED_FUNCTIONS = frozenset({
+    # XPath 1.0 çekirdek fonksiyonları; EXSLT ve önekli uzantılar kapalı
+    'last', 'position', 'count', 'local-name', 'name',
+    'string', 'concat', 'starts-with', 'contains', 'substring-before', 'substring-after',
+    'substring', 'string-length', 'normalize-space', 'translate',
+    'boolean', 'not', 'true', 'false', 'number', 'sum', 'floor', 'ceiling', 'round',
+    # Düğüm testleri
+    'node', 'text',
+})
+OPERATOR_NAMES = frozenset({'and', 'or', 'div', 'mod'})
+TOKEN_RE = re.compile(r"""
+    (?P<space>\s+)
+  | (?P<literal>"[^"]*"|'[^']*')
+  | (?P<number>\d+(?:\.\d*)?|\.\d+)
+  | (?P<symbol>//|::|\.\.|!=|<=|>=|[/()\[\],|+=<>*@.-])
+  | (?P<name>[A-Za-z_][\w.-]*(?::[A-Za-z_][\w.-]*)?)
+""", re.VERBOSE)
+# Bundan fazla film değişmişse tek tek yamalamak yerine doküman yeniden kurulur
+FULL_RELOAD_THRESHOLD = 10000
+BUILD_CHUNK_SIZE = 5000
+ID_CHUNK_SIZE = 900
+
+
+class CompiledXPathCache:
+    """Bounded LRU of compiled etree.XPath objects keyed by expression."""
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, expression):
+        with self._lock:
+            compiled = self._entries.get(expression)
+            if compiled is not None:
+                self._entries.move_to_end(expression)
+                self.hits += 1
+                return compiled
+
+        try:
+            # regexp=False: EXSLT regex fonksiyonları kapalı (ReDoS riski)
+            compiled = etree.XPath(expression, smart_strings=False, regexp=False)
+        except etree.XPathSyntaxError as e:
+            raise ValueError(f'Invalid XPath expression: {e}')
+
+        with self._lock:
+            self.misses += 1
+            self._entries[expression] = compiled
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return compiled
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self._entries)}
+
+
+class CatalogDocument:
+    """In-memory <movies> document, patched from mark_changed() ids and the change feed."""
+
+    def __init__(self):
+        # _lock ağacı korur; _sync_lock aynı anda tek bir kurulum/yamalama yapılmasını sağlar
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._pending_lock = threading.Lock()
+        self._pending = set()
+        self.root = None
+        self._elements = {}
+        # Değişiklik akışında bu andan sonraki değişiklikler henüz uygulanmadı
+        self._since = None
+        self.synced_at = None
+
+    def _movie_element(self, parent, row):
+        movie = etree.SubElement(parent, 'movie', id=row[0])
+        for name, value in zip(CATALOG_FIELDS, row[1:]):
+            if value is not None and value != '':
+                etree.SubElement(movie, name).text = str(value)
+        return movie
+
+    def _rows(self, queryset):
+        return queryset.values_list('movie_id', *CATALOG_FIELDS)
+
+    def _build(self):
+        # Bekleyenler okumadan önce temizlenir; okuma sırasında gelen değişiklikler kaybolmaz
+        with self._pending_lock:
+            self._pending = set()
+        since = change_feed.settled_until()
+
+        root = etree.Element('movies')
+        elements = {}
+        rows = self._rows(Movie.objects.order_by('movie_id')).iterator(chunk_size=BUILD_CHUNK_SIZE)
+        for row in rows:
+            elements[row[0]] = self._movie_element(root, row)
+
+        with self._lock:
+            self.root = root
+            self._elements = elements
+        self._since = since
+        self.synced_at = time.monotonic()
+
+    def _feed_ids(self, since):
+        # Eşiği aşan değişiklik zaten yeniden kurulum demektir; fazlası okunmaz
+        limit = FULL_RELOAD_THRESHOLD + 1
+        ids = set(Movie.objects.filter(updated_at__gt=since).values_list('movie_id', flat=True)[:limit])
+        ids.update(MovieTombstone.objects.filter(deleted_at__gt=since).values_list('movie_id', flat=True)[:limit])
+        return ids
+
+    def _sync(self):
+        with self._pending_lock:
+            ids, self._pending = self._pending, set()
+        # Sınır okumadan önce alınır; sınırla şimdi arasındaki değişiklikler bir sonraki senkronizasyonda tekrar okunur
+        since = change_feed.settled_until()
+        ids |= self._feed_ids(self._since)
+        if len(ids) > FULL_RELOAD_THRESHOLD:
+            self._build()
+            return
+
+        ids = list(ids)
+        rows = {}
+        for start in range(0, len(ids), ID_CHUNK_SIZE):
+            chunk = ids[start:start + ID_CHUNK_SIZE]
+            rows.update((row[0], row) for row in self._rows(Movie.objects.filter(pk__in=chunk)))
+
+        if ids:
+            with self._lock:
+                self._patch(ids, rows)
+        self._since = since
+        self.synced_at = time.monotonic()
+
+    def _patch(self, ids, rows):
+        for movie_id in ids:
+            old = self._elements.pop(movie_id, None)
+            row = rows.get(movie_id)
+            if row is None:
+                if old is not None:
+                    self.root.remove(old)
+                continue
+            # Yeni eleman sona eklenir, güncellenen film dokümandaki yerini korur
+            new = self._movie_element(self.root, row)
+            if old is not None:
+                self.root.replace(old, new)
+            self._elements[movie_id] = new
+
+    def _sync_due(self):
+        if self._pending:
+            return True
+        interval = getattr(settings, 'XPATH_CATALOG_SYNC_INTERVAL', 1.0)
+        return time.monotonic() - self.synced_at >= interval
+
+    def mark_changed(self, movie_ids):
+        """Records changed (created, updated or deleted) movies; applied before the next query."""
+        with self._pending_lock:
+            self._pending.update(movie_ids)
+
+    def reset(self):
+        with self._sync_lock, self._lock:
+            self.root = None
+            self._elements = {}
+            self._since = self.synced_at = None
+        with self._pending_lock:
+            self._pending = set()
+
+    def __len__(self):
+        return len(self._elements)
+
+    def refresh(self, timeout):
+        """
+        Builds the document or applies pending changes. Runs in the request
+        thread so that database access stays on the request's connection.
+        Doküman kuruluysa ve başka bir istek onu güncelliyorsa beklenmez.
+        """
+        if self.root is not None:
+            if not self._sync_due() or not self._sync_lock.acquire(blocking=False):
+                return
+        elif not self._sync_lock.acquire(timeout=timeout):
+            raise TimeoutError('XPath catalog is busy.')
+        try:
+            if self.root is None:
+                self._build()
+            elif self._sync_due():
+                self._sync()
+        finally:
+            self._sync_lock.release()
+
+    def query(self, compiled, limit):
+        """Evaluates `compiled` against the document and returns the serialized result."""
+        with self._lock:
+            try:
+                result = compiled(self.root)
+            except etree.XPathError as e:
+                raise ValueError(f'XPath evaluation failed: {e}')
+            # Sonuç düğümleri doküman kilidi altında kopyalanır, sonraki yamalardan etkilenmez
+            return serialize_result(result, limit)
+
+
+def serialize_result(result, limit):
+    """
+    <xpathResult type="nodeset" count="N" returned="n">...</xpathResult>
+    Düğüm olmayan sonuçlar (metin, öznitelik değeri) <value> içinde döner.
+    """
+    wrapper = etree.Element('xpathResult')
+    if isinstance(result, list):
+        items = result[:limit]
+        wrapper.set('type', 'nodeset')
+        wrapper.set('count', str(len(result)))
+        wrapper.set('returned', str(len(items)))
+        for item in items:
+            if isinstance(item, etree._Element):
+                node = copy.deepcopy(item)
+                node.tail = None
+                wrapper.append(node)
+            else:
+                etree.SubElement(wrapper, 'value').text = str(item)
+    elif isinstance(result, bool):
+        wrapper.set('type', 'boolean')
+        wrapper.text = 'true' if result else 'false'
+    elif isinstance(result, float):
+        wrapper.set('type', 'number')
+        wrapper.text = str(int(result)) if result.is_integer() else str(result)
+    else:
+        wrapper.set('type', 'string')
+        wrapper.text = str(result)
+    return etree.tostring(wrapper, encoding='utf-8', xml_declaration=True)
+
+
+def _tokens(expression):
+    position = 0
+    while position < len(expression):
+        match = TOKEN_RE.match(expression, position)
+        if match is None:
+            raise ValueError(f'Unsupported character in XPath expression: {expression[position]!r}')
+        position = match.end()
+        if match.lastgroup != 'space':
+            yield match.lastgroup, match.group()
+
+
+def _ends_operand(token):
+    # XPath 1.0 sözcük kuralı: bir işlenenden sonra gelen '*' çarpma, '/' adım ayırıcıdır
+    if token is None:
+        return False
+    kind, value = token
+    return (
+        kind in ('literal', 'number', 'wildcard') or value in (')', ']', '.', '..')
+        or kind == 'name' and value not in OPERATOR_NAMES
+    )
+
+
+def check_expression(expression):
+    """
+    Rejects expressions whose cost is not bounded by the document size: unknown
+    axes and functions, variables, deep nesting, and predicates that reach
+    outside the node they are evaluated for. Raises ValueError.
+    """
+    tokens = list(_tokens(expression))
+    stack = []
+    descendant_steps = 0
+    paths = 0
+    previous = None
+    for index, (kind, value) in enumerate(tokens):
+        following = tokens[index + 1][1] if index + 1 < len(tokens) else None
+        in_predicate = '[' in stack
+        if value == '*' and not _ends_operand(previous):
+            kind = 'wildcard'
+
+        if kind == 'name' and following == '(' and value not in OPERATOR_NAMES:
+            if value not in ALLOWED_FUNCTIONS:
+                raise ValueError(f'XPath function is not allowed: {value}()')
+        elif kind == 'name' and following == '::':
+            if value not in ALLOWED_AXES:
+                raise ValueError(f'XPath axis is not allowed: {value}::')
+            if in_predicate and value in PREDICATE_FORBIDDEN:
+                raise ValueError(f'{value}:: is not allowed inside a predicate.')
+        elif kind == 'name' and ':' in value:
+            raise ValueError('Namespace prefixes are not supported.')
+
+        if value == '//' or value in ('descendant', 'descendant-or-self') and following == '::':
+            descendant_steps += 1
+            if descendant_steps > MAX_DESCENDANT_STEPS:
+                raise ValueError(f'At most {MAX_DESCENDANT_STEPS} descendant steps are allowed.')
+        if in_predicate and kind == 'symbol':
+            if value in PREDICATE_FORBIDDEN:
+                raise ValueError(f"'{value}' is not allowed inside a predicate.")
+            if value == '/' and not _ends_operand(previous):
+                raise ValueError('Absolute paths are not allowed inside a predicate.')
+
+        starts_path = (
+            value in ('/', '//', '.', '..', '@') or kind == 'wildcard'
+            or kind == 'name' and value not in OPERATOR_NAMES and (following != '(' or value in ('node', 'text'))
+        )
+        if starts_path and not _ends_operand(previous) and (previous is None or previous[1] not in ('/', '//', '::', '@')):
+            paths += 1
+            if paths > MAX_PATHS:
+                raise ValueError(f'At most {MAX_PATHS} location paths are allowed.')
+
+        if value in ('(', '['):
+            stack.append(value)
+            if len(stack) > MAX_NESTING or stack.count('[') > MAX_PREDICATE_DEPTH:
+                raise ValueError('XPath expression is nested too deeply.')
+        elif value in (')', ']'):
+            if not stack or stack.pop() != {')': '(', ']': '['}[value]:
+                raise ValueError('Unbalanced brackets in XPath expression.')
+        previous = kind, value
+
+
+catalog = CatalogDocument()
+xpath_cache = CompiledXPathCache()
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    # Aynı anda en fazla XPATH_MAX_WORKERS sorgu değerlendirilir
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'XPATH_MAX_WORKERS', 2), thread_name_prefix='xpath'
+            )
+        return _executor
+
+
+def movies_changed(movie_ids, using=None):
+    """Marks movies as changed once the current transaction commits."""
+    transaction.on_commit(partial(catalog.mark_changed, list(movie_ids)), using=using)
+
+
+def evaluate(expression, limit=None):
+    """
+    Evaluates a restricted XPath expression against the catalog document.
+    Raises ValueError for invalid expressions and TimeoutError when the
+    evaluation does not finish within XPATH_TIMEOUT seconds.
+    """
+    expression = expression.strip()
+    if not expression:
+        raise ValueError("An 'xpath' expression is required.")
+    if len(expression) > MAX_EXPRESSION_LENGTH:
+        raise ValueError(f'XPath expression is longer than {MAX_EXPRESSION_LENGTH} characters.')
+
+    max_results = getattr(settings, 'XPATH_MAX_RESULTS', 1000)
+    limit = max_results if limit is None else min(limit, max_results)
+    check_expression(expression)
+    compiled = xpath_cache.get(expression)
+
+    timeout = getattr(settings, 'XPATH_TIMEOUT', 2.0)
+    catalog.refresh(timeout)
+
+    # libxml2 çalışan bir XPath'i durduramaz; zaman aşımında istemciye hemen
+    # hata dönülür, sorgu ise havuzdaki thread'de tamamlanır. Sorgunun ne kadar
+    # süreceğini check_expression sınırlar, zaman aşımı sadece istemciyi korur.
+    future = _get_executor().submit(catalog.query, compiled, limit)
+    try:
+        return future.result(timeout=timeout)
+    except TimeoutError:
+        future.cancel()
+        raise
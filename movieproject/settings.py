@@ -25,6 +25,15 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 # SECURITY WARNING: keep the secret key used in production secret!
 SECRET_KEY = os.getenv('SECRET_KEY')
 TMDB_API_KEY = os.getenv('TMDB_API_KEY')
+TMDB_API_BASE_URL = os.getenv('TMDB_API_BASE_URL', 'https://api.themoviedb.org/3')
+# (bağlantı, okuma) zaman aşımları, saniye
+TMDB_TIMEOUT = (float(os.getenv('TMDB_CONNECT_TIMEOUT', 3.05)), float(os.getenv('TMDB_READ_TIMEOUT', 10)))
+TMDB_MAX_RETRIES = int(os.getenv('TMDB_MAX_RETRIES', 3))
+TMDB_RETRY_BACKOFF = float(os.getenv('TMDB_RETRY_BACKOFF', 0.5))
+# process_import_jobs komutunun TMDB'ye saniyede en fazla istek sayısı
+TMDB_RATE_LIMIT = float(os.getenv('TMDB_RATE_LIMIT', 20))
+# Tek bir toplu import isteğindeki en fazla başlık sayısı
+IMPORT_JOB_MAX_TITLES = int(os.getenv('IMPORT_JOB_MAX_TITLES', 5000))
 
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = True
@@ -48,6 +57,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # En dışta: diğer middleware'ler dahil tüm istek süresini ölçer
+    'api.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -75,19 +86,124 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'movieproject.wsgi.application'
+ASGI_APPLICATION = 'movieproject.asgi.application'
 
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# Her yeni SQLite bağlantısında çalıştırılan PRAGMA'lar. WAL modunda okuyucular
+# yazarları beklemez; synchronous=NORMAL WAL ile güvenlidir (elektrik kesintisinde
+# sadece son commit'ler kaybolabilir, veritabanı bozulmaz). Ortam değişkenleriyle
+# değiştirilebilir; etkisi `python manage.py benchmark_sqlite` ile ölçülebilir.
+SQLITE_PRAGMAS = {
+    'journal_mode': os.getenv('SQLITE_JOURNAL_MODE', 'WAL'),
+    'synchronous': os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL'),
+    'busy_timeout': int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', 5000)),
+    # Negatif değer KiB cinsindendir: 64 MB sayfa önbelleği
+    'cache_size': int(os.getenv('SQLITE_CACHE_SIZE', -64000)),
+    'mmap_size': int(os.getenv('SQLITE_MMAP_SIZE', 256 * 1024 * 1024)),
+    'temp_store': os.getenv('SQLITE_TEMP_STORE', 'MEMORY'),
+}
+# IMMEDIATE: transaction başta yazma kilidini alır. DEFERRED'da okuma yapıp sonra
+# yazmaya geçen transaction'lar busy_timeout'u beklemeden "database is locked" alır.
+SQLITE_TRANSACTION_MODE = os.getenv('SQLITE_TRANSACTION_MODE', 'IMMEDIATE') or None
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {
+            'init_command': ';'.join(f'PRAGMA {name} = {value}' for name, value in SQLITE_PRAGMAS.items()),
+            'transaction_mode': SQLITE_TRANSACTION_MODE,
+        },
     }
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+# XSLT ile üretilen HTML sayfaları için önbellek. Birden fazla worker süreci
+# aynı önbelleği paylaşacaksa HTML_CACHE_BACKEND=file kullanılmalıdır.
+HTML_CACHE_BACKEND = os.getenv('HTML_CACHE_BACKEND', 'locmem')
+HTML_CACHE_TIMEOUT = int(os.getenv('HTML_CACHE_TIMEOUT', 60 * 60))
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'html': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.getenv('HTML_CACHE_DIR', BASE_DIR / '.cache' / 'html'),
+        'TIMEOUT': HTML_CACHE_TIMEOUT,
+    } if HTML_CACHE_BACKEND == 'file' else {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'movie-html',
+        'TIMEOUT': HTML_CACHE_TIMEOUT,
+    },
+    # TMDB yanıtları yeniden başlatmalardan sonra da kullanılabilsin diye diskte tutulur
+    'tmdb': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.getenv('TMDB_CACHE_DIR', BASE_DIR / '.cache' / 'tmdb'),
+        'TIMEOUT': int(os.getenv('TMDB_CACHE_TIMEOUT', 24 * 60 * 60)),
+        'OPTIONS': {'MAX_ENTRIES': 50000},
+    },
+}
+
+
+# /movies/xpath/ sorguları için sınırlar
+XPATH_TIMEOUT = float(os.getenv('XPATH_TIMEOUT', 2.0))
+XPATH_MAX_RESULTS = int(os.getenv('XPATH_MAX_RESULTS', 1000))
+XPATH_MAX_WORKERS = int(os.getenv('XPATH_MAX_WORKERS', 2))
+# Diğer süreçlerdeki değişiklikler bellekteki katalog dokümanına en fazla bu kadar saniyede bir uygulanır
+XPATH_CATALOG_SYNC_INTERVAL = float(os.getenv('XPATH_CATALOG_SYNC_INTERVAL', 1.0))
+
+
+# Token kimlik doğrulama önbelleği (süreç başına LRU)
+TOKEN_AUTH_CACHE_SIZE = int(os.getenv('TOKEN_AUTH_CACHE_SIZE', 10000))
+TOKEN_AUTH_CACHE_TTL = int(os.getenv('TOKEN_AUTH_CACHE_TTL', 60))
+
+# Film başına serialize edilmiş XML parçası önbelleği (süreç başına LRU, api/movie_cache.py)
+MOVIE_FRAGMENT_CACHE_SIZE = int(os.getenv('MOVIE_FRAGMENT_CACHE_SIZE', 50000))
+MOVIE_FRAGMENT_CACHE_MAX_BYTES = int(os.getenv('MOVIE_FRAGMENT_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+
+# Değişiklik akışı (/movies/changes/) son bu kadar saniyeyi vermez: zaman damgası
+# commit'ten önce alındığı için daha eski damgalı bir yazma geç commit edilebilir.
+# busy_timeout ve en uzun yazma transaction'ından uzun olmalıdır.
+CHANGE_FEED_SETTLE_SECONDS = float(os.getenv('CHANGE_FEED_SETTLE_SECONDS', 10.0))
+
+
+# XML istek gövdeleri için sınırlar (api/parsers.py)
+XML_MAX_BODY_SIZE = int(os.getenv('XML_MAX_BODY_SIZE', 5 * 1024 * 1024))
+XML_MAX_DEPTH = int(os.getenv('XML_MAX_DEPTH', 32))
+
+
+# Async view'larda (api/async_views.py) XSLT/XML render için thread sayısı
+ASYNC_CPU_WORKERS = int(os.getenv('ASYNC_CPU_WORKERS', 4))
+
+# İstek metrikleri (/metrics). Birden fazla worker süreci varsa METRICS_DIR
+# ortak bir dizin olmalı; her süreç kendi snapshot'ını oraya yazar.
+METRICS_DIR = os.getenv('METRICS_DIR') or None
+METRICS_FLUSH_INTERVAL = float(os.getenv('METRICS_FLUSH_INTERVAL', 5.0))
+# Bu süreden uzun istekler süre dökümüyle birlikte loglanır
+METRICS_SLOW_REQUEST_SECONDS = float(os.getenv('METRICS_SLOW_REQUEST_SECONDS', 1.0))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'simple': {'format': '{asctime} {levelname} {name}: {message}', 'style': '{'},
+    },
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler', 'formatter': 'simple'},
+    },
+    'loggers': {
+        'api': {'handlers': ['console'], 'level': os.getenv('API_LOG_LEVEL', 'INFO')},
+    },
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -132,16 +248,19 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 REST_FRAMEWORK = {
     # tüm API'ler için varsayılan olarak token tabanlı kimlik doğrulama
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        # Token -> kullanıcı eşlemesi süreç içinde önbelleklenir (api/authentication.py)
+        'api.authentication.CachedTokenAuthentication',
     ],
      'DEFAULT_PERMISSION_CLASSES': [
        
     ],
      'DEFAULT_PARSER_CLASSES': [
-        'rest_framework_xml.parsers.XMLParser',
+        # DTD/entity kapalı, boyut ve derinlik sınırlı lxml parser'ı (api/parsers.py)
+        'api.parsers.HardenedXMLParser',
     ],
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework_xml.renderers.XMLRenderer',
+        # XMLRenderer ile aynı çıktı; önbellekteki film parçalarını olduğu gibi yazar (api/movie_cache.py)
+        'api.renderers.FragmentXMLRenderer',
     ],
 
 
@@ -18,6 +18,7 @@ from django.contrib import admin
 from django.urls import path, include
 
 from rest_framework import permissions
+from api.views import metrics_view
 from drf_yasg.views import get_schema_view
 from drf_yasg import openapi
 
@@ -50,4 +51,7 @@ urlpatterns = [
     # API şemasını JSON veya YAML olarak indirmek için
     path('swagger.json', schema_view.without_ui(cache_timeout=0), name='schema-json'),
     path('swagger.yaml', schema_view.without_ui(cache_timeout=0), name='schema-yaml'),
+
+    # Prometheus metrikleri (api/metrics.py)
+    path('metrics', metrics_view, name='metrics'),
 ]
@@ -37,19 +37,23 @@
                         <h2>Konu</h2>
                         <p class="plot"><xsl:value-of select="plot"/></p>
                         
-                        <!-- <h2>Türler</h2>
-                        <div class="genres">
-                            <xsl:for-each select="genres/genre">
-                                <span><xsl:value-of select="."/></span>
-                            </xsl:for-each>
-                        </div>
+                        <xsl:if test="genres/genre">
+                            <h2>Türler</h2>
+                            <div class="genres">
+                                <xsl:for-each select="genres/genre">
+                                    <span><xsl:value-of select="."/></span>
+                                </xsl:for-each>
+                            </div>
+                        </xsl:if>
 
-                        <h2>Oyuncular</h2>
-                        <div class="actors">
-                            <xsl:for-each select="actors/actor">
-                                <span><xsl:value-of select="."/></span>
-                            </xsl:for-each>
-                        </div> -->
+                        <xsl:if test="actors/actor">
+                            <h2>Oyuncular</h2>
+                            <div class="actors">
+                                <xsl:for-each select="actors/actor">
+                                    <span><xsl:value-of select="."/></span>
+                                </xsl:for-each>
+                            </div>
+                        </xsl:if>
                     </div>
                 </div>
             </body>
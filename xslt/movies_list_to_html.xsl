@@ -1,53 +1,76 @@
 <?xml version="1.0" encoding="UTF-8"?>
+<!--
+    Film kataloğu. Sayfa parça parça akıtılır (bkz. movie_list_html_view):
+    - <catalog/> sayfa iskeletini üretir; "sections" yorumunun öncesi baş, sonrası son kısımdır.
+    - Her <section key=".."><movie id=".."><title/></movie>...</section> ayrı ayrı dönüştürülür.
+-->
 <xsl:stylesheet version="1.0" xmlns:xsl="http://www.w3.org/1999/XSL/Transform">
     <xsl:output method="html" doctype-system="about:legacy-compat" encoding="UTF-8" indent="yes"/>
 
- 
-    <xsl:template match="/movies">
+
+    <xsl:template match="/catalog">
         <html>
             <head>
                 <title>Tüm Filmler</title>
                 <style>
                     body { font-family: sans-serif; margin: 2em; background-color: #f8f9fa; }
                     h1 { color: #343a40; text-align: center; margin-bottom: 1em; }
+                    h2 { color: #495057; max-width: 800px; margin: 1.5em auto 0.5em; border-bottom: 1px solid #dee2e6; }
                     ul { list-style-type: none; padding: 0; max-width: 800px; margin: 0 auto; }
-                    li { 
-                        background: #ffffff; 
-                        margin-bottom: 8px; 
-                        padding: 12px 20px; 
-                        border-radius: 5px; 
+                    li {
+                        background: #ffffff;
+                        margin-bottom: 8px;
+                        padding: 12px 20px;
+                        border-radius: 5px;
                         box-shadow: 0 2px 4px rgba(0,0,0,0.05);
                         transition: transform 0.2s ease-in-out;
                     }
                     li:hover {
                         transform: scale(1.02);
                     }
-                    a { 
-                        text-decoration: none; 
-                        color: #0056b3; 
-                        font-weight: bold; 
+                    a {
+                        text-decoration: none;
+                        color: #0056b3;
+                        font-weight: bold;
                         font-size: 1.1em;
                     }
                     a:hover { text-decoration: underline; }
+                    nav { text-align: center; margin: 2em 0; }
+                    nav a { margin: 0 1em; }
                 </style>
             </head>
             <body>
                 <h1>Film Kataloğu</h1>
-                <ul>
-                    
-                    <xsl:for-each select="movie">
-                    
-                        <xsl:sort select="title"/>
-                        <li>
-                        
-                            <a href="/api/v1/html/movies/{@id}/">
-                                <xsl:value-of select="title"/>
-                            </a>
-                        </li>
-                    </xsl:for-each>
-                </ul>
+                <xsl:comment>sections</xsl:comment>
+                <nav>
+                    <xsl:if test="@first">
+                        <a href="{@first}">İlk sayfa</a>
+                    </xsl:if>
+                    <xsl:if test="@next">
+                        <a href="{@next}">Sonraki sayfa</a>
+                    </xsl:if>
+                </nav>
             </body>
         </html>
     </xsl:template>
 
-</xsl:stylesheet>
\ No newline at end of file
+    <xsl:template match="section">
+        <section>
+            <!-- Önceki parçanın devamıysa başlık tekrar yazılmaz -->
+            <xsl:if test="@key and not(@continued)">
+                <h2><xsl:value-of select="@key"/></h2>
+            </xsl:if>
+            <ul>
+                <!-- Sıralama veritabanında yapılır (lower(title), movie_id) -->
+                <xsl:for-each select="movie">
+                    <li>
+                        <a href="/api/v1/html/movies/{@id}/">
+                            <xsl:value-of select="title"/>
+                        </a>
+                    </li>
+                </xsl:for-each>
+            </ul>
+        </section>
+    </xsl:template>
+
+</xsl:stylesheet>